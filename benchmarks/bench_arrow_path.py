@@ -0,0 +1,168 @@
+"""
+Compare ArrowPath (src/interface/components/arrow_path.py) with the original, which gave every
+tile the angle of its nearest simplified segment by scanning all of them, checked every arrow
+against the player every frame, and rotated and scaled the arrow sprite for every arrow drawn.
+
+Builds long flow-field paths across a map, then times:
+    build   : constructing the ArrowPath
+    walk    : update() per frame while a player walks the path at walking speed
+    draw    : draw() per frame of the whole path in view
+and checks both give every tile the same angle and consume the path in the same number of frames.
+
+Usage:
+    python -m benchmarks.bench_arrow_path [--map map.tmx] [--paths 20] [--min-length 60]
+"""
+import argparse
+import math
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame as pg
+
+from src.utils import Position, PositionCamera, GameSettings
+from src.utils.pathfinding import Pathfinder, FlowField
+
+STEP = 4.0  # Pixels walked per frame
+
+
+class OriginalArrows:
+    """The original arrow construction, consumption and drawing"""
+
+    def __init__(self, full_path: list[Position], simplified_path: list[Position], image: pg.Surface):
+        self.full_path = full_path
+        self.simplified_path = simplified_path
+        self.image = image
+        self.animation_time = 0.0
+        self.consumption_distance = GameSettings.TILE_SIZE * 0.7
+        self.arrows = []
+        for i in range(len(full_path) - 1):
+            self.arrows.append({'pos': full_path[i], 'angle': self._angle(full_path[i]), 'visible': True})
+
+    def _angle(self, pos: Position) -> float:
+        min_distance = float('inf')
+        best = 0
+        for i in range(len(self.simplified_path) - 1):
+            dist = self._segment_distance(pos, self.simplified_path[i], self.simplified_path[i + 1])
+            if dist < min_distance:
+                min_distance = dist
+                best = i
+        a, b = self.simplified_path[best], self.simplified_path[best + 1]
+        return math.degrees(math.atan2(b.y - a.y, b.x - a.x)) + 90
+
+    @staticmethod
+    def _segment_distance(point: Position, a: Position, b: Position) -> float:
+        dx, dy = b.x - a.x, b.y - a.y
+        if dx == 0 and dy == 0:
+            return math.sqrt((point.x - a.x) ** 2 + (point.y - a.y) ** 2)
+        t = max(0, min(1, ((point.x - a.x) * dx + (point.y - a.y) * dy) / (dx * dx + dy * dy)))
+        return math.sqrt((point.x - (a.x + t * dx)) ** 2 + (point.y - (a.y + t * dy)) ** 2)
+
+    def update(self, dt: float, player_pos: Position) -> None:
+        self.animation_time += dt * 2.0
+        for arrow in self.arrows:
+            if not arrow['visible']:
+                continue
+            dx = player_pos.x - arrow['pos'].x
+            dy = player_pos.y - arrow['pos'].y
+            if math.sqrt(dx * dx + dy * dy) < self.consumption_distance:
+                arrow['visible'] = False
+
+    def draw(self, screen: pg.Surface, camera: PositionCamera) -> None:
+        for i, arrow in enumerate(self.arrows):
+            if not arrow['visible']:
+                continue
+            screen_pos = camera.transform_position(arrow['pos'])
+            size = int(96 * (0.85 + 0.15 * math.sin(self.animation_time + i * 0.5)))
+            sprite = pg.transform.scale(pg.transform.rotate(self.image, -arrow['angle']), (size, size))
+            screen.blit(sprite, sprite.get_rect(center=screen_pos))
+
+    def is_complete(self) -> bool:
+        return all(not arrow['visible'] for arrow in self.arrows)
+
+
+def walk(path: list[Position]):
+    """Player positions, one per frame, walking the path at STEP pixels a frame"""
+    pos = Position(path[0].x, path[0].y)
+    for target in path[1:]:
+        while (pos.x, pos.y) != (target.x, target.y):
+            pos.x += max(-STEP, min(STEP, target.x - pos.x))
+            pos.y += max(-STEP, min(STEP, target.y - pos.y))
+            yield pos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--map", default="map.tmx")
+    parser.add_argument("--paths", type=int, default=20)
+    parser.add_argument("--min-length", type=int, default=60, help="Minimum path length in tiles")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    pg.display.init()
+    screen = pg.display.set_mode((GameSettings.SCREEN_WIDTH, GameSettings.SCREEN_HEIGHT))
+    from src.maps.map import Map
+    from src.interface.components.arrow_path import ArrowPath
+    grid = Map(args.map, [], Position(0, 0)).nav_grid()
+
+    rng = random.Random(args.seed)
+    free = [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.walkable(x, y)]
+    paths = []
+    for _ in range(args.paths * 200):
+        if len(paths) == args.paths:
+            break
+        goal = rng.choice(free)
+        tiles = FlowField(grid, goal).path_from(rng.choice(free))
+        if tiles and len(tiles) >= args.min_length:
+            full = Pathfinder.to_pixels(tiles)
+            paths.append((full, Pathfinder.simplify_path(full)))
+    print(f"{args.map}: {len(paths)} paths, average {sum(len(f) for f, _ in paths) / max(1, len(paths)):.0f} tiles")
+
+    results = {}
+    for name in ("original", "arrays"):
+        build = frames = update = draw = 0.0
+        consumed_frames = []
+        for full, simplified in paths:
+            start = time.perf_counter()
+            if name == "original":
+                arrows = OriginalArrows(full, simplified, pg.image.load("assets/images/ingame_ui/arrow.png"))
+            else:
+                arrows = ArrowPath(full, simplified)
+            build += time.perf_counter() - start
+
+            # Whole path in view: the camera looks at its middle, on a screen as large as the path
+            xs = [p.x for p in full]
+            ys = [p.y for p in full]
+            camera = PositionCamera(int(min(xs)) - 64, int(min(ys)) - 64)
+            canvas = pg.Surface((int(max(xs) - min(xs)) + 128, int(max(ys) - min(ys)) + 128))
+            start = time.perf_counter()
+            for _ in range(5):
+                arrows.draw(canvas, camera)
+            draw += (time.perf_counter() - start) / 5
+
+            n = 0
+            start = time.perf_counter()
+            for pos in walk(full):
+                arrows.update(1 / 60, pos)
+                n += 1
+                if arrows.is_complete():
+                    break
+            update += time.perf_counter() - start
+            frames += n
+            consumed_frames.append(n)
+            if name == "arrays":
+                expected = [a['angle'] for a in OriginalArrows(full, simplified, screen).arrows]
+                if list(arrows.arrow_angle) != expected:
+                    raise SystemExit("arrow angles differ from the original")
+        results[name] = consumed_frames
+        count = max(1, len(paths))
+        print(f"{name:9s} build {build * 1e3 / count:8.3f} ms/path   "
+              f"update {update * 1e6 / max(1, frames):8.2f} us/frame   draw {draw * 1e3 / count:8.3f} ms/frame")
+    if results["original"] != results["arrays"]:
+        raise SystemExit("paths were consumed after a different number of frames")
+
+
+if __name__ == "__main__":
+    main()
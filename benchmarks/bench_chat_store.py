@@ -0,0 +1,109 @@
+"""
+Compare the ring-buffer ChatStore (server/chatStore.py) with the original list-based one.
+
+Usage:
+    python -m benchmarks.bench_chat_store [--messages 10000] [--pollers 200]
+"""
+import argparse
+import threading
+import time
+
+from server.chatStore import ChatStore
+
+
+class ListChatStore:
+    """The original implementation: linear scan, copy-on-trim, global lock"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._messages: list[dict] = []
+
+    def add(self, sender_id: int, text: str) -> dict:
+        with self._lock:
+            msg = {"id": self._next_id, "from": sender_id, "text": text, "ts": time.time()}
+            self._messages.append(msg)
+            self._next_id += 1
+            if len(self._messages) > 1000:
+                self._messages = self._messages[-800:]
+            return msg
+
+    def list_since(self, since_id: int) -> list[dict]:
+        with self._lock:
+            if since_id <= 0:
+                return list(self._messages[-100:])
+            out = [m for m in self._messages if int(m.get("id", 0)) > since_id]
+            if len(out) > 200:
+                out = out[-200:]
+            return out
+
+
+def run_single(store, messages: int, pollers: int) -> tuple[float, float]:
+    """Every added message is followed by one list_since per poller. Returns (add us, poll us)."""
+    cursors = [0] * pollers
+    add_time = 0.0
+    poll_time = 0.0
+    for i in range(messages):
+        t0 = time.perf_counter()
+        store.add(i % 16, "hello world")
+        t1 = time.perf_counter()
+        for p in range(pollers):
+            got = store.list_since(cursors[p])
+            if got:
+                cursors[p] = got[-1]["id"]
+        poll_time += time.perf_counter() - t1
+        add_time += t1 - t0
+    return add_time / messages * 1e6, poll_time / (messages * pollers) * 1e6
+
+
+def run_threaded(store, messages: int, pollers: int) -> float:
+    """Writer latency (us) while reader threads poll continuously"""
+    stop = threading.Event()
+
+    def poll() -> None:
+        cursor = 0
+        while not stop.is_set():
+            got = store.list_since(cursor)
+            if got:
+                cursor = got[-1]["id"]
+
+    threads = [threading.Thread(target=poll, daemon=True) for _ in range(pollers)]
+    for t in threads:
+        t.start()
+    start = time.perf_counter()
+    for i in range(messages):
+        store.add(i % 16, "hello world")
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for t in threads:
+        t.join()
+    return elapsed / messages * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--pollers", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{args.messages} messages, {args.pollers} pollers")
+    print(f"{'store':<10}{'add us':>10}{'poll us':>10}{'add us (threads)':>20}")
+    for name, factory in (("list", ListChatStore), ("ring", ChatStore)):
+        add_us, poll_us = run_single(factory(), args.messages, args.pollers)
+        threaded_us = run_threaded(factory(), args.messages, args.threads)
+        print(f"{name:<10}{add_us:>10.2f}{poll_us:>10.2f}{threaded_us:>20.2f}")
+
+    # Worst case for the old store: a poller far behind walks the whole buffer
+    for name, factory in (("list", ListChatStore), ("ring", ChatStore)):
+        store = factory()
+        for i in range(args.messages):
+            store.add(0, "x")
+        start = time.perf_counter()
+        for _ in range(1000):
+            store.list_since(args.messages - 5)
+        print(f"{name:<10} list_since(latest - 5): {(time.perf_counter() - start) * 1e3:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
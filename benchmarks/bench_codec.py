@@ -0,0 +1,84 @@
+"""
+Compare the JSON and bin1 position encodings (server/protocol.py).
+
+Usage:
+    python -m benchmarks.bench_codec [--players 50] [--rounds 2000]
+"""
+import argparse
+import json
+import random
+import time
+
+from server.protocol import (
+    MapTable, DEFAULT_MAPS, DIRECTIONS,
+    encode_player_update, decode_player_update, encode_players, decode_players
+)
+
+
+def _time(fn, rounds: int) -> float:
+    """Average microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    maps = MapTable()
+    players = {
+        pid: {
+            "id": pid,
+            "x": rng.uniform(0, 4000),
+            "y": rng.uniform(0, 4000),
+            "map": rng.choice(DEFAULT_MAPS),
+            "direction": rng.choice(DIRECTIONS),
+            "is_moving": rng.random() < 0.5,
+        }
+        for pid in range(args.players)
+    }
+    update = {"type": "player_update", **{k: v for k, v in players[0].items() if k != "id"}}
+    timestamp = time.time()
+
+    rows = []
+
+    # player_update (client -> server)
+    json_update = json.dumps(update)
+    bin_update = encode_player_update(maps, update["x"], update["y"], update["map"], update["direction"], update["is_moving"])
+    rows.append((
+        "player_update", "json", len(json_update),
+        _time(lambda: json.dumps(update), args.rounds),
+        _time(lambda: json.loads(json_update), args.rounds),
+    ))
+    rows.append((
+        "player_update", "bin1", len(bin_update),
+        _time(lambda: encode_player_update(maps, update["x"], update["y"], update["map"], update["direction"], update["is_moving"]), args.rounds),
+        _time(lambda: decode_player_update(maps, bin_update), args.rounds),
+    ))
+
+    # players_update (server -> client)
+    json_players = json.dumps({"type": "players_update", "players": players, "timestamp": timestamp})
+    bin_players = encode_players(maps, "players_update", players, (), timestamp)
+    rows.append((
+        f"players_update x{args.players}", "json", len(json_players),
+        _time(lambda: json.dumps({"type": "players_update", "players": players, "timestamp": timestamp}), args.rounds),
+        _time(lambda: json.loads(json_players), args.rounds),
+    ))
+    rows.append((
+        f"players_update x{args.players}", "bin1", len(bin_players),
+        _time(lambda: encode_players(maps, "players_update", players, (), timestamp), args.rounds),
+        _time(lambda: decode_players(maps, bin_players), args.rounds),
+    ))
+
+    print(f"{'frame':<22}{'codec':<6}{'bytes':>8}{'encode us':>12}{'decode us':>12}")
+    for frame, codec, size, enc, dec in rows:
+        print(f"{frame:<22}{codec:<6}{size:>8}{enc:>12.2f}{dec:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+CPU use and send latency of OnlineManager's network thread.
+
+Runs a minimal server in a background thread that registers the client and timestamps every
+message it receives, then measures:
+    idle cpu  : process CPU time while connected with nothing to send (the game thread sleeps)
+    chat      : time from send_chat() to the server receiving the message
+    position  : time from update() with a new direction (always sent at once) to the server
+                receiving it
+Client and server share one process, so both ends read the same clock.
+
+Usage:
+    python -m benchmarks.bench_online_sender [--idle 5] [--samples 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from websockets.asyncio.server import serve
+
+from server.protocol import MapTable, decode_player_update, frame_type, FRAME_PLAYER_UPDATE
+from src.utils import GameSettings
+
+PORT = 8997
+DIRECTIONS = ("UP", "RIGHT", "DOWN", "LEFT")
+
+
+class Recorder:
+    """Server side: arrival time of every chat text and every (x, direction) position"""
+
+    def __init__(self) -> None:
+        self.arrivals: dict[tuple, float] = {}
+        self.ready = threading.Event()
+
+    async def handler(self, ws) -> None:
+        maps = MapTable([""])
+        await ws.send(json.dumps({"type": "registered", "id": 0}))
+        async for message in ws:
+            now = time.monotonic()
+            if isinstance(message, bytes):
+                if frame_type(message) != FRAME_PLAYER_UPDATE:
+                    continue
+                data = decode_player_update(maps, message)
+            else:
+                data = json.loads(message)
+            kind = data.get("type")
+            if kind == "hello":
+                await ws.send(json.dumps({"type": "hello_ack", "encoding": "json", "maps": maps.names}))
+            elif kind == "chat_send":
+                self.arrivals[("chat", data["text"])] = now
+            elif kind == "player_update":
+                self.arrivals[("pos", float(data["x"]), data["direction"])] = now
+
+    def run(self) -> None:
+        async def main() -> None:
+            async with serve(self.handler, "localhost", PORT):
+                self.ready.set()
+                await asyncio.Future()
+        asyncio.run(main())
+
+
+def wait_for(recorder: Recorder, key: tuple, timeout: float = 2.0) -> float | None:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        arrived = recorder.arrivals.get(key)
+        if arrived is not None:
+            return arrived
+        time.sleep(0.0005)
+    return None
+
+
+def percentiles(values: list[float]) -> str:
+    if not values:
+        return "no samples"
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e3
+    return f"p50 {pick(0.5):6.2f} ms  p99 {pick(0.99):6.2f} ms  ({len(values)} samples)"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--idle", type=float, default=5.0, help="Seconds of idle CPU measurement")
+    parser.add_argument("--samples", type=int, default=200, help="Chat and position sends to time")
+    args = parser.parse_args()
+
+    recorder = Recorder()
+    threading.Thread(target=recorder.run, daemon=True).start()
+    recorder.ready.wait()
+
+    GameSettings.ONLINE_SERVER_URL = f"http://localhost:{PORT}"
+    from src.core.managers.online_manager import OnlineManager
+    manager = OnlineManager()
+    manager.start()
+    while manager.player_id < 0:
+        time.sleep(0.01)
+    manager.update(0.0, 0.0, "map.tmx", "DOWN", False)
+    time.sleep(0.5)
+
+    cpu = time.process_time()
+    time.sleep(args.idle)
+    idle_cpu = (time.process_time() - cpu) / args.idle * 100
+
+    chat, position = [], []
+    for i in range(args.samples):
+        text = f"bench {i}"
+        sent = time.monotonic()
+        manager.send_chat(text)
+        arrived = wait_for(recorder, ("chat", text))
+        if arrived is not None:
+            chat.append(arrived - sent)
+
+        x, direction = float(i + 1), DIRECTIONS[i % len(DIRECTIONS)]
+        sent = time.monotonic()
+        manager.update(x, 0.0, "map.tmx", direction, True)
+        arrived = wait_for(recorder, ("pos", x, direction))
+        if arrived is not None:
+            position.append(arrived - sent)
+        time.sleep(0.01)
+    manager.stop()
+
+    print(f"idle cpu  {idle_cpu:6.2f} %")
+    print(f"chat      {percentiles(chat)}")
+    print(f"position  {percentiles(position)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Compare the A* pathfinder and the cached flow fields (src/utils/pathfinding.py) with the
+original BFS that copied the path into every queue entry and scanned the obstacle list for
+every neighbor.
+
+Plans long paths between random walkable tiles of a map, the way GameScene._start_navigation
+does (collision and bush tiles are obstacles), and checks all of them find paths of the same length.
+
+Usage:
+    python -m benchmarks.bench_pathfinding [--map map.tmx] [--paths 50] [--min-length 40]
+"""
+import argparse
+import os
+import random
+import time
+from collections import deque
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame as pg
+
+from src.utils import Position, GameSettings
+from src.utils.pathfinding import Pathfinder, NavGrid, FlowField
+
+
+def bfs_find_path(start: Position, goal: Position, collision_map: list[pg.Rect],
+                  map_width: int, map_height: int) -> list[Position] | None:
+    """The original implementation"""
+    start_tile = (int(start.x // GameSettings.TILE_SIZE), int(start.y // GameSettings.TILE_SIZE))
+    goal_tile = (int(goal.x // GameSettings.TILE_SIZE), int(goal.y // GameSettings.TILE_SIZE))
+    queue = deque([(start_tile, [start_tile])])
+    visited = {start_tile}
+    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    while queue:
+        current, path = queue.popleft()
+        if current == goal_tile:
+            return [
+                Position(x * GameSettings.TILE_SIZE + GameSettings.TILE_SIZE // 2,
+                         y * GameSettings.TILE_SIZE + GameSettings.TILE_SIZE // 2)
+                for x, y in path
+            ]
+        for dx, dy in directions:
+            nx, ny = current[0] + dx, current[1] + dy
+            if not (0 <= nx < map_width and 0 <= ny < map_height):
+                continue
+            if (nx, ny) in visited:
+                continue
+            tile_rect = pg.Rect(nx * GameSettings.TILE_SIZE, ny * GameSettings.TILE_SIZE,
+                                GameSettings.TILE_SIZE, GameSettings.TILE_SIZE)
+            if any(tile_rect.colliderect(r) for r in collision_map):
+                continue
+            visited.add((nx, ny))
+            queue.append(((nx, ny), path + [(nx, ny)]))
+    return None
+
+
+def pick_routes(grid: NavGrid, count: int, min_length: int, rng: random.Random) -> list[tuple]:
+    """Pairs of reachable tiles at least `min_length` steps apart"""
+    free = [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.walkable(x, y)]
+    routes = []
+    attempts = 0
+    while len(routes) < count and attempts < count * 200:
+        attempts += 1
+        a, b = rng.sample(free, 2)
+        if abs(a[0] - b[0]) + abs(a[1] - b[1]) < min_length:
+            continue
+        if Pathfinder.find_tile_path(a, b, grid) is None:
+            continue
+        routes.append((a, b))
+    return routes
+
+
+def center(tile: tuple[int, int]) -> Position:
+    return Position(tile[0] * GameSettings.TILE_SIZE + 1, tile[1] * GameSettings.TILE_SIZE + 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--map", default="map.tmx")
+    parser.add_argument("--paths", type=int, default=50)
+    parser.add_argument("--min-length", type=int, default=40, help="Minimum Manhattan distance in tiles")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    pg.display.init()
+    pg.display.set_mode((1, 1))
+    from src.maps.map import Map
+    game_map = Map(args.map, [], Position(0, 0))
+    obstacles = game_map._collision_map + game_map._bush_map
+    width, height = game_map.tmxdata.width, game_map.tmxdata.height
+
+    start = time.perf_counter()
+    grid = game_map.nav_grid()
+    grid_ms = (time.perf_counter() - start) * 1e3
+    routes = pick_routes(grid, args.paths, args.min_length, random.Random(args.seed))
+    print(f"{args.map}: {width}x{height} tiles, {len(obstacles)} obstacle rects, "
+          f"{len(routes)} routes of >= {args.min_length} tiles, grid built in {grid_ms:.2f} ms")
+
+    lengths = []
+    start = time.perf_counter()
+    for a, b in routes:
+        lengths.append(len(Pathfinder.find_path_on_grid(center(a), center(b), grid)))
+    astar_ms = (time.perf_counter() - start) * 1e3 / max(1, len(routes))
+
+    start = time.perf_counter()
+    for a, b in routes:
+        Pathfinder.find_path(center(a), center(b), obstacles, width, height)
+    astar_rects_ms = (time.perf_counter() - start) * 1e3 / max(1, len(routes))
+
+    # Flow fields: one per destination (as NavigationPanel offers a handful), every route walks one
+    goals = sorted({b for _, b in routes})[:4]
+    start = time.perf_counter()
+    fields = {goal: FlowField(grid, goal) for goal in goals}
+    field_build_ms = (time.perf_counter() - start) * 1e3 / max(1, len(goals))
+    starts = [a for a, _ in routes]
+    walks = 0
+    for goal, field in fields.items():
+        for a in starts:
+            tiles = field.path_from(a)
+            if tiles is not None:
+                walks += 1
+                if len(tiles) != len(Pathfinder.find_tile_path(a, goal, grid) or ()):
+                    raise SystemExit(f"flow field path from {a} to {goal} is not shortest")
+
+    start = time.perf_counter()
+    for goal, field in fields.items():
+        for a in starts:
+            field.path_from(a)
+    walk_ms = (time.perf_counter() - start) * 1e3 / max(1, walks)
+
+    mismatches = 0
+    start = time.perf_counter()
+    for (a, b), length in zip(routes, lengths):
+        path = bfs_find_path(center(a), center(b), obstacles, width, height)
+        mismatches += path is None or len(path) != length
+    bfs_ms = (time.perf_counter() - start) * 1e3 / max(1, len(routes))
+
+    avg = sum(lengths) / max(1, len(lengths))
+    print(f"average path length  {avg:7.1f} tiles")
+    print(f"bfs (original)       {bfs_ms:9.3f} ms/path")
+    print(f"a* from rects        {astar_rects_ms:9.3f} ms/path  (grid rebuilt every call)")
+    print(f"a* on nav grid       {astar_ms:9.3f} ms/path  ({bfs_ms / astar_ms if astar_ms else 0:.0f}x)")
+    print(f"flow field build     {field_build_ms:9.3f} ms/destination  (once, then cached)")
+    print(f"flow field walk      {walk_ms:9.3f} ms/path  ({walks} paths, all shortest)")
+    print(f"length mismatches    {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Compare the struct-of-arrays PlayerHandler (server/playerHandler.py) with the original
+dict-of-dataclasses one.
+
+Usage:
+    python -m benchmarks.bench_player_handler [--players 1000 10000] [--ticks 60] [--churn 20000]
+"""
+import argparse
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+from server.playerHandler import PlayerHandler
+from server.protocol import MapTable, encode_players, encode_players_columns
+
+MAPS = ("map.tmx", "new_map.tmx", "gym.tmx", "gym_new.tmx")
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+
+
+@dataclass
+class DictPlayer:
+    id: int
+    x: float
+    y: float
+    map: str
+    last_update: float
+    direction: str = "DOWN"
+    is_moving: bool = False
+
+
+class DictPlayerHandler:
+    """The original implementation: dict of dataclasses behind one lock, dict-of-dicts snapshots"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.players: dict[int, DictPlayer] = {}
+        self._next_id = 0
+        self._available_ids: list[int] = []
+
+    def register(self) -> int:
+        with self._lock:
+            if self._available_ids:
+                pid = self._available_ids.pop(0)
+            else:
+                pid = self._next_id
+                self._next_id += 1
+            self.players[pid] = DictPlayer(pid, 0.0, 0.0, "", time.monotonic())
+            return pid
+
+    def unregister(self, pid: int) -> bool:
+        with self._lock:
+            if pid in self.players:
+                del self.players[pid]
+                if pid not in self._available_ids:
+                    self._available_ids.append(pid)
+                    self._available_ids.sort()
+                return True
+            return False
+
+    def update(self, pid: int, x: float, y: float, map_name: str, direction: str = "DOWN", is_moving: bool = False) -> bool:
+        with self._lock:
+            p = self.players.get(pid)
+            if not p:
+                return False
+            if x != p.x or y != p.y or map_name != p.map:
+                p.last_update = time.monotonic()
+            p.x, p.y, p.map, p.direction, p.is_moving = float(x), float(y), str(map_name), direction, is_moving
+            return True
+
+    def list_players(self) -> dict:
+        with self._lock:
+            return {p.id: {
+                "id": p.id, "x": p.x, "y": p.y, "map": p.map,
+                "direction": p.direction, "is_moving": p.is_moving
+            } for p in self.players.values()}
+
+
+def make_updates(players: int, ticks: int, moving_share: float) -> list[list[tuple]]:
+    """Per tick, the (pid, x, y, map, direction, moving) updates that arrive; idle players resend their position"""
+    rng = random.Random(1)
+    state = [[rng.uniform(0, 3000), rng.uniform(0, 3000), rng.choice(MAPS)] for _ in range(players)]
+    out = []
+    for _ in range(ticks):
+        batch = []
+        for pid, s in enumerate(state):
+            moving = rng.random() < moving_share
+            if moving:
+                s[0] += rng.choice((-4.0, 4.0))
+                s[1] += rng.choice((-4.0, 4.0))
+            batch.append((pid, s[0], s[1], s[2], rng.choice(DIRECTIONS) if moving else "DOWN", moving))
+        out.append(batch)
+    return out
+
+
+def bench(handler, updates: list[list[tuple]], snapshot) -> tuple[float, float, float]:
+    """Returns (register us/player, update us/player, snapshot + changed-set ms/tick)"""
+    players = len(updates[0])
+    start = time.perf_counter()
+    for _ in range(players):
+        handler.register()
+    register_us = (time.perf_counter() - start) / players * 1e6
+
+    update_time = 0.0
+    snapshot_time = 0.0
+    for batch in updates:
+        t0 = time.perf_counter()
+        for pid, x, y, map_name, direction, moving in batch:
+            handler.update(pid, x, y, map_name, direction, moving)
+        t1 = time.perf_counter()
+        snapshot(handler)
+        snapshot_time += time.perf_counter() - t1
+        update_time += t1 - t0
+    ticks = len(updates)
+    return register_us, update_time / (ticks * players) * 1e6, snapshot_time / ticks * 1e3
+
+
+class DictSnapshot:
+    """The old tick: copy every player into dicts, diff against the previous copy, encode"""
+
+    def __init__(self) -> None:
+        self.maps = MapTable()
+        self.previous: dict[int, dict] = {}
+
+    def __call__(self, handler: DictPlayerHandler) -> None:
+        players = handler.list_players()
+        previous = self.previous
+        _changed = [pid for pid, p in players.items() if previous.get(pid) != p]
+        self.previous = players
+        encode_players(self.maps, "players_update", players, (), time.time())
+
+
+def bench_churn(handler, players: int, churn: int) -> float:
+    """With `players` connected, disconnect a random player and connect a new one `churn` times. Returns us per cycle."""
+    rng = random.Random(2)
+    # Leave a pool of free ids around, like a server after a wave of disconnects
+    for pid in range(0, players, 2):
+        handler.unregister(pid)
+    start = time.perf_counter()
+    for _ in range(churn):
+        handler.unregister(rng.randrange(players))
+        handler.register()
+    return (time.perf_counter() - start) / churn * 1e6
+
+
+def snapshot_columns(handler: PlayerHandler) -> None:
+    """The new tick: take the dirty bitmap and pack every active row straight from the columns"""
+    _changed, _maps = handler.take_dirty()
+    encode_players_columns(
+        "players_update", handler.active_ids(), handler.xs, handler.ys,
+        handler.map_ids, handler.directions, handler.moving, (), time.time()
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--ticks", type=int, default=60)
+    parser.add_argument("--churn", type=int, default=20000, help="Disconnect/connect cycles")
+    parser.add_argument("--moving", type=float, default=0.2, help="Share of players moving each tick")
+    args = parser.parse_args()
+
+    print(f"{args.ticks} ticks, {args.moving:.0%} of players moving")
+    print(f"{'players':>8}  {'handler':<10}{'register us':>12}{'update us':>12}{'snapshot ms':>14}{'churn us':>10}")
+    for players in args.players:
+        updates = make_updates(players, args.ticks, args.moving)
+        rows = (
+            ("dict", DictPlayerHandler(), DictSnapshot()),
+            ("arrays", PlayerHandler(), snapshot_columns),
+        )
+        for name, handler, snapshot in rows:
+            register_us, update_us, snapshot_ms = bench(handler, updates, snapshot)
+            churn_us = bench_churn(handler, players, args.churn)
+            print(f"{players:>8}  {name:<10}{register_us:>12.2f}{update_us:>12.2f}{snapshot_ms:>14.2f}{churn_us:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Save latency of GameManager.save (binary sections, src/utils/save_file.py) against the original,
+which dumped the whole to_dict() as indented JSON on every save.
+
+Loads saves/game0.json, grows the bag to each size (copies of its monsters and distinct items),
+then times on the game thread:
+    original : json.dump(to_dict(), indent=2)
+    first    : the first binary save, every section encoded
+    moved    : a save after the player moved (the usual case: only the small game section)
+    hp       : a save after one monster's hp changed (the bag section is encoded again)
+    written  : as hp, but also waiting for the save writer to put it on disk
+Binary saves are written on the save writer's thread; a burst of back-to-back saves is timed
+too, with how many writes it took. Every binary save is loaded back and checked against to_dict().
+
+Usage:
+    python -m benchmarks.bench_save [--sizes 10 100 1000 10000] [--repeat 20] [--no-sync]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame as pg
+
+from src.utils import save_file
+
+
+def original_save(gm, path: str) -> None:
+    """The original implementation"""
+    if gm.player is not None:
+        gm.player_spawns[gm.current_map_key] = gm.player.position.copy()
+    with open(path, "w") as f:
+        json.dump(gm.to_dict(), f, indent=2)
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1e3 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000], help="Monsters in the bag")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--no-sync", action="store_true", help="Skip fsync in the binary saves")
+    args = parser.parse_args()
+
+    pg.display.init()
+    pg.display.set_mode((1, 1))
+    from src.core import GameManager
+    from src.core.services import save_writer
+
+    if args.no_sync:
+        write = save_file.write_sections
+        save_file.write_sections = lambda path, sections, sync=True: write(path, sections, False)
+
+    tmp = tempfile.mkdtemp()
+    json_path = os.path.join(tmp, "game0.json")
+    sav_path = os.path.join(tmp, "game0.sav")
+    print(f"{'monsters':>8} {'json KB':>8} {'sav KB':>8} {'original':>10} {'first':>10} "
+          f"{'moved':>10} {'hp':>10} {'written':>10}  (ms/save)   burst of {args.repeat}")
+    for size in args.sizes:
+        gm = GameManager.load("saves/game0.json")
+        template = [dict(m) for m in gm.bag.monsters]
+        for i in range(size - len(gm.bag.monsters)):
+            monster = dict(template[i % len(template)])
+            monster["moves"] = list(monster.get("moves", []))
+            gm.bag.add_monster(monster)
+        for i in range(size // 10):
+            gm.bag.add_item(f"Item {i}", 1 + i % 5, "ingame_ui/potion.png", 10 + i)
+
+        original_ms = timed(lambda: original_save(gm, json_path), args.repeat)
+
+        start = time.perf_counter()
+        gm.save(sav_path)
+        first_ms = (time.perf_counter() - start) * 1e3
+
+        def move():
+            gm.player.position.x += 1
+            gm.save(sav_path)
+        moved_ms = timed(move, args.repeat)
+
+        def hurt():
+            gm.bag.monsters[-1]["hp"] -= 1
+            gm.save(sav_path)
+        hp_ms = timed(hurt, args.repeat)
+        save_writer.flush()
+
+        def hurt_and_wait():
+            hurt()
+            save_writer.flush()
+        written_ms = timed(hurt_and_wait, args.repeat)
+
+        writes = save_writer.writes
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            hurt()
+        burst_ms = (time.perf_counter() - start) * 1e3
+        save_writer.flush()
+        burst_writes = save_writer.writes - writes
+
+        gm.player_spawns[gm.current_map_key] = gm.player.position.copy()
+        if GameManager.load(sav_path).to_dict() != gm.to_dict():
+            raise SystemExit("binary save does not load back to the same game")
+        print(f"{size:8d} {os.path.getsize(json_path) / 1024:8.1f} {os.path.getsize(sav_path) / 1024:8.1f} "
+              f"{original_ms:10.3f} {first_ms:10.3f} {moved_ms:10.3f} {hp_ms:10.3f} {written_ms:10.3f}"
+              f"   {burst_ms:7.2f} ms, {burst_writes} write(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Frame time across the scene transitions that save and reload the game: a bush encounter
+(GameScene saves, CatchPokemonScene.enter loads) and the way back (the battle saves,
+GameScene.enter loads).
+
+Each transition is two frames: the one that saves and requests the switch, and the one in
+which the scene manager switches and the new scene reloads the save. Timed both ways:
+    waited : load() first waits for the save writer to put the save on disk (the earlier behavior)
+    memory : load() reads the save still on its way to disk from the save writer (current)
+
+Usage:
+    python -m benchmarks.bench_save_transition [--monsters 10 1000] [--repeat 10]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame as pg
+
+from src.utils import GameSettings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--monsters", type=int, nargs="+", default=[10, 1000], help="Monsters in the bag")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    pg.init()
+    pg.display.set_mode((GameSettings.SCREEN_WIDTH, GameSettings.SCREEN_HEIGHT))
+    tmp = tempfile.mkdtemp()
+    shutil.copy("saves/game0.json", os.path.join(tmp, "game0.json"))
+    GameSettings.SAVE_PATH = os.path.join(tmp, "game0.sav")
+
+    from src.core.services import scene_manager, save_writer
+    from src.core import GameManager
+    from src.scenes.game_scene import GameScene
+    from src.scenes.catch_pokemon_scene import CatchPokemonScene
+
+    print(f"{'monsters':>8} {'mode':>7} {'to catch: save':>15} {'switch':>8} {'to game: save':>14} {'switch':>8}  (ms, median)")
+    for size in args.monsters:
+        gm = GameManager.load(GameSettings.SAVE_PATH)
+        template = [dict(m) for m in gm.bag.monsters]
+        for i in range(size - len(gm.bag.monsters)):
+            gm.bag.add_monster(dict(template[i % len(template)]))
+        gm.save(GameSettings.SAVE_PATH)
+        save_writer.flush()
+
+        game = GameScene()
+        catch = CatchPokemonScene(game.game_manager)
+        scene_manager._scenes.clear()
+        scene_manager.register_scene("game", game)
+        scene_manager.register_scene("catch_pokemon", catch)
+        scene_manager.change_scene("game")
+        scene_manager.update(1 / 60)
+
+        for mode in ("waited", "memory"):
+            times: dict[str, list[float]] = {"to catch": [], "to catch switch": [], "to game": [], "to game switch": []}
+            for _ in range(args.repeat):
+                for scene, target, label in ((game, "catch_pokemon", "to catch"), (catch, "game", "to game")):
+                    start = time.perf_counter()
+                    scene.game_manager.bag.monsters[-1]["hp"] -= 1
+                    scene.game_manager.save(GameSettings.SAVE_PATH)
+                    scene_manager.change_scene(target)
+                    times[label].append(time.perf_counter() - start)
+
+                    start = time.perf_counter()
+                    if mode == "waited":
+                        save_writer.flush(GameSettings.SAVE_PATH)
+                    scene_manager.update(1 / 60)
+                    times[label + " switch"].append(time.perf_counter() - start)
+                    save_writer.flush()
+            med = {k: statistics.median(v) * 1e3 for k, v in times.items()}
+            print(f"{size:8d} {mode:>7} {med['to catch']:15.2f} {med['to catch switch']:8.2f} "
+                  f"{med['to game']:14.2f} {med['to game switch']:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Load test for the sharded server: how many position frames per second reach clients as the
+number of shard processes grows.
+
+Starts `python server.py --shards N` for each N (0 = the single-process server), connects
+simulated clients spread evenly over the four maps from several client processes, lets every
+client walk and report its position, and counts the players_update / players_delta frames
+received. Run on a machine with at least as many free cores as shards + client processes.
+
+Usage:
+    python -m benchmarks.bench_shards [--shards 0 1 2 4] [--clients 400] [--duration 10]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+
+import websockets
+
+from server.protocol import DEFAULT_MAPS
+
+PORT = 8989
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def _client(index: int, duration: float, rate: float, totals: dict) -> None:
+    rng = random.Random(index)
+    map_name = DEFAULT_MAPS[index % len(DEFAULT_MAPS)]
+    x, y = rng.uniform(0, 2000), rng.uniform(0, 2000)
+    async with websockets.connect(f"ws://localhost:{PORT}", max_size=None) as ws:
+        async def receive() -> None:
+            async for message in ws:
+                data = json.loads(message)
+                if data.get("type") in ("players_update", "players_delta"):
+                    totals["frames"] += 1
+                    totals["bytes"] += len(message)
+
+        receiver = asyncio.create_task(receive())
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            x += rng.choice((-4.0, 0.0, 4.0))
+            y += rng.choice((-4.0, 0.0, 4.0))
+            await ws.send(json.dumps({
+                "type": "player_update", "x": x, "y": y, "map": map_name,
+                "direction": "DOWN", "is_moving": True
+            }))
+            totals["sent"] += 1
+            await asyncio.sleep(1.0 / rate)
+        receiver.cancel()
+
+
+def _client_process(first: int, count: int, duration: float, rate: float, results) -> None:
+    totals = {"frames": 0, "bytes": 0, "sent": 0}
+
+    async def run() -> None:
+        await asyncio.gather(*(_client(first + i, duration, rate, totals) for i in range(count)),
+                             return_exceptions=True)
+
+    asyncio.run(run())
+    results.put(totals)
+
+
+def run(shards: int, clients: int, processes: int, duration: float, rate: float) -> dict:
+    args = [sys.executable, "server.py"] + (["--shards", str(shards)] if shards else [])
+    server = subprocess.Popen(args, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(1.5)
+        results = multiprocessing.Queue()
+        per_process = clients // processes
+        workers = [
+            multiprocessing.Process(target=_client_process, args=(i * per_process, per_process, duration, rate, results))
+            for i in range(processes)
+        ]
+        for w in workers:
+            w.start()
+        totals = {"frames": 0, "bytes": 0, "sent": 0}
+        for _ in workers:
+            for key, value in results.get(timeout=duration + 60).items():
+                totals[key] += value
+        for w in workers:
+            w.join()
+    finally:
+        server.terminate()
+        server.wait()
+    return {key: value / duration for key, value in totals.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shards", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--clients", type=int, default=400)
+    parser.add_argument("--processes", type=int, default=4, help="Client processes generating the load")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--rate", type=float, default=20.0, help="Position updates per client per second")
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients over {len(DEFAULT_MAPS)} maps, {args.rate:g} updates/s each, "
+          f"{args.duration:g}s per run, {os.cpu_count()} cores")
+    print(f"{'shards':>7}{'updates/s':>12}{'frames/s':>12}{'KB/s':>10}")
+    for shards in args.shards:
+        rates = run(shards, args.clients, args.processes, args.duration, args.rate)
+        print(f"{shards:>7}{rates['sent']:>12.0f}{rates['frames']:>12.0f}{rates['bytes'] / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""
+Headless load generator for server.py.
+
+Connects simulated clients that speak the same protocol as OnlineManager (server/protocol.py,
+JSON or bin1) without pygame. Every client random-walks the walkable tiles of a real map,
+reports its position at --rate Hz and posts chat at --chat-rate messages per minute.
+
+The client count is ramped through --clients; each step is measured for --duration seconds:
+    latency   : time from a client sending a position to another client receiving it (p50/p99).
+                All clients live in this process, so send and receive share one clock.
+    traffic   : bytes per second sent and received by the clients
+    server    : CPU share and broadcast tick timing from the server's "stats" request, made on
+                its stats path so the measurement does not add a player. With --shards
+                the tick figures and CPU time are summed over the worker processes.
+    slipping  : more than --late-threshold of the ticks ran late; the first such step is the
+                point where the 60 Hz tick can no longer keep up
+Results are written as JSON to --output so runs can be compared.
+
+Usage:
+    python server.py &
+    python -m benchmarks.load_test --clients 50 100 200 400 --duration 10 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # pytmx pulls in pygame; no window is opened
+import pytmx
+import websockets
+
+from server.protocol import (
+    MapTable, ENCODING_BIN1, ENCODING_JSON, STATS_PATH, encode_player_update, decode_players
+)
+
+TILE_SIZE = 64
+MAPS_DIR = os.path.join("assets", "maps")
+MAP_FILES = ("map.tmx", "new_map.tmx", "gym.tmx", "gym_new.tmx")
+SENT_HISTORY = 5.0  # Seconds a sent position is kept for latency matching
+
+
+def load_walkable(path: str) -> tuple[int, int, list[tuple[int, int]]]:
+    """(width, height, walkable tiles) using the same collision layers as src/maps/map.py"""
+    tmx = pytmx.TiledMap(path)  # No image loader: tile data only
+    blocked: set[tuple[int, int]] = set()
+    for layer in tmx.visible_layers:
+        if isinstance(layer, pytmx.TiledTileLayer):
+            name = layer.name.lower()
+            if "collision" in name or "house" in name:
+                blocked.update((x, y) for x, y, gid in layer if gid)
+    walkable = [(x, y) for y in range(tmx.height) for x in range(tmx.width) if (x, y) not in blocked]
+    return tmx.width, tmx.height, walkable
+
+
+class Walker:
+    """Random walk over walkable tiles, moving `speed` tiles per second"""
+
+    def __init__(self, rng: random.Random, walkable: list[tuple[int, int]], speed: float):
+        self.rng = rng
+        self.walkable = set(walkable)
+        self.speed = speed * TILE_SIZE
+        self.tile = rng.choice(walkable)
+        self.x = float(self.tile[0] * TILE_SIZE)
+        self.y = float(self.tile[1] * TILE_SIZE)
+        self.direction = "DOWN"
+        self.target = self.tile
+
+    def step(self, dt: float) -> None:
+        tx, ty = self.target[0] * TILE_SIZE, self.target[1] * TILE_SIZE
+        dx, dy = tx - self.x, ty - self.y
+        dist = abs(dx) + abs(dy)
+        move = self.speed * dt
+        if dist <= move:
+            self.x, self.y = float(tx), float(ty)
+            self.tile = self.target
+            self._pick_target()
+            return
+        if dx:
+            self.x += move if dx > 0 else -move
+        else:
+            self.y += move if dy > 0 else -move
+
+    def _pick_target(self) -> None:
+        x, y = self.tile
+        options = [
+            (d, (x + ox, y + oy)) for d, ox, oy in (("UP", 0, -1), ("DOWN", 0, 1), ("LEFT", -1, 0), ("RIGHT", 1, 0))
+            if (x + ox, y + oy) in self.walkable
+        ]
+        if not options:
+            return
+        # Mostly keep going straight so paths look like players, not noise
+        straight = [o for o in options if o[0] == self.direction]
+        self.direction, self.target = straight[0] if straight and self.rng.random() < 0.8 else self.rng.choice(options)
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.latencies: list[float] = []
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.frames_in = 0
+        self.updates_out = 0
+        self.chat_out = 0
+        self.chat_in = 0
+        self.errors = 0
+
+    def reset(self) -> None:
+        self.__init__()
+
+
+class SimClient:
+    def __init__(self, index: int, args: argparse.Namespace, map_name: str, walkable: list[tuple[int, int]],
+                 sent: dict[int, dict[tuple[float, float], float]], metrics: Metrics):
+        self.index = index
+        self.args = args
+        self.map_name = map_name
+        self.rng = random.Random(index)
+        self.walker = Walker(self.rng, walkable, args.speed)
+        self.sent = sent
+        self.metrics = metrics
+        self.player_id = -1
+        self.maps = MapTable()
+        self.encoding = ENCODING_JSON
+        self.seen: dict[int, tuple[float, float]] = {}
+        self.stopped = asyncio.Event()
+
+    def _key(self, x: float, y: float) -> tuple[float, float]:
+        return round(x, 1), round(y, 1)
+
+    async def run(self) -> None:
+        try:
+            async with websockets.connect(self.args.url, max_size=None) as ws:
+                if self.args.encoding == ENCODING_BIN1:
+                    await ws.send(json.dumps({"type": "hello", "encodings": [ENCODING_BIN1, ENCODING_JSON]}))
+                receiver = asyncio.create_task(self._receive(ws))
+                try:
+                    await self._send_loop(ws)
+                finally:
+                    receiver.cancel()
+        except (OSError, websockets.exceptions.WebSocketException):
+            self.metrics.errors += 1
+
+    async def _send_loop(self, ws) -> None:
+        interval = 1.0 / self.args.rate
+        chat_interval = 60.0 / self.args.chat_rate if self.args.chat_rate > 0 else None
+        next_chat = time.monotonic() + (self.rng.uniform(0, chat_interval) if chat_interval else 0)
+        last = time.monotonic()
+        while not self.stopped.is_set():
+            now = time.monotonic()
+            self.walker.step(now - last)
+            last = now
+            w = self.walker
+            frame = None
+            if self.encoding == ENCODING_BIN1:
+                frame = encode_player_update(self.maps, w.x, w.y, self.map_name, w.direction, True)
+            if frame is None:
+                frame = json.dumps({
+                    "type": "player_update", "x": w.x, "y": w.y, "map": self.map_name,
+                    "direction": w.direction, "is_moving": True
+                })
+            if self.player_id >= 0:
+                self.sent.setdefault(self.player_id, {})[self._key(w.x, w.y)] = time.monotonic()
+            await ws.send(frame)
+            self.metrics.bytes_out += len(frame)
+            self.metrics.updates_out += 1
+
+            if chat_interval and now >= next_chat:
+                text = f"load {self.index}"
+                await ws.send(json.dumps({"type": "chat_send", "text": text}))
+                self.metrics.chat_out += 1
+                next_chat = now + self.rng.expovariate(1.0 / chat_interval)
+            try:
+                await asyncio.wait_for(self.stopped.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _receive(self, ws) -> None:
+        async for message in ws:
+            now = time.monotonic()
+            self.metrics.bytes_in += len(message)
+            if isinstance(message, bytes):
+                data = decode_players(self.maps, message)
+            else:
+                data = json.loads(message)
+            kind = data.get("type")
+            if kind == "registered":
+                self.player_id = int(data["id"])
+            elif kind in ("hello_ack", "map_ids"):
+                self.maps = MapTable(data.get("maps", []))
+                if kind == "hello_ack":
+                    self.encoding = data.get("encoding", ENCODING_JSON)
+            elif kind == "chat_update":
+                self.metrics.chat_in += len(data.get("messages", []))
+            elif kind in ("players_update", "players_delta"):
+                self.metrics.frames_in += 1
+                self._record(data, now)
+
+    def _record(self, data: dict, now: float) -> None:
+        for key, p in data.get("players", {}).items():
+            pid = int(key)
+            if pid == self.player_id:
+                continue
+            pos = self._key(float(p["x"]), float(p["y"]))
+            # Snapshots repeat unchanged players; only new positions say anything about latency
+            if self.seen.get(pid) == pos:
+                continue
+            self.seen[pid] = pos
+            sent_at = self.sent.get(pid, {}).get(pos)
+            if sent_at is not None:
+                self.metrics.latencies.append(now - sent_at)
+
+
+async def server_stats(url: str) -> dict | None:
+    try:
+        async with websockets.connect(url.rstrip("/") + STATS_PATH, max_size=None) as ws:
+            await ws.send(json.dumps({"type": "stats"}))
+            return json.loads(await ws.recv())
+    except (OSError, websockets.exceptions.WebSocketException):
+        return None
+    return None
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(clients: int, duration: float, metrics: Metrics, before: dict | None, after: dict | None,
+              late_threshold: float) -> dict:
+    step = {
+        "clients": clients,
+        "duration": duration,
+        "latency_ms": {
+            "samples": len(metrics.latencies),
+            "p50": (percentile(metrics.latencies, 0.50) or 0) * 1e3,
+            "p99": (percentile(metrics.latencies, 0.99) or 0) * 1e3,
+            "max": max(metrics.latencies, default=0) * 1e3,
+        },
+        "bytes_in_per_s": metrics.bytes_in / duration,
+        "bytes_out_per_s": metrics.bytes_out / duration,
+        "frames_in_per_s": metrics.frames_in / duration,
+        "updates_out_per_s": metrics.updates_out / duration,
+        "chat_out": metrics.chat_out,
+        "chat_in": metrics.chat_in,
+        "connect_errors": metrics.errors,
+    }
+    if before and after:
+        ticks = after["ticks"] - before["ticks"]
+        late = after["late_ticks"] - before["late_ticks"]
+        step["server"] = {
+            "players": after["players"],
+            "cpu_percent": (after["cpu_time"] - before["cpu_time"]) / duration * 100,
+            "ticks": ticks,
+            "mean_tick_interval_ms": (after["tick_interval_total"] - before["tick_interval_total"]) / ticks * 1e3 if ticks else None,
+            "mean_tick_work_ms": (after["tick_work_total"] - before["tick_work_total"]) / ticks * 1e3 if ticks else None,
+            "late_tick_share": late / ticks if ticks else None,
+        }
+        step["slipping"] = bool(ticks) and late / ticks > late_threshold
+    return step
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    maps = {}
+    for name in MAP_FILES:
+        maps[name] = load_walkable(os.path.join(MAPS_DIR, name))[2]
+
+    sent: dict[int, dict[tuple[float, float], float]] = {}
+    metrics = Metrics()
+    clients: list[SimClient] = []
+    tasks: list[asyncio.Task] = []
+    steps = []
+    process_start = time.process_time()
+
+    async def prune_sent() -> None:
+        while True:
+            await asyncio.sleep(1.0)
+            cutoff = time.monotonic() - SENT_HISTORY
+            for history in sent.values():
+                for key in [k for k, t in history.items() if t < cutoff]:
+                    del history[key]
+
+    pruner = asyncio.create_task(prune_sent())
+    try:
+        for target in args.clients:
+            while len(clients) < target:
+                index = len(clients)
+                name = MAP_FILES[index % len(MAP_FILES)] if args.map == "all" else args.map
+                client = SimClient(index, args, name, maps[name], sent, metrics)
+                clients.append(client)
+                tasks.append(asyncio.create_task(client.run()))
+                if index % 50 == 49:
+                    await asyncio.sleep(0.05)  # Do not hit the accept queue with everything at once
+            await asyncio.sleep(args.warmup)
+
+            before = await server_stats(args.url)
+            metrics.reset()
+            step_cpu = time.process_time()
+            await asyncio.sleep(args.duration)
+            after = await server_stats(args.url)
+            step = summarize(target, args.duration, metrics, before, after, args.late_threshold)
+            step["generator_cpu_percent"] = (time.process_time() - step_cpu) / args.duration * 100
+            steps.append(step)
+            print(format_step(step))
+    finally:
+        for client in clients:
+            client.stopped.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        pruner.cancel()
+
+    first_slip = next((s["clients"] for s in steps if s.get("slipping")), None)
+    return {
+        "url": args.url,
+        "encoding": args.encoding,
+        "rate": args.rate,
+        "chat_rate": args.chat_rate,
+        "map": args.map,
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "generator_cpu_seconds": time.process_time() - process_start,
+        "first_slipping_step": first_slip,
+        "steps": steps,
+    }
+
+
+def format_step(step: dict) -> str:
+    line = (f"{step['clients']:>6} clients  p50 {step['latency_ms']['p50']:6.1f} ms  p99 {step['latency_ms']['p99']:6.1f} ms  "
+            f"in {step['bytes_in_per_s'] / 1024:8.0f} KB/s  out {step['bytes_out_per_s'] / 1024:6.0f} KB/s")
+    server = step.get("server")
+    if server:
+        interval = server["mean_tick_interval_ms"]
+        line += (f"  server cpu {server['cpu_percent']:5.1f}%  tick {interval or 0:5.1f} ms  "
+                 f"late {(server['late_tick_share'] or 0):5.1%}{'  SLIPPING' if step['slipping'] else ''}")
+    if step["generator_cpu_percent"] > 90:
+        line += "  (generator saturated)"
+    return line
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test for the Monster Go online server")
+    parser.add_argument("--url", default="ws://localhost:8989")
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 50, 100, 200],
+                        help="Client counts to ramp through")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds measured per step")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds between reaching a step and measuring it")
+    parser.add_argument("--rate", type=float, default=60.0, help="Position updates per client per second")
+    parser.add_argument("--chat-rate", type=float, default=1.0, help="Chat messages per client per minute")
+    parser.add_argument("--speed", type=float, default=4.0, help="Walking speed in tiles per second")
+    parser.add_argument("--encoding", choices=(ENCODING_JSON, ENCODING_BIN1), default=ENCODING_BIN1)
+    parser.add_argument("--map", choices=("all",) + MAP_FILES, default="all",
+                        help="Put every client on one map, or spread them over all of them")
+    parser.add_argument("--late-threshold", type=float, default=0.05,
+                        help="Share of late ticks above which a step counts as slipping")
+    parser.add_argument("--output", default="load_test_results.json")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    if results["first_slipping_step"] is not None:
+        print(f"Tick starts slipping at {results['first_slipping_step']} clients")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,124 +1,147 @@
+import argparse
 import asyncio
 import json
 import time
-import threading
-from typing import Set, Any
+from typing import Dict, Any
 from server.playerHandler import PlayerHandler
+from server.chatStore import ChatStore, HISTORY_PAGE
+from server.chatLog import ChatLog
+from server.broadcaster import Broadcaster, TickStats, BROADCAST_MODES
+from server.spatialGrid import SpatialGrid, cell_size_for
+from server.shardRouter import ShardRouter
+from server.fanout import ClientSession, FRAME_DELTA, FRAME_SNAPSHOT, fan_out, queue_stats
+from server.protocol import ENCODING_JSON, FRAME_PLAYER_UPDATE, STATS_PATH, negotiate, frame_type, decode_player_update
 
 from websockets.asyncio.server import serve
 
 PORT = 8989
+TICK_INTERVAL = 0.0167  # 60 updates per second (--tick-rate)
+STATS_INTERVAL = 10.0   # Seconds between broadcast statistics reports
 
 PLAYER_HANDLER = PlayerHandler()
-PLAYER_HANDLER.start()
-
-# ------------------------------
-# Simple in-memory chat storage
-# ------------------------------
-class ChatStore:
-    def __init__(self) -> None:
-        self._lock = threading.Lock()
-        self._next_id = 1
-        self._messages: list[dict] = []
-
-    def add(self, sender_id: int, text: str) -> dict:
-        # Sanitize
-        t = (text or "").strip()
-        if len(t) > 200:
-            t = t[:200]
-        if not t:
-            raise ValueError("empty")
-        with self._lock:
-            msg = {
-                "id": self._next_id,
-                "from": sender_id,
-                "text": t,
-                "ts": time.time(),
-            }
-            self._messages.append(msg)
-            self._next_id += 1
-            # Keep only the last N to avoid unbounded growth
-            if len(self._messages) > 1000:
-                self._messages = self._messages[-800:]
-            return msg
-
-    def list_since(self, since_id: int) -> list[dict]:
-        with self._lock:
-            if since_id <= 0:
-                return list(self._messages[-100:])  # cap response size
-            # Find first index with id > since_id
-            # Messages are appended in increasing id order
-            out: list[dict] = []
-            for m in self._messages:
-                if int(m.get("id", 0)) > since_id:
-                    out.append(m)
-            # Cap size
-            if len(out) > 200:
-                out = out[-200:]
-            return out
-
-    def clear(self) -> None:
-        """Clear all chat messages"""
-        with self._lock:
-            self._messages.clear()
-            self._next_id = 1
 
 CHAT = ChatStore()
 
-# Track connected clients
-CONNECTED_CLIENTS: Set[Any] = set()
-CLIENTS_LOCK = asyncio.Lock()
+BROADCASTER = Broadcaster(maps=PLAYER_HANDLER.maps)
+TICK_STATS = TickStats(TICK_INTERVAL)
+
+# Set by --shards: players and broadcasts then live in worker processes, one per group of maps
+ROUTER: ShardRouter | None = None
+
+# Track connected clients (websocket -> outbound session)
+CONNECTED_CLIENTS: Dict[Any, ClientSession] = {}
 
 
 async def broadcast_player_update():
-    """Broadcast player list to all connected clients periodically"""
+    """Broadcast player updates to connected clients periodically"""
+    last_report = time.monotonic()
+    known_maps = len(BROADCASTER.maps.names)
+    last_tick = time.monotonic()
     while True:
-        await asyncio.sleep(0.0167)  # 60 updates per second
-        players = PLAYER_HANDLER.list_players()
-        message = {
-            "type": "players_update",
-            "players": players,
-            "timestamp": time.time()
-        }
-        msg_json = json.dumps(message)
-        # Broadcast to all connected clients
-        disconnected = set()
-        async with CLIENTS_LOCK:
-            for client in CONNECTED_CLIENTS:
-                try:
-                    await client.send(msg_json)
-                except Exception:
-                    disconnected.add(client)
-            # Remove disconnected clients
-            CONNECTED_CLIENTS.difference_update(disconnected)
+        await asyncio.sleep(TICK_INTERVAL)
+        tick_start = time.monotonic()
+        # Sends never block here: frames go to each client's own queue
+        sessions = {s.player_id: s for s in CONNECTED_CLIENTS.values() if s.player_id >= 0 and not s.closed}
+        # Binary clients must learn new map ids (interned by PlayerHandler.update) before any frame that uses them
+        if len(BROADCASTER.maps.names) > known_maps:
+            known_maps = len(BROADCASTER.maps.names)
+            fan_out([s for s in sessions.values() if s.encoding != ENCODING_JSON], json.dumps({
+                "type": "map_ids",
+                "maps": BROADCASTER.maps.names
+            }))
+        for pid, session in sessions.items():
+            if session.needs_resync:
+                BROADCASTER.request_full(pid)
+        for pid, msg_json, is_full in BROADCASTER.build_frames(PLAYER_HANDLER, sessions.keys()):
+            if sessions[pid].send(msg_json, FRAME_SNAPSHOT if is_full else FRAME_DELTA):
+                BROADCASTER.stats.record(len(msg_json))
+
+        now = time.monotonic()
+        TICK_STATS.record(tick_start - last_tick, now - tick_start)
+        last_tick = tick_start
+        if now - last_report >= STATS_INTERVAL:
+            msgs, nbytes = BROADCASTER.stats.per_tick()
+            print(f"[Server] Broadcast ({BROADCASTER.mode}): {msgs:.2f} msgs/tick, {nbytes:.0f} bytes/tick")
+            BROADCASTER.stats.reset()
+            lagging = {pid: q for pid, q in queue_stats(list(sessions.values())).items() if q["depth"] or q["dropped"]}
+            if lagging:
+                print(f"[Server] Client queues (depth/dropped): " + ", ".join(
+                    f"{pid}: {q['depth']}/{q['dropped']}" for pid, q in lagging.items()))
+            last_report = now
+
+
+def server_stats() -> dict:
+    """Server load figures for benchmarks/load_test.py; counters are cumulative"""
+    stats = {
+        "type": "stats",
+        "broadcast": BROADCASTER.mode,
+        "shards": len(ROUTER.shards) if ROUTER else 0,
+        "players": ROUTER.player_count if ROUTER else len(PLAYER_HANDLER),
+        "clients": len(CONNECTED_CLIENTS),
+        "cpu_time": time.process_time(),
+    }
+    if ROUTER:
+        # Broadcast ticks run in the workers: report theirs, and count their CPU time too
+        stats.update(ROUTER.stats())
+        stats["cpu_time"] += stats["worker_cpu_time"]
+    else:
+        stats.update(TICK_STATS.to_dict())
+    return stats
+
+
+async def handle_stats(websocket: Any):
+    """Answer "stats" requests on STATS_PATH without registering a player"""
+    async for message in websocket:
+        if isinstance(message, str) and json.loads(message).get("type") == "stats":
+            await websocket.send(json.dumps(server_stats()))
 
 
 async def handle_client(websocket: Any):
     """Handle a WebSocket client connection"""
+    if websocket.request.path == STATS_PATH:
+        try:
+            await handle_stats(websocket)
+        except Exception as e:
+            print(f"[Server] Stats handler error: {e}")
+        return
+
     player_id = -1
+    session = ClientSession(websocket)
+    session.start()
+    CONNECTED_CLIENTS[websocket] = session
 
-    async with CLIENTS_LOCK:
-        CONNECTED_CLIENTS.add(websocket)
+    def send_error(message: str) -> None:
+        session.send(json.dumps({
+            "type": "error",
+            "message": message
+        }))
+
+    maps = ROUTER.maps if ROUTER else BROADCASTER.maps
 
     try:
         # Register player on connection - server assigns ID
-        player_id = PLAYER_HANDLER.register()
-        await websocket.send(json.dumps({
+        if ROUTER:
+            player_id = ROUTER.register(session)
+        else:
+            player_id = PLAYER_HANDLER.register()
+            BROADCASTER.add_viewer(player_id)
+        session.send(json.dumps({
             "type": "registered",
             "id": player_id
         }))
+        session.player_id = player_id
 
-        # Send initial player list
-        players = PLAYER_HANDLER.list_players()
-        await websocket.send(json.dumps({
+        # Send initial player list (a shard sends the real one once the player reports its map)
+        players = {} if ROUTER else PLAYER_HANDLER.list_players()
+        session.send(json.dumps({
             "type": "players_update",
             "players": players,
             "timestamp": time.time()
-        }))
+        }), FRAME_SNAPSHOT)
 
         # Send recent chat messages
         recent_chat = CHAT.list_since(0)
-        await websocket.send(json.dumps({
+        session.send(json.dumps({
             "type": "chat_update",
             "messages": recent_chat
         }))
@@ -126,11 +149,30 @@ async def handle_client(websocket: Any):
         # Handle incoming messages
         async for message in websocket:
             try:
-                data = json.loads(message)
+                if isinstance(message, bytes):
+                    # Binary frames are only used for position updates
+                    if frame_type(message) != FRAME_PLAYER_UPDATE:
+                        send_error("invalid_frame")
+                        continue
+                    data = decode_player_update(maps, message)
+                else:
+                    data = json.loads(message)
                 msg_type = data.get("type")
 
+                if msg_type == "hello":
+                    # Encoding negotiation, JSON remains the fallback
+                    session.encoding = negotiate(list(data.get("encodings", [])))
+                    if ROUTER:
+                        ROUTER.set_encoding(player_id, session.encoding)
+                    else:
+                        BROADCASTER.set_encoding(player_id, session.encoding)
+                    session.send(json.dumps({
+                        "type": "hello_ack",
+                        "encoding": session.encoding,
+                        "maps": maps.names
+                    }))
 
-                if msg_type == "player_update":
+                elif msg_type == "player_update":
                     # Update player position - use server-assigned ID, ignore client ID
                     x = float(data.get("x", 0))
                     y = float(data.get("y", 0))
@@ -141,7 +183,45 @@ async def handle_client(websocket: Any):
                     # Use the server-assigned player_id, not client-provided
                     # HINT: This part might be helpful for direction change
                     # Maybe you can add other parameters?
-                    PLAYER_HANDLER.update(player_id, x, y, map_name, direction, is_moving)
+                    if ROUTER:
+                        known_maps = len(maps.names)
+                        ROUTER.update(player_id, x, y, map_name, direction, is_moving)
+                        if len(maps.names) > known_maps:
+                            fan_out([s for s in CONNECTED_CLIENTS.values() if s.encoding != ENCODING_JSON], json.dumps({
+                                "type": "map_ids",
+                                "maps": maps.names
+                            }))
+                    else:
+                        PLAYER_HANDLER.update(player_id, x, y, map_name, direction, is_moving)
+
+                elif msg_type == "heartbeat":
+                    # Low-rate keepalive that stops idle players from expiring; echo "t" so the client can measure RTT
+                    if ROUTER:
+                        ROUTER.touch(player_id)
+                    else:
+                        PLAYER_HANDLER.touch(player_id)
+                    session.send(json.dumps({
+                        "type": "heartbeat_ack",
+                        "t": data.get("t"),
+                        "send_rate": ROUTER.send_rate_hint(player_id) if ROUTER else TICK_STATS.send_rate_hint()
+                    }))
+
+                elif msg_type == "stats":
+                    # Same as a request on STATS_PATH, for clients that are already connected
+                    session.send(json.dumps(server_stats()))
+
+                elif msg_type == "chat_history":
+                    # Page backwards through older chat messages
+                    before_id = int(data.get("before_id", 0))
+                    limit = int(data.get("limit", HISTORY_PAGE))
+                    # Reads the chat log from disk: keep it off the event loop
+                    messages, has_more = await asyncio.to_thread(CHAT.history, before_id, limit)
+                    session.send(json.dumps({
+                        "type": "chat_history",
+                        "before_id": before_id,
+                        "messages": messages,
+                        "has_more": has_more
+                    }))
 
                 elif msg_type == "chat_send":
                     # Send chat message - use server-assigned ID
@@ -149,59 +229,90 @@ async def handle_client(websocket: Any):
                     if text:
                         try:
                             msg = CHAT.add(player_id, text)  # Use server-assigned ID
-                            # Broadcast to all clients
+                            # Broadcast to all clients: encode once, queue everywhere
                             chat_msg = {
                                 "type": "chat_update",
                                 "messages": [msg]
                             }
-                            chat_json = json.dumps(chat_msg)
-                            async with CLIENTS_LOCK:
-                                disconnected = set()
-                                for client in CONNECTED_CLIENTS:
-                                    try:
-                                        await client.send(chat_json)
-                                    except Exception:
-                                        disconnected.add(client)
-                                CONNECTED_CLIENTS.difference_update(disconnected)
+                            fan_out(list(CONNECTED_CLIENTS.values()), json.dumps(chat_msg))
                         except ValueError:
-                            await websocket.send(json.dumps({
-                                "type": "error",
-                                "message": "empty_message"
-                            }))
+                            send_error("empty_message")
 
             except json.JSONDecodeError:
-                await websocket.send(json.dumps({
-                    "type": "error",
-                    "message": "invalid_json"
-                }))
+                send_error("invalid_json")
             except Exception as e:
-                await websocket.send(json.dumps({
-                    "type": "error",
-                    "message": str(e)
-                }))
+                send_error(str(e))
 
     except Exception as e:
         print(f"[Server] Client handler error: {e}")
     finally:
         # Unregister player on disconnect
         if player_id >= 0:
-            PLAYER_HANDLER.unregister(player_id)
-            # Clear chat if no players are connected
-            if not PLAYER_HANDLER.has_players():
+            if ROUTER:
+                ROUTER.unregister(player_id)
+            else:
+                PLAYER_HANDLER.unregister(player_id)
+                BROADCASTER.remove_viewer(player_id)
+            # Clear chat if no players are connected (unless it is persisted)
+            players_left = ROUTER.has_players() if ROUTER else PLAYER_HANDLER.has_players()
+            if not players_left and not CHAT.persistent:
                 CHAT.clear()
                 print("[Server] All players disconnected, chat cleared")
-        async with CLIENTS_LOCK:
-            CONNECTED_CLIENTS.discard(websocket)
+        CONNECTED_CLIENTS.pop(websocket, None)
+        await session.close()
 
 
 async def main():
-    print(f"[Server] Running WebSocket server on ws://0.0.0.0:{PORT}")
-    # Start broadcast task
-    asyncio.create_task(broadcast_player_update())
+    if ROUTER:
+        ROUTER.start(asyncio.get_running_loop())
+        print(f"[Server] Running WebSocket server on ws://0.0.0.0:{PORT} "
+              f"(broadcast: {BROADCASTER.mode}, {len(ROUTER.shards)} shards)")
+    else:
+        print(f"[Server] Running WebSocket server on ws://0.0.0.0:{PORT} (broadcast: {BROADCASTER.mode})")
+        # Idle players are expired on this loop, the one that updates them
+        PLAYER_HANDLER.start(asyncio.get_running_loop())
+        # Start broadcast task
+        asyncio.create_task(broadcast_player_update())
     # Start server
     async with serve(handle_client, "0.0.0.0", PORT):
         await asyncio.Future()  # run forever
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Monster Go online server")
+    parser.add_argument("--broadcast", choices=BROADCAST_MODES, default="delta",
+                        help="full: send every player every tick, delta: only changed players on the same map")
+    parser.add_argument("--radius", type=float, default=None,
+                        help="Only send players within this many tiles (delta mode)")
+    parser.add_argument("--snapshot-interval", type=int, default=60,
+                        help="Ticks between full snapshots (delta mode)")
+    parser.add_argument("--chat-log", metavar="DIR", default=None,
+                        help="Persist chat history in this directory instead of keeping it in memory only")
+    parser.add_argument("--tick-rate", type=float, default=60.0,
+                        help="Position broadcasts per second; clients interpolate, so 10-20 keeps movement smooth")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="Run players and broadcasts in this many worker processes, split by map (0: single process)")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    TICK_INTERVAL = 1.0 / max(1.0, args.tick_rate)
+    TICK_STATS = TickStats(TICK_INTERVAL)
+    # Size grid cells to the broadcast radius so a query touches about nine cells
+    PLAYER_HANDLER.grid = SpatialGrid(cell_size_for(args.radius))
+    BROADCASTER = Broadcaster(args.broadcast, args.radius, args.snapshot_interval, maps=PLAYER_HANDLER.maps)
+    if args.chat_log:
+        chat_log = ChatLog(args.chat_log)
+        chat_log.start()
+        CHAT = ChatStore(log=chat_log)
+        print(f"[Server] Chat history persisted in {args.chat_log} (last id {chat_log.last_id})")
+    if args.shards > 0:
+        ROUTER = ShardRouter(args.shards, args.broadcast, args.radius, args.snapshot_interval, TICK_INTERVAL)
+    try:
+        asyncio.run(main())
+    finally:
+        if ROUTER:
+            ROUTER.stop()
+        PLAYER_HANDLER.stop()
+        CHAT.close()
@@ -0,0 +1,239 @@
+"""
+Player broadcast strategies.
+
+"full"  : Every tick, every client receives every player (the original behaviour).
+"delta" : Every client only receives players on its own map (optionally within a radius),
+          and only the ones that changed since the last frame it was sent. A full snapshot of
+          the client's interest set is sent every `snapshot_interval` ticks so that late joiners
+          and clients that missed frames can resync.
+
+Frames are built straight from PlayerHandler's columns. A viewer remembers the row version of
+every player it was sent, and viewers whose map had no dirty rows this tick are skipped outright.
+With a radius, the interest set comes from PlayerHandler's spatial grid rather than a scan of the map.
+"""
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Iterable
+from server.playerHandler import PlayerHandler
+from server.protocol import MapTable, ENCODING_JSON, ENCODING_BIN1, encode_players_columns
+from server.spatialGrid import TILE_SIZE
+
+BROADCAST_MODES = ("full", "delta")
+
+
+@dataclass
+class BroadcastStats:
+    ticks: int = 0
+    messages: int = 0
+    bytes: int = 0
+
+    def record(self, nbytes: int) -> None:
+        self.messages += 1
+        self.bytes += nbytes
+
+    def per_tick(self) -> tuple[float, float]:
+        """Return (messages per tick, bytes per tick) since the last reset"""
+        if self.ticks == 0:
+            return 0.0, 0.0
+        return self.messages / self.ticks, self.bytes / self.ticks
+
+    def reset(self) -> None:
+        self.ticks = 0
+        self.messages = 0
+        self.bytes = 0
+
+
+@dataclass
+class TickStats:
+    """Cumulative broadcast tick timing, returned by the "stats" request so load tests can diff it"""
+    target: float
+    ticks: int = 0
+    late: int = 0             # Ticks that started more than LATE_FACTOR x target after the previous one
+    interval_total: float = 0.0
+    work_total: float = 0.0   # Time spent building and queueing frames
+    load: float = 0.0         # Recent share of late ticks (moving average)
+
+    LATE_FACTOR = 1.5
+    LOAD_SMOOTHING = 0.05
+    BUSY_LOAD = 0.1           # Above this share of late ticks clients are asked to send less
+
+    def record(self, interval: float, work: float) -> None:
+        self.ticks += 1
+        self.interval_total += interval
+        self.work_total += work
+        late = interval > self.target * self.LATE_FACTOR
+        if late:
+            self.late += 1
+        self.load += ((1.0 if late else 0.0) - self.load) * self.LOAD_SMOOTHING
+
+    def send_rate_hint(self) -> float:
+        """
+        Position updates per second a client should send at most: more than one per broadcast
+        tick is never seen by anyone, and a server whose ticks are slipping asks for half that.
+        """
+        rate = 1.0 / self.target
+        return rate / 2 if self.load > self.BUSY_LOAD else rate
+
+    def to_dict(self) -> dict:
+        return {
+            "tick_target": self.target,
+            "ticks": self.ticks,
+            "late_ticks": self.late,
+            "tick_interval_total": self.interval_total,
+            "tick_work_total": self.work_total,
+        }
+
+
+@dataclass
+class _View:
+    """What a single client currently believes about the other players"""
+    known: dict[int, int] = field(default_factory=dict)  # player id -> row version last sent
+    map_id: int = -1
+    ticks_since_full: int = 0
+    needs_full: bool = True
+    encoding: str = ENCODING_JSON
+
+
+class Broadcaster:
+    mode: str
+    radius: float | None
+    snapshot_interval: int
+    stats: BroadcastStats
+    maps: MapTable
+    _views: dict[int, _View]
+
+    def __init__(self, mode: str = "delta", radius_tiles: float | None = None, snapshot_interval: int = 60, maps: MapTable | None = None):
+        if mode not in BROADCAST_MODES:
+            raise ValueError(f"Unknown broadcast mode: {mode}")
+        self.mode = mode
+        # Radius is configured in tiles but compared against pixel positions
+        self.radius = radius_tiles * TILE_SIZE if radius_tiles else None
+        self.snapshot_interval = max(1, int(snapshot_interval))
+        self.stats = BroadcastStats()
+        self.maps = maps if maps is not None else MapTable()
+        self._views = {}
+
+    # Viewers
+    def add_viewer(self, pid: int) -> None:
+        self._views[pid] = _View()
+
+    def set_encoding(self, pid: int, encoding: str) -> None:
+        view = self._views.get(pid)
+        if view:
+            view.encoding = encoding
+            view.needs_full = True
+
+    def remove_viewer(self, pid: int) -> None:
+        self._views.pop(pid, None)
+
+    def request_full(self, pid: int) -> None:
+        """Force a full snapshot for this viewer on the next tick"""
+        view = self._views.get(pid)
+        if view:
+            view.needs_full = True
+
+    # Frames
+    def build_frames(self, table: PlayerHandler, viewers: Iterable[int]) -> list[tuple[int, str | bytes, bool]]:
+        """
+        Build the outgoing frame for every viewer.
+
+        Args:
+            table: The server's PlayerHandler; its dirty set is consumed
+            viewers: Player IDs of the connected clients
+
+        Returns:
+            List of (player_id, encoded message, is_full_snapshot).
+            Viewers with nothing new are skipped, and viewers with identical payloads share
+            the same message object so it is only serialized once.
+        """
+        self.stats.ticks += 1
+        timestamp = time.time()
+        _, dirty_maps = table.take_dirty()
+        active_ids = table.active_ids()
+
+        if self.mode == "full":
+            encoded_full: dict[str, str | bytes] = {}
+            full_frames: list[tuple[int, str | bytes, bool]] = []
+            for pid in viewers:
+                view = self._views.get(pid)
+                encoding = view.encoding if view else ENCODING_JSON
+                msg = encoded_full.get(encoding)
+                if msg is None:
+                    msg = self._encode(encoding, "players_update", table, active_ids, (), timestamp)
+                    encoded_full[encoding] = msg
+                full_frames.append((pid, msg, True))
+            return full_frames
+
+        map_ids = table.map_ids
+        versions = table.versions
+        active = table.active
+        by_map: dict[int, list[int]] = {}
+        if self.radius is None:
+            for pid in active_ids:
+                by_map.setdefault(map_ids[pid], []).append(pid)
+
+        # Viewers that end up with the same payload share a single encoded message
+        encoded: dict[tuple, str | bytes] = {}
+        frames: list[tuple[int, str | bytes, bool]] = []
+        for viewer in viewers:
+            view = self._views.get(viewer)
+            if view is None or viewer >= table.capacity or not active[viewer]:
+                continue
+            my_map = map_ids[viewer]
+            view.ticks_since_full += 1
+            full = view.needs_full or view.ticks_since_full >= self.snapshot_interval
+            # Nobody on this map (the viewer included) changed, so neither did the interest set
+            if not full and my_map == view.map_id and my_map not in dirty_maps:
+                continue
+            view.map_id = my_map
+            visible = self._visible(viewer, table, by_map.get(my_map, []))
+
+            if full:
+                msg_type = "players_update"
+                ids = tuple(visible)
+                removed: tuple[int, ...] = ()
+                view.known = {pid: versions[pid] for pid in visible}
+                view.ticks_since_full = 0
+                view.needs_full = False
+            else:
+                known = view.known
+                ids = tuple(pid for pid in visible if known.get(pid) != versions[pid])
+                visible_set = set(visible)
+                removed = tuple(pid for pid in known if pid not in visible_set)
+                if not ids and not removed:
+                    continue
+                msg_type = "players_delta"
+                for pid in removed:
+                    del known[pid]
+                for pid in ids:
+                    known[pid] = versions[pid]
+
+            key = (view.encoding, msg_type, ids, removed)
+            msg = encoded.get(key)
+            if msg is None:
+                msg = self._encode(view.encoding, msg_type, table, ids, removed, timestamp)
+                encoded[key] = msg
+            frames.append((viewer, msg, msg_type == "players_update"))
+        return frames
+
+    def _encode(self, encoding: str, msg_type: str, table: PlayerHandler, ids: Iterable[int], removed: tuple[int, ...], timestamp: float) -> str | bytes:
+        if encoding == ENCODING_BIN1:
+            return encode_players_columns(
+                msg_type, list(ids), table.xs, table.ys, table.map_ids, table.directions, table.moving, removed, timestamp
+            )
+        message = {
+            "type": msg_type,
+            "players": {pid: table.row(pid) for pid in ids},
+            "timestamp": timestamp
+        }
+        if msg_type == "players_delta":
+            message["removed"] = list(removed)
+        return json.dumps(message)
+
+    def _visible(self, viewer: int, table: PlayerHandler, same_map: list[int]) -> list[int]:
+        """Players this viewer is interested in: same map, optionally within radius"""
+        if self.radius is None:
+            return [pid for pid in same_map if pid != viewer]
+        found = table.within(table.map_ids[viewer], table.xs[viewer], table.ys[viewer], self.radius)
+        return [pid for pid in found if pid != viewer]
@@ -0,0 +1,190 @@
+"""
+Append-only chat history on disk.
+
+Message ids are sequential, so message `id` lives in segment (id - 1) // SEGMENT_MESSAGES
+at slot (id - 1) % SEGMENT_MESSAGES. Each segment is two files:
+    chat_000000.log : one JSON message per line
+    chat_000000.idx : one little-endian uint64 byte offset into the .log per message
+Nothing but the pending write batch is kept in memory, no matter how long the server runs.
+
+A failed write (disk full, permissions) marks the log `failed`: from then on nothing is queued or
+written, since skipping messages would break the id -> slot mapping. Messages already on disk
+stay readable.
+"""
+import json
+import os
+import struct
+import threading
+
+SEGMENT_MESSAGES = 10000  # Messages per segment file
+FLUSH_INTERVAL = 0.05     # Seconds the writer waits to batch messages together
+FLUSH_BATCH = 256         # Flush early once this many messages are pending
+
+_OFFSET = struct.Struct("<Q")
+
+
+class ChatLog:
+    directory: str
+    last_id: int  # Highest id written to disk
+    failed: bool  # A write failed; persistence has stopped
+    _pending: list[dict]
+    _cond: threading.Condition
+    _thread: threading.Thread | None
+    _stop: bool
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._pending = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stop = False
+        self.failed = False
+        self._read_lock = threading.Lock()
+        self.last_id = self._recover()
+
+    # Threading
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop = False
+        self._thread = threading.Thread(target=self._writer, name="ChatLogWriter", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            if self._thread.is_alive():
+                # Still busy with a batch: writing here too could interleave with it
+                return
+        # Whatever the writer did not get to
+        self._write_batch(self._take_pending())
+
+    def _writer(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                # Give a burst of messages the chance to share one write
+                if len(self._pending) < FLUSH_BATCH:
+                    self._cond.wait(FLUSH_INTERVAL)
+            self._write_batch(self._take_pending())
+            if self.failed:
+                self._take_pending()  # Drop what append queued meanwhile
+                return
+
+    def _take_pending(self) -> list[dict]:
+        with self._cond:
+            batch, self._pending = self._pending, []
+        return batch
+
+    # API
+    def append(self, msg: dict) -> None:
+        """Queue a message for writing. Never touches the disk on the caller's thread."""
+        if self.failed:
+            return
+        with self._cond:
+            self._pending.append(msg)
+            if len(self._pending) >= FLUSH_BATCH or len(self._pending) == 1:
+                self._cond.notify()
+
+    def read_range(self, first_id: int, end_id: int) -> list[dict]:
+        """Messages with first_id <= id < end_id that are on disk, oldest first"""
+        first_id = max(1, first_id)
+        end_id = min(end_id, self.last_id + 1)
+        out: list[dict] = []
+        with self._read_lock:
+            mid = first_id
+            while mid < end_id:
+                segment, slot = divmod(mid - 1, SEGMENT_MESSAGES)
+                count = min(end_id - mid, SEGMENT_MESSAGES - slot)
+                out.extend(self._read_segment(segment, slot, count))
+                mid += count
+        return out
+
+    # Files
+    def _paths(self, segment: int) -> tuple[str, str]:
+        base = os.path.join(self.directory, f"chat_{segment:06d}")
+        return base + ".log", base + ".idx"
+
+    def _read_segment(self, segment: int, slot: int, count: int) -> list[dict]:
+        log_path, idx_path = self._paths(segment)
+        if not os.path.exists(idx_path):
+            return []
+        with open(idx_path, "rb") as idx:
+            idx.seek(slot * _OFFSET.size)
+            raw = idx.read(count * _OFFSET.size)
+        offsets = [o for (o,) in _OFFSET.iter_unpack(raw[:len(raw) - len(raw) % _OFFSET.size])]
+        if not offsets:
+            return []
+        out: list[dict] = []
+        with open(log_path, "rb") as log:
+            log.seek(offsets[0])
+            for _ in offsets:
+                line = log.readline()
+                if not line:
+                    break
+                out.append(json.loads(line))
+        return out
+
+    def _write_batch(self, batch: list[dict]) -> None:
+        if self.failed:
+            return
+        i = 0
+        while i < len(batch):
+            # Split the batch at segment boundaries
+            segment = (batch[i]["id"] - 1) // SEGMENT_MESSAGES
+            j = i
+            while j < len(batch) and (batch[j]["id"] - 1) // SEGMENT_MESSAGES == segment:
+                j += 1
+            log_path, idx_path = self._paths(segment)
+            try:
+                with open(log_path, "ab") as log, open(idx_path, "ab") as idx:
+                    offset = log.tell()
+                    lines = bytearray()
+                    offsets = bytearray()
+                    for msg in batch[i:j]:
+                        line = json.dumps(msg, separators=(",", ":")).encode() + b"\n"
+                        offsets += _OFFSET.pack(offset + len(lines))
+                        lines += line
+                    # Data before index: a crash in between leaves an unindexed tail that _recover drops
+                    log.write(lines)
+                    log.flush()
+                    idx.write(offsets)
+            except OSError as e:
+                # Any partial tail is dropped by _recover on the next start
+                self.failed = True
+                print(f"[Server] Chat log write failed, history after id {self.last_id} is not persisted: {e}")
+                return
+            self.last_id = batch[j - 1]["id"]
+            i = j
+
+    def _recover(self) -> int:
+        """Find the last complete message on disk and drop any partially written tail"""
+        segments = sorted(
+            int(name[5:11]) for name in os.listdir(self.directory)
+            if name.startswith("chat_") and name.endswith(".idx")
+        )
+        while segments:
+            segment = segments.pop()
+            log_path, idx_path = self._paths(segment)
+            count = os.path.getsize(idx_path) // _OFFSET.size
+            with open(idx_path, "r+b") as idx:
+                idx.truncate(count * _OFFSET.size)
+            if count == 0 or not os.path.exists(log_path):
+                continue
+            with open(idx_path, "rb") as idx:
+                idx.seek((count - 1) * _OFFSET.size)
+                (last_offset,) = _OFFSET.unpack(idx.read(_OFFSET.size))
+            with open(log_path, "r+b") as log:
+                log.seek(last_offset)
+                last_line = log.readline()
+                log.truncate(last_offset + len(last_line))
+            return segment * SEGMENT_MESSAGES + count
+        return 0
+
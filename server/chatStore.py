@@ -0,0 +1,137 @@
+import threading
+import time
+from server.chatLog import ChatLog
+
+CHAT_CAPACITY = 1000     # Messages kept in memory
+MAX_TEXT_LENGTH = 200
+INITIAL_BACKLOG = 100    # Messages sent to a client that has seen nothing yet
+MAX_RESPONSE = 200       # Messages returned by a single list_since call
+HISTORY_PAGE = 50        # Messages per chat_history page
+
+
+class ChatStore:
+    """
+    In-memory chat storage backed by a fixed-size ring buffer.
+
+    Message ids are assigned sequentially, so message `id` always lives in slot
+    `id % capacity` and a lookup by id is a single index operation. The lock only
+    serializes writers: readers take a snapshot of the id range and validate each slot,
+    skipping any that a concurrent writer has already recycled.
+
+    With a ChatLog attached every message is also persisted, ids continue across
+    restarts, and history older than the ring is paged in from disk.
+    """
+    _lock: threading.Lock
+    _capacity: int
+    _slots: list[dict | None]
+    _first_id: int  # Oldest id still stored
+    _next_id: int   # Id the next message will get
+    _log: ChatLog | None
+
+    def __init__(self, capacity: int = CHAT_CAPACITY, log: ChatLog | None = None) -> None:
+        self._lock = threading.Lock()
+        self._capacity = capacity
+        self._slots = [None] * capacity
+        self._log = log
+        start_id = log.last_id + 1 if log else 1
+        # Older messages only exist on disk
+        self._first_id = start_id
+        self._next_id = start_id
+
+    @property
+    def persistent(self) -> bool:
+        return self._log is not None
+
+    def add(self, sender_id: int, text: str) -> dict:
+        # Sanitize
+        t = (text or "").strip()
+        if len(t) > MAX_TEXT_LENGTH:
+            t = t[:MAX_TEXT_LENGTH]
+        if not t:
+            raise ValueError("empty")
+        with self._lock:
+            mid = self._next_id
+            msg = {
+                "id": mid,
+                "from": sender_id,
+                "text": t,
+                "ts": time.time(),
+            }
+            # Fill the slot before publishing the new id range to readers
+            self._slots[mid % self._capacity] = msg
+            if mid - self._first_id >= self._capacity:
+                self._first_id = mid - self._capacity + 1
+            self._next_id = mid + 1
+            if self._log:
+                self._log.append(msg)
+            return msg
+
+    def list_since(self, since_id: int, limit: int = MAX_RESPONSE) -> list[dict]:
+        """Messages with id > since_id, oldest first, capped to the newest `limit`"""
+        slots = self._slots
+        end = self._next_id
+        first = self._first_id
+        if since_id <= 0:
+            start = end - min(limit, INITIAL_BACKLOG)
+        else:
+            start = since_id + 1
+        start = max(start, first, end - limit)
+
+        out: list[dict] = []
+        capacity = self._capacity
+        for mid in range(start, end):
+            m = slots[mid % capacity]
+            # Slot recycled by a writer since we read the range
+            if m is None or m["id"] != mid:
+                continue
+            out.append(m)
+        return out
+
+    def history(self, before_id: int, limit: int = HISTORY_PAGE) -> tuple[list[dict], bool]:
+        """
+        Page backwards through history.
+
+        Returns:
+            (messages with before_id - limit <= id < before_id oldest first, whether older ones exist)
+        """
+        limit = max(1, min(limit, MAX_RESPONSE))
+        end = self._next_id
+        if before_id <= 0 or before_id > end:
+            before_id = end
+        start = max(1, before_id - limit)
+
+        first = self._first_id
+        slots = self._slots
+        capacity = self._capacity
+        ring: list[dict] = []
+        for mid in range(max(start, first), before_id):
+            m = slots[mid % capacity]
+            if m is not None and m["id"] == mid:
+                ring.append(m)
+        # Anything the ring has already recycled (or never held) comes from disk
+        oldest_in_ring = ring[0]["id"] if ring else before_id
+        disk: list[dict] = []
+        if self._log and start < oldest_in_ring:
+            disk = self._log.read_range(start, oldest_in_ring)
+        oldest_available = 1 if self._log else first
+        return disk + ring, start > oldest_available
+
+    @property
+    def last_id(self) -> int:
+        return self._next_id - 1
+
+    def __len__(self) -> int:
+        return self._next_id - self._first_id
+
+    def close(self) -> None:
+        if self._log:
+            self._log.stop()
+
+    def clear(self) -> None:
+        """Clear all in-memory chat messages (persistent stores keep their history)"""
+        if self._log:
+            return
+        with self._lock:
+            self._slots = [None] * self._capacity
+            self._first_id = 1
+            self._next_id = 1
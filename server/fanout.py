@@ -0,0 +1,148 @@
+import asyncio
+from collections import deque
+from typing import Any
+
+MAX_QUEUE = 32  # Frames buffered per client before stale position frames are dropped
+HARD_LIMIT = 4  # A client with HARD_LIMIT * max_queue frames queued has stopped reading and is disconnected
+
+# Frame kinds
+FRAME_CONTROL = 0   # registered, chat, errors... never dropped
+FRAME_DELTA = 1     # players_delta: can be dropped, but the client then needs a full snapshot
+FRAME_SNAPSHOT = 2  # players_update: supersedes every position frame queued before it
+
+
+class ClientSession:
+    """
+    Outbound side of one websocket connection.
+
+    Frames are encoded once by the caller and handed to `send`, which never blocks.
+    Each session drains its own bounded queue in a separate task, so one slow socket
+    cannot stall the broadcast tick or the chat fan-out of the others. Past `max_queue`
+    frames, queued position frames are dropped; control frames are kept, up to
+    HARD_LIMIT * max_queue frames in all, beyond which the client is disconnected.
+    """
+    websocket: Any
+    player_id: int
+    encoding: str
+    max_queue: int
+    dropped: int
+    sent: int
+    bytes_sent: int
+    needs_resync: bool
+    closed: bool
+
+    def __init__(self, websocket: Any, max_queue: int = MAX_QUEUE):
+        self.websocket = websocket
+        self.player_id = -1
+        self.encoding = "json"
+        self.max_queue = max_queue
+        self.dropped = 0
+        self.sent = 0
+        self.bytes_sent = 0
+        self.needs_resync = False
+        self.closed = False
+        self._queue: deque[tuple[str | bytes, int]] = deque()
+        self._position_frames = 0  # Delta and snapshot frames in _queue
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._drain())
+
+    async def close(self) -> None:
+        self.closed = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def send(self, message: str | bytes, kind: int = FRAME_CONTROL) -> bool:
+        """Queue an encoded frame. Returns False if the session is closed."""
+        if self.closed:
+            return False
+        queue = self._queue
+        if kind == FRAME_SNAPSHOT:
+            # A full snapshot makes every queued position frame stale
+            self._discard_position_frames(resync=False)
+            self.needs_resync = False
+        elif len(queue) >= self.max_queue:
+            self._discard_position_frames()
+            if kind == FRAME_DELTA and len(queue) >= self.max_queue:
+                # Queue is full of control frames; drop this one instead
+                self.dropped += 1
+                self.needs_resync = True
+                return True
+            if len(queue) >= HARD_LIMIT * self.max_queue:
+                # Not even control frames are being read: the client has stalled
+                self._abort()
+                return False
+        queue.append((message, kind))
+        if kind != FRAME_CONTROL:
+            self._position_frames += 1
+        self._wakeup.set()
+        return True
+
+    def _discard_position_frames(self, resync: bool = True) -> None:
+        if not self._position_frames:
+            return
+        kept = [f for f in self._queue if f[1] == FRAME_CONTROL]
+        dropped = len(self._queue) - len(kept)
+        self._queue.clear()
+        self._queue.extend(kept)
+        self._position_frames = 0
+        self.dropped += dropped
+        # Dropped deltas leave the client out of date until its next full snapshot
+        if resync:
+            self.needs_resync = True
+
+    def _abort(self) -> None:
+        """Give up on a stalled client: drop its queue and close the connection"""
+        self.closed = True
+        self.dropped += len(self._queue)
+        self._queue.clear()
+        self._position_frames = 0
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        asyncio.ensure_future(self.websocket.close(1013, "client too slow"))
+
+    async def _drain(self) -> None:
+        queue = self._queue
+        while True:
+            while not queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            message, kind = queue.popleft()
+            if kind != FRAME_CONTROL:
+                self._position_frames -= 1
+            try:
+                await self.websocket.send(message)
+            except Exception:
+                self.closed = True
+                queue.clear()
+                self._position_frames = 0
+                return
+            self.sent += 1
+            self.bytes_sent += len(message)
+
+
+def fan_out(sessions: list[ClientSession], message: str | bytes, kind: int = FRAME_CONTROL) -> None:
+    """Hand the same encoded frame to every session"""
+    for session in sessions:
+        session.send(message, kind)
+
+
+def queue_stats(sessions: list[ClientSession]) -> dict[int, dict[str, int]]:
+    """Per-client queue depth and drop counts, keyed by player id"""
+    return {
+        s.player_id: {"depth": s.depth, "dropped": s.dropped, "sent": s.sent}
+        for s in sessions
+    }
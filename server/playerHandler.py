@@ -1,10 +1,15 @@
+import asyncio
+import heapq
 import threading
 import time
+from array import array
+from itertools import compress
 from dataclasses import dataclass
-from typing import Dict
+from server.protocol import MapTable, DIRECTIONS
+from server.spatialGrid import SpatialGrid, TILE_SIZE
 
 TIMEOUT_TIME = 60.0
-CHECK_INTERVAL_TIME = 10.0
+INITIAL_CAPACITY = 64
 
 """
 TODO:
@@ -12,10 +17,15 @@ In this file, you'll probably need to add more parameters for the direction chan
 We recommend you not change any part unless there is a 'HINT' above it.
 """
 
+_DIRECTION_IDS = {name: i for i, name in enumerate(DIRECTIONS)}
+_DOWN = _DIRECTION_IDS["DOWN"]
+
+
 # HINT: This class is used to store player information. Since you'll probably need to deal with direction, etc.
 # You can add other parameters if you need to.
 @dataclass
 class Player:
+    """Detached copy of one row, returned by PlayerHandler.get"""
     id: int
     x: float
     y: float
@@ -24,118 +34,317 @@ class Player:
     direction: str = "DOWN"  # Track player direction: UP, DOWN, LEFT, RIGHT
     is_moving: bool = False  # Track if player is currently moving
 
-    # HINT: This part might be helpful for direction change
-    # Maybe you can add other parameters?
-    def update(self, x: float, y: float, map: str, direction: str = "DOWN", is_moving: bool = False) -> None:
-        if x != self.x or y != self.y or map != self.map:
-            self.last_update = time.monotonic()
-        self.x = x
-        self.y = y
-        self.map = map
-        self.direction = direction
-        self.is_moving = is_moving
-
     def is_inactive(self) -> bool:
         now = time.monotonic()
         return (now - self.last_update) >= TIMEOUT_TIME
 
 
 class PlayerHandler:
+    """
+    Players stored as a struct of arrays: the player id is the row index into preallocated
+    arrays for x, y, map id, direction and moving flag. Every change bumps the row's version
+    and sets its dirty bit so broadcasts can find what changed without building a dict per player.
+    `grid` is a per-map spatial hash kept in step with the rows, for "who is near this player" queries.
+
+    Rows, the grid and the dirty sets are only changed on one thread, the one calling `update`
+    (the event loop, or a shard worker's main loop), so none of them need a lock.
+
+    Idle players are expired from a min-heap of (deadline, id, generation), guarded by `_lock`.
+    Updates never touch the heap: `expire_due` re-checks the row's last_update of each entry that
+    came due and either expires the player or pushes the entry back with the real deadline, so
+    each player costs at most one heap operation per TIMEOUT_TIME. Started with an event loop,
+    the cleaner thread sleeps until the earliest deadline and then schedules `expire_due` on the
+    loop with call_soon_threadsafe; without one, the owner calls `expire_due` itself.
+    Expiry frees the row but not the id: only `unregister` (the client disconnecting) puts an id
+    back in the pool, so a new client can never be handed the id of one still connected.
+    """
     _lock: threading.Lock
+    _expiry_cond: threading.Condition  # Wakes the cleaner; shares _lock
     _stop_event: threading.Event
     _thread: threading.Thread | None
+    _loop: asyncio.AbstractEventLoop | None
+    _expiry_scheduled: bool  # expire_due is queued on the loop and has not run yet
+
+    maps: MapTable
+    grid: SpatialGrid
+    capacity: int
+    # Columns, indexed by player id
+    xs: array
+    ys: array
+    map_ids: array
+    directions: array
+    moving: bytearray
+    last_update: array
+    versions: array
+    active: bytearray
+    dirty: bytearray
+    dirty_maps: set[int]   # Maps with at least one dirty row since the last take_dirty()
 
-    players: Dict[int, Player]
     _next_id: int
-    _available_ids: list[int]  # Pool of reusable IDs from disconnected players
+    _available_ids: list[int]  # Min-heap of reusable IDs from disconnected players
+    _expired: set[int]         # Expired ids whose client is still connected: reserved until unregister
+    _external_ids: bool        # Ids are assigned by the caller (shard workers), not from the pool
+    _generations: array        # Bumped on every register so stale expiry entries can be told apart
+    _expiry: list[tuple[float, int, int]]  # Min-heap of (deadline, id, generation)
+    _count: int
 
-    def __init__(self):
+    def __init__(self, capacity: int = INITIAL_CAPACITY, maps: MapTable | None = None, grid: SpatialGrid | None = None):
         self._lock = threading.Lock()
+        self._expiry_cond = threading.Condition(self._lock)
         self._stop_event = threading.Event()
         self._thread = None
+        self._loop = None
+        self._expiry_scheduled = False
+
+        self.maps = maps if maps is not None else MapTable()
+        self._empty_map = self.maps.intern("")
+        self.grid = grid if grid is not None else SpatialGrid()
+        self.capacity = 0
+        self.xs = array("d")
+        self.ys = array("d")
+        self.map_ids = array("H")
+        self.directions = array("B")
+        self.moving = bytearray()
+        self.last_update = array("d")
+        self.versions = array("L")
+        self.active = bytearray()
+        self.dirty = bytearray()
+        self.dirty_maps = set()
+        self._generations = array("L")
+        self._grow(max(1, capacity))
 
-        self.players = {}
         self._next_id = 0
         self._available_ids = []
-        
+        self._expired = set()
+        self._external_ids = False
+        self._expiry = []
+        self._count = 0
+
+    def _grow(self, capacity: int) -> None:
+        """Extend every column to `capacity` rows. Caller must hold _lock (or be __init__)."""
+        extra = capacity - self.capacity
+        self.xs.extend([0.0] * extra)
+        self.ys.extend([0.0] * extra)
+        self.map_ids.extend([self._empty_map] * extra)
+        self.directions.extend([_DOWN] * extra)
+        self.moving.extend(bytes(extra))
+        self.last_update.extend([0.0] * extra)
+        self.versions.extend([0] * extra)
+        self.active.extend(bytes(extra))
+        self.dirty.extend(bytes(extra))
+        self._generations.extend([0] * extra)
+        self.capacity = capacity
+
     # Threading
-    def start(self) -> None:
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Expire idle players on `loop`, which must be the thread that calls update"""
         if self._thread and self._thread.is_alive():
             return
+        self._loop = loop
         self._stop_event.clear()
         self._thread = threading.Thread(target=self._cleaner, name="PlayerCleaner", daemon=True)
         self._thread.start()
 
     def stop(self) -> None:
-        self._stop_event.set()
+        with self._lock:
+            self._stop_event.set()
+            self._expiry_cond.notify()
         if self._thread:
             self._thread.join(timeout=2.0)
 
     def _cleaner(self) -> None:
-        while not self._stop_event.wait(CHECK_INTERVAL_TIME):
-            now = time.monotonic()
-            to_remove: list[int] = []
-            with self._lock:
-                for pid, p in list(self.players.items()):
-                    if now - p.last_update >= TIMEOUT_TIME:
-                        to_remove.append(pid)
-                for pid in to_remove:
-                    _ = self.players.pop(pid, None)
-                    
+        expiry = self._expiry
+        with self._lock:
+            while not self._stop_event.is_set():
+                if not expiry or self._expiry_scheduled:
+                    self._expiry_cond.wait()
+                    continue
+                deadline = expiry[0][0]
+                now = time.monotonic()
+                if deadline > now:
+                    self._expiry_cond.wait(deadline - now)
+                    continue
+                self._expiry_scheduled = True
+                try:
+                    self._loop.call_soon_threadsafe(self.expire_due)
+                except RuntimeError:
+                    return  # Loop closed
+
+    def expire_due(self) -> None:
+        """Remove players idle for TIMEOUT_TIME. Call on the thread that calls update."""
+        expiry = self._expiry
+        now = time.monotonic()
+        with self._lock:
+            self._expiry_scheduled = False
+            while expiry and expiry[0][0] <= now:
+                _, pid, generation = heapq.heappop(expiry)
+                if not self.active[pid] or self._generations[pid] != generation:
+                    continue  # Already unregistered, or the id was reused
+                idle_until = self.last_update[pid] + TIMEOUT_TIME
+                if idle_until > now:
+                    heapq.heappush(expiry, (idle_until, pid, generation))
+                else:
+                    # The row goes, but the id stays reserved: the client's socket may still be
+                    # open, and its disconnect will unregister this id
+                    self._remove(pid)
+                    self._expired.add(pid)
+            self._expiry_cond.notify()
+
     # API
-    def register(self) -> int:
+    def register(self, pid: int | None = None) -> int:
+        """Allocate a player row. A shard worker passes the id its router already assigned."""
         with self._lock:
+            if pid is not None:
+                self._external_ids = True
+                while pid >= self.capacity:
+                    self._grow(self.capacity * 2)
+                if self.active[pid]:
+                    return pid
+                self._expired.discard(pid)
+                self._next_id = max(self._next_id, pid + 1)
             # Reuse available IDs first, otherwise allocate new ID
-            if self._available_ids:
-                pid = self._available_ids.pop(0)
+            elif self._available_ids:
+                pid = heapq.heappop(self._available_ids)  # Lowest free id, for predictable allocation
             else:
                 pid = self._next_id
                 self._next_id += 1
+                if pid >= self.capacity:
+                    self._grow(self.capacity * 2)
             # HINT: This part might be helpful for direction change
             # Maybe you can add other parameters?
-            self.players[pid] = Player(pid, 0.0, 0.0, "", time.monotonic(), "DOWN", False)
+            self.xs[pid] = 0.0
+            self.ys[pid] = 0.0
+            self.map_ids[pid] = self._empty_map
+            self.directions[pid] = _DOWN
+            self.moving[pid] = 0
+            now = time.monotonic()
+            self.last_update[pid] = now
+            self._mark_dirty(pid, self._empty_map)
+            self.active[pid] = 1
+            self._count += 1
+            self.grid.move(pid, self._empty_map, 0.0, 0.0)
+
+            generation = (self._generations[pid] + 1) & 0xFFFFFFFF
+            self._generations[pid] = generation
+            # Every pending deadline is at most now + TIMEOUT_TIME, so this only becomes the
+            # earliest one when the heap was empty
+            if not self._expiry:
+                self._expiry_cond.notify()
+            heapq.heappush(self._expiry, (now + TIMEOUT_TIME, pid, generation))
             return pid
 
     def unregister(self, pid: int) -> bool:
         """Remove a player from the system and make their ID available for reuse"""
         with self._lock:
-            if pid in self.players:
-                del self.players[pid]
-                # Add the ID back to the pool for reuse
-                if pid not in self._available_ids:
-                    self._available_ids.append(pid)
-                    self._available_ids.sort()  # Keep IDs sorted for predictable allocation
-                return True
-            return False
-
-    def update(self, pid: int, x: float, y: float, map_name: str, direction: str = "DOWN", is_moving: bool = False) -> bool:
-        with self._lock:
-            p = self.players.get(pid)
-            if not p:
+            if not (0 <= pid < self.capacity):
                 return False
+            if self.active[pid]:
+                self._remove(pid)
+            elif pid in self._expired:
+                self._expired.discard(pid)
             else:
-                # HINT: This part might be helpful for direction change
-                # Maybe you can add other parameters?
-                p.update(float(x), float(y), str(map_name), direction, is_moving)
-                return True
+                return False
+            # Add the ID back to the pool for reuse; its expiry entry goes stale and is dropped when due
+            if not self._external_ids:
+                heapq.heappush(self._available_ids, pid)
+            return True
+
+    def _remove(self, pid: int) -> None:
+        """Free the row. Caller must hold _lock."""
+        self.active[pid] = 0
+        self.grid.remove(pid)
+        self._mark_dirty(pid, self.map_ids[pid])
+        self._count -= 1
+
+    def update(self, pid: int, x: float, y: float, map_name: str, direction: str = "DOWN", is_moving: bool = False) -> bool:
+        if not (0 <= pid < self.capacity) or not self.active[pid]:
+            return False
+        # HINT: This part might be helpful for direction change
+        # Maybe you can add other parameters?
+        x = float(x)
+        y = float(y)
+        mid = self.maps.intern(str(map_name))
+        dir_id = _DIRECTION_IDS.get(direction, _DOWN)
+        moving = 1 if is_moving else 0
+        old_map = self.map_ids[pid]
+        moved = x != self.xs[pid] or y != self.ys[pid] or mid != old_map
+        if moved:
+            self.last_update[pid] = time.monotonic()
+            self.grid.move(pid, mid, x, y)
+        elif dir_id == self.directions[pid] and moving == self.moving[pid]:
+            return True
+        self.xs[pid] = x
+        self.ys[pid] = y
+        self.map_ids[pid] = mid
+        self.directions[pid] = dir_id
+        self.moving[pid] = moving
+        if mid != old_map:
+            self.dirty_maps.add(old_map)
+        self._mark_dirty(pid, mid)
+        return True
+
+    def touch(self, pid: int) -> bool:
+        """Heartbeat from a player that is standing still: keep it from being expired"""
+        if not (0 <= pid < self.capacity) or not self.active[pid]:
+            return False
+        self.last_update[pid] = time.monotonic()
+        return True
+
+    def _mark_dirty(self, pid: int, mid: int) -> None:
+        self.versions[pid] = (self.versions[pid] + 1) & 0xFFFFFFFF
+        self.dirty[pid] = 1
+        self.dirty_maps.add(mid)
+
+    # Snapshots
+    def active_ids(self) -> list[int]:
+        n = self._next_id
+        return list(compress(range(n), self.active[:n]))
+
+    def take_dirty(self) -> tuple[list[int], set[int]]:
+        """Return (dirty player ids, dirty map ids) and clear both"""
+        n = self._next_id
+        ids = list(compress(range(n), self.dirty[:n]))
+        for pid in ids:
+            self.dirty[pid] = 0
+        maps, self.dirty_maps = self.dirty_maps, set()
+        return ids, maps
+
+    def within(self, map_id: int, x: float, y: float, radius: float) -> list[int]:
+        """Active players on `map_id` within `radius` pixels of (x, y)"""
+        return self.grid.query(map_id, x, y, radius, self.xs, self.ys)
+
+    def nearby(self, pid: int, radius_tiles: float) -> list[int]:
+        """Other players on the same map within `radius_tiles` tiles of this one"""
+        if not (0 <= pid < self.capacity) or not self.active[pid]:
+            return []
+        found = self.within(self.map_ids[pid], self.xs[pid], self.ys[pid], radius_tiles * TILE_SIZE)
+        return [other for other in found if other != pid]
+
+    def row(self, pid: int) -> dict:
+        """One player in the JSON message format"""
+        return {
+            "id": pid,
+            "x": self.xs[pid],
+            "y": self.ys[pid],
+            "map": self.maps.name_of(self.map_ids[pid]),
+            "direction": DIRECTIONS[self.directions[pid]],
+            "is_moving": bool(self.moving[pid])
+        }
+
+    def get(self, pid: int) -> Player | None:
+        if not (0 <= pid < self.capacity) or not self.active[pid]:
+            return None
+        return Player(
+            pid, self.xs[pid], self.ys[pid], self.maps.name_of(self.map_ids[pid]),
+            self.last_update[pid], DIRECTIONS[self.directions[pid]], bool(self.moving[pid])
+        )
 
     def list_players(self) -> dict:
-        with self._lock:
-            player_list = {}
-            for p in self.players.values():
-                # HINT: This part might be helpful for direction change
-                # Maybe you can add other parameters?
-                player_list[p.id] = {
-                    "id": p.id,
-                    "x": p.x,
-                    "y": p.y,
-                    "map": p.map,
-                    "direction": p.direction,
-                    "is_moving": p.is_moving
-                }
-            return player_list
+        return {pid: self.row(pid) for pid in self.active_ids()}
 
     def has_players(self) -> bool:
         """Check if there are any connected players"""
-        with self._lock:
-            return len(self.players) > 0
+        return self._count > 0
+
+    def __len__(self) -> int:
+        return self._count
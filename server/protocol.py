@@ -0,0 +1,167 @@
+"""
+Wire formats shared by server.py and OnlineManager.
+
+Everything is JSON text by default. After connecting, a client may send
+    {"type": "hello", "encodings": ["bin1", "json"]}
+and the server answers with
+    {"type": "hello_ack", "encoding": "bin1", "maps": [...]}
+From then on position traffic (player_update, players_update, players_delta) travels as
+binary websocket frames in the "bin1" format below. Chat and control messages stay JSON.
+
+bin1 frames (little endian):
+    header        : uint8 frame type
+    player_update : float32 x, float32 y, uint16 map id, uint8 direction, uint8 is_moving
+    players_*     : float64 timestamp, uint16 player count, uint16 removed count,
+                    count x (uint32 id, float32 x, float32 y, uint16 map id, uint8 direction, uint8 is_moving),
+                    removed x uint32 id
+"""
+import struct
+
+ENCODING_JSON = "json"
+ENCODING_BIN1 = "bin1"
+SUPPORTED_ENCODINGS = (ENCODING_BIN1, ENCODING_JSON)
+
+# Connections to this path only answer {"type": "stats"} requests: no player is registered
+STATS_PATH = "/stats"
+
+FRAME_PLAYER_UPDATE = 1
+FRAME_PLAYERS_UPDATE = 2
+FRAME_PLAYERS_DELTA = 3
+
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+_DIRECTION_IDS = {name: i for i, name in enumerate(DIRECTIONS)}
+
+# Maps every client knows about. Anything else is interned by the server at runtime.
+DEFAULT_MAPS = ("map.tmx", "new_map.tmx", "gym.tmx", "gym_new.tmx")
+
+_HEADER = struct.Struct("<B")
+_PLAYER_UPDATE = struct.Struct("<BffHBB")
+_PLAYERS_HEADER = struct.Struct("<BdHH")
+_PLAYER_RECORD = struct.Struct("<IffHBB")
+_REMOVED = struct.Struct("<I")
+
+
+class MapTable:
+    """Interned map names <-> small integer ids"""
+    names: list[str]
+    _ids: dict[str, int]
+
+    def __init__(self, names: tuple[str, ...] | list[str] = DEFAULT_MAPS):
+        self.names = []
+        self._ids = {}
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name: str) -> int:
+        mid = self._ids.get(name)
+        if mid is None:
+            if len(self.names) >= 0xFFFF:
+                raise ValueError("map table full")
+            mid = len(self.names)
+            self.names.append(name)
+            self._ids[name] = mid
+        return mid
+
+    def id_of(self, name: str) -> int | None:
+        return self._ids.get(name)
+
+    def name_of(self, mid: int) -> str:
+        return self.names[mid] if 0 <= mid < len(self.names) else ""
+
+
+def negotiate(offered: list[str]) -> str:
+    """Pick the best encoding both sides support"""
+    for encoding in SUPPORTED_ENCODINGS:
+        if encoding in offered:
+            return encoding
+    return ENCODING_JSON
+
+
+def frame_type(frame: bytes) -> int:
+    return _HEADER.unpack_from(frame)[0]
+
+
+# Client -> server
+def encode_player_update(maps: MapTable, x: float, y: float, map_name: str, direction: str, is_moving: bool) -> bytes | None:
+    """Returns None if the map has no id yet; the caller should fall back to JSON"""
+    mid = maps.id_of(map_name)
+    if mid is None:
+        return None
+    return _PLAYER_UPDATE.pack(
+        FRAME_PLAYER_UPDATE, x, y, mid,
+        _DIRECTION_IDS.get(direction, 1), 1 if is_moving else 0
+    )
+
+
+def decode_player_update(maps: MapTable, frame: bytes) -> dict:
+    _, x, y, mid, direction, is_moving = _PLAYER_UPDATE.unpack(frame)
+    return {
+        "type": "player_update",
+        "x": x,
+        "y": y,
+        "map": maps.name_of(mid),
+        "direction": DIRECTIONS[direction] if direction < len(DIRECTIONS) else "DOWN",
+        "is_moving": bool(is_moving),
+    }
+
+
+# Server -> client
+def encode_players(maps: MapTable, msg_type: str, players: dict[int, dict], removed: list[int] | tuple[int, ...], timestamp: float) -> bytes:
+    kind = FRAME_PLAYERS_DELTA if msg_type == "players_delta" else FRAME_PLAYERS_UPDATE
+    out = bytearray(_PLAYERS_HEADER.size + _PLAYER_RECORD.size * len(players) + _REMOVED.size * len(removed))
+    _PLAYERS_HEADER.pack_into(out, 0, kind, timestamp, len(players), len(removed))
+    offset = _PLAYERS_HEADER.size
+    pack_record = _PLAYER_RECORD.pack_into
+    for pid, p in players.items():
+        pack_record(
+            out, offset, int(pid), p["x"], p["y"], maps.intern(p["map"]),
+            _DIRECTION_IDS.get(p["direction"], 1), 1 if p["is_moving"] else 0
+        )
+        offset += _PLAYER_RECORD.size
+    for pid in removed:
+        _REMOVED.pack_into(out, offset, pid)
+        offset += _REMOVED.size
+    return bytes(out)
+
+
+def encode_players_columns(msg_type: str, ids: list[int] | tuple[int, ...], xs, ys, map_ids, directions, moving,
+                           removed: list[int] | tuple[int, ...], timestamp: float) -> bytes:
+    """Same frame as encode_players, packed straight from PlayerHandler's column arrays"""
+    kind = FRAME_PLAYERS_DELTA if msg_type == "players_delta" else FRAME_PLAYERS_UPDATE
+    out = bytearray(_PLAYERS_HEADER.size + _PLAYER_RECORD.size * len(ids) + _REMOVED.size * len(removed))
+    _PLAYERS_HEADER.pack_into(out, 0, kind, timestamp, len(ids), len(removed))
+    offset = _PLAYERS_HEADER.size
+    pack_record = _PLAYER_RECORD.pack_into
+    for pid in ids:
+        pack_record(out, offset, pid, xs[pid], ys[pid], map_ids[pid], directions[pid], moving[pid])
+        offset += _PLAYER_RECORD.size
+    for pid in removed:
+        _REMOVED.pack_into(out, offset, pid)
+        offset += _REMOVED.size
+    return bytes(out)
+
+
+def decode_players(maps: MapTable, frame: bytes) -> dict:
+    """Decode into the same dict shape as the JSON players_update / players_delta messages"""
+    kind, timestamp, count, n_removed = _PLAYERS_HEADER.unpack_from(frame)
+    players: dict[int, dict] = {}
+    offset = _PLAYERS_HEADER.size
+    for pid, x, y, mid, direction, is_moving in _PLAYER_RECORD.iter_unpack(frame[offset:offset + count * _PLAYER_RECORD.size]):
+        players[pid] = {
+            "id": pid,
+            "x": x,
+            "y": y,
+            "map": maps.name_of(mid),
+            "direction": DIRECTIONS[direction] if direction < len(DIRECTIONS) else "DOWN",
+            "is_moving": bool(is_moving),
+        }
+    offset += count * _PLAYER_RECORD.size
+    removed = [pid for (pid,) in _REMOVED.iter_unpack(frame[offset:offset + n_removed * _REMOVED.size])]
+    data = {
+        "type": "players_delta" if kind == FRAME_PLAYERS_DELTA else "players_update",
+        "players": players,
+        "timestamp": timestamp,
+    }
+    if kind == FRAME_PLAYERS_DELTA:
+        data["removed"] = removed
+    return data
@@ -0,0 +1,223 @@
+"""
+Front end of the sharded server (python server.py --shards N).
+
+The router keeps every websocket, assigns player ids and owns the chat; player positions
+and broadcasts live in N worker processes (server/shardWorker.py), each owning a fixed set of
+maps. Commands to a worker are batched per event loop iteration and sent down a pipe; each
+worker's frames come back on a second pipe, read by one thread per worker that hands them to
+the event loop with call_soon_threadsafe. Workers also report their tick timing and CPU time
+on that pipe, which `stats` adds up.
+
+A player belongs to the shard that owns the map it last reported. Reporting a map owned by
+another shard (a teleport) migrates it: the old shard gets "leave", the new one "join" and
+then sends the player a full snapshot of its new map.
+"""
+import asyncio
+import heapq
+import multiprocessing
+import threading
+import zlib
+from multiprocessing.connection import Connection
+from server.fanout import ClientSession, FRAME_DELTA, FRAME_SNAPSHOT
+from server.protocol import MapTable, DEFAULT_MAPS, ENCODING_JSON
+from server.shardWorker import run_worker
+
+
+class _Shard:
+    index: int
+    process: multiprocessing.Process
+    commands: Connection  # Router -> worker
+    frames: Connection    # Worker -> router
+    outbox: list[tuple]
+    reader: threading.Thread | None
+
+    def __init__(self, index: int, process: multiprocessing.Process, commands: Connection, frames: Connection):
+        self.index = index
+        self.process = process
+        self.commands = commands
+        self.frames = frames
+        self.outbox = []
+        self.reader = None
+
+
+class ShardRouter:
+    maps: MapTable
+    shards: list[_Shard]
+    _sessions: dict[int, ClientSession]
+    _shard_of: dict[int, int]  # player id -> shard it currently lives on
+    _encodings: dict[int, str]
+    _reports: dict[int, dict]  # shard index -> latest tick statistics it sent
+    _next_id: int
+    _available_ids: list[int]
+    _loop: asyncio.AbstractEventLoop | None
+    _flush_scheduled: bool
+
+    def __init__(self, count: int, mode: str, radius_tiles: float | None, snapshot_interval: int, tick_interval: float):
+        if count < 1:
+            raise ValueError("need at least one shard")
+        self.maps = MapTable()
+        self.maps.intern("")  # Same table a PlayerHandler starts with, so ids match the workers'
+        self._worker_args = (mode, radius_tiles, snapshot_interval, tick_interval)
+        self._count = count
+        self.shards = []
+        self._sessions = {}
+        self._shard_of = {}
+        self._encodings = {}
+        self._reports = {}
+        self._next_id = 0
+        self._available_ids = []
+        self._loop = None
+        self._flush_scheduled = False
+
+    # Lifecycle
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        for index in range(self._count):
+            commands_recv, commands_send = multiprocessing.Pipe(duplex=False)
+            frames_recv, frames_send = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=run_worker, name=f"Shard-{index}", daemon=True,
+                args=(index, commands_recv, frames_send, list(self.maps.names), *self._worker_args)
+            )
+            process.start()
+            shard = _Shard(index, process, commands_send, frames_recv)
+            shard.reader = threading.Thread(target=self._reader, args=(shard,), name=f"ShardReader-{index}", daemon=True)
+            shard.reader.start()
+            self.shards.append(shard)
+
+    def stop(self) -> None:
+        for shard in self.shards:
+            try:
+                shard.commands.send(None)
+            except OSError:
+                pass
+        for shard in self.shards:
+            shard.process.join(timeout=2.0)
+            if shard.process.is_alive():
+                shard.process.terminate()
+
+    def shard_for(self, map_name: str) -> int:
+        """Known maps are dealt out round-robin, anything else by a stable hash of its name"""
+        if map_name in DEFAULT_MAPS:
+            return DEFAULT_MAPS.index(map_name) % self._count
+        return zlib.crc32(map_name.encode()) % self._count
+
+    # Players
+    def register(self, session: ClientSession) -> int:
+        if self._available_ids:
+            pid = heapq.heappop(self._available_ids)
+        else:
+            pid = self._next_id
+            self._next_id += 1
+        self._sessions[pid] = session
+        self._encodings[pid] = ENCODING_JSON
+        return pid
+
+    def unregister(self, pid: int) -> bool:
+        if self._sessions.pop(pid, None) is None:
+            return False
+        shard = self._shard_of.pop(pid, None)
+        if shard is not None:
+            self._send(shard, ("leave", pid))
+        self._encodings.pop(pid, None)
+        heapq.heappush(self._available_ids, pid)
+        return True
+
+    def has_players(self) -> bool:
+        return bool(self._sessions)
+
+    @property
+    def player_count(self) -> int:
+        return len(self._sessions)
+
+    def set_encoding(self, pid: int, encoding: str) -> None:
+        self._encodings[pid] = encoding
+        shard = self._shard_of.get(pid)
+        if shard is not None:
+            self._send(shard, ("encoding", pid, encoding))
+
+    def update(self, pid: int, x: float, y: float, map_name: str, direction: str = "DOWN", is_moving: bool = False) -> bool:
+        if pid not in self._sessions:
+            return False
+        if self.maps.id_of(map_name) is None:
+            self.maps.intern(map_name)
+            for shard in self.shards:
+                self._send(shard.index, ("map", map_name))
+        target = self.shard_for(map_name)
+        current = self._shard_of.get(pid)
+        if current != target:
+            # Teleported onto a map another shard owns
+            if current is not None:
+                self._send(current, ("leave", pid))
+            self._send(target, ("join", pid, self._encodings.get(pid, ENCODING_JSON)))
+            self._shard_of[pid] = target
+        self._send(target, ("update", pid, x, y, map_name, direction, is_moving))
+        return True
+
+    def touch(self, pid: int) -> bool:
+        shard = self._shard_of.get(pid)
+        if shard is None:
+            return False
+        self._send(shard, ("touch", pid))
+        return True
+
+    # Statistics
+    def send_rate_hint(self, pid: int) -> float:
+        """TickStats.send_rate_hint of the shard the player lives on"""
+        report = self._reports.get(self._shard_of.get(pid))
+        if report is None:
+            return 1.0 / self._worker_args[3]
+        return report["send_rate"]
+
+    def stats(self) -> dict:
+        """Cumulative tick timing and CPU time summed over the workers, in the TickStats.to_dict layout"""
+        reports = [self._reports[i] for i in sorted(self._reports)]
+        return {
+            "tick_target": self._worker_args[3],
+            "ticks": sum(r["ticks"] for r in reports),
+            "late_ticks": sum(r["late_ticks"] for r in reports),
+            "tick_interval_total": sum(r["tick_interval_total"] for r in reports),
+            "tick_work_total": sum(r["tick_work_total"] for r in reports),
+            "worker_cpu_time": sum(r["cpu_time"] for r in reports),
+            "shard_stats": reports,
+        }
+
+    # IPC
+    def _send(self, index: int, cmd: tuple) -> None:
+        self.shards[index].outbox.append(cmd)
+        if not self._flush_scheduled:
+            # Everything queued during this loop iteration goes out in one pipe write per shard
+            self._flush_scheduled = True
+            self._loop.call_soon(self._flush)
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        for shard in self.shards:
+            if shard.outbox:
+                batch, shard.outbox = shard.outbox, []
+                try:
+                    shard.commands.send(batch)
+                except OSError as e:
+                    print(f"[Server] Shard {shard.index} unreachable: {e}")
+
+    def _reader(self, shard: _Shard) -> None:
+        while True:
+            try:
+                frames = shard.frames.recv()
+            except (EOFError, OSError):
+                print(f"[Server] Shard {shard.index} exited")
+                return
+            if isinstance(frames, dict):
+                self._loop.call_soon_threadsafe(self._reports.__setitem__, shard.index, frames)
+            else:
+                self._loop.call_soon_threadsafe(self._deliver, shard.index, frames)
+
+    def _deliver(self, index: int, frames: list[tuple[int, str | bytes, bool]]) -> None:
+        for pid, msg, is_full in frames:
+            session = self._sessions.get(pid)
+            # Frames from a shard the player already left are stale
+            if session is None or session.closed or self._shard_of.get(pid) != index:
+                continue
+            session.send(msg, FRAME_SNAPSHOT if is_full else FRAME_DELTA)
+            if session.needs_resync:
+                self._send(index, ("resync", pid))
@@ -0,0 +1,99 @@
+"""
+One shard of the sharded server: a process that owns the players of some maps.
+
+The router (server/shardRouter.py) sends lists of commands down `commands`:
+    ("map", name)                        intern a new map name (keeps map ids identical everywhere)
+    ("join", pid, encoding)              a player arrived on one of this shard's maps
+    ("leave", pid)                       a player left for another shard or disconnected
+    ("update", pid, x, y, map, direction, is_moving)
+    ("touch", pid)                       heartbeat from an idle player
+    ("encoding", pid, encoding)          the client negotiated a wire format
+    ("resync", pid)                      the client dropped frames and needs a full snapshot
+    None                                 shut down
+Every tick the shard runs the normal Broadcaster over its own PlayerHandler and sends the
+resulting [(pid, message, is_full), ...] back up `frames` in one message. Frames shared by
+several viewers are pickled once, so the router gets the same sharing the single-process
+server has. Every REPORT_INTERVAL the shard also sends a dict with its cumulative tick timing
+(TickStats.to_dict), CPU time and send rate hint: the router adds them up for the "stats"
+request and passes the hint on to the shard's players.
+"""
+import time
+from multiprocessing.connection import Connection
+from server.playerHandler import PlayerHandler
+from server.broadcaster import Broadcaster, TickStats
+from server.spatialGrid import SpatialGrid, cell_size_for
+from server.protocol import MapTable
+
+STATS_INTERVAL = 10.0  # Seconds between broadcast statistics reports
+REPORT_INTERVAL = 0.25  # Seconds between tick statistics sent to the router
+
+
+def run_worker(index: int, commands: Connection, frames: Connection, map_names: list[str],
+               mode: str, radius: float | None, snapshot_interval: int, tick_interval: float) -> None:
+    handler = PlayerHandler(maps=MapTable(map_names), grid=SpatialGrid(cell_size_for(radius)))
+    broadcaster = Broadcaster(mode, radius, snapshot_interval, maps=handler.maps)
+    viewers: set[int] = set()
+    ticks = TickStats(tick_interval)
+
+    last_report = time.monotonic()
+    last_stats = time.monotonic()
+    last_tick = time.monotonic()
+    next_tick = time.monotonic() + tick_interval
+    try:
+        while True:
+            timeout = next_tick - time.monotonic()
+            if timeout > 0 and commands.poll(timeout):
+                batch = commands.recv()
+                if batch is None:
+                    return
+                for cmd in batch:
+                    kind = cmd[0]
+                    if kind == "update":
+                        handler.update(*cmd[1:])
+                    elif kind == "touch":
+                        handler.touch(cmd[1])
+                    elif kind == "join":
+                        handler.register(cmd[1])
+                        broadcaster.add_viewer(cmd[1])
+                        broadcaster.set_encoding(cmd[1], cmd[2])
+                        viewers.add(cmd[1])
+                    elif kind == "leave":
+                        handler.unregister(cmd[1])
+                        broadcaster.remove_viewer(cmd[1])
+                        viewers.discard(cmd[1])
+                    elif kind == "encoding":
+                        broadcaster.set_encoding(cmd[1], cmd[2])
+                    elif kind == "resync":
+                        broadcaster.request_full(cmd[1])
+                    elif kind == "map":
+                        handler.maps.intern(cmd[1])
+                continue
+
+            now = time.monotonic()
+            # Single threaded: idle players are expired here rather than by a cleaner thread
+            handler.expire_due()
+            out = broadcaster.build_frames(handler, viewers)
+            if out:
+                frames.send(out)
+                for _, msg, _ in out:
+                    broadcaster.stats.record(len(msg))
+            ticks.record(now - last_tick, time.monotonic() - now)
+            last_tick = now
+            next_tick += tick_interval
+            if next_tick < now:
+                next_tick = now + tick_interval  # Slipped: do not try to catch up with a burst
+
+            if now - last_stats >= REPORT_INTERVAL:
+                frames.send({"shard": index, "cpu_time": time.process_time(),
+                             "send_rate": ticks.send_rate_hint(), **ticks.to_dict()})
+                last_stats = now
+
+            if now - last_report >= STATS_INTERVAL:
+                msgs, nbytes = broadcaster.stats.per_tick()
+                if viewers:
+                    print(f"[Shard {index}] Broadcast ({broadcaster.mode}): {len(viewers)} players, "
+                          f"{msgs:.2f} msgs/tick, {nbytes:.0f} bytes/tick")
+                broadcaster.stats.reset()
+                last_report = now
+    except (EOFError, KeyboardInterrupt):
+        pass
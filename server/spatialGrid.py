@@ -0,0 +1,97 @@
+"""
+Uniform spatial hash over player positions, one hash per map.
+
+Each map id owns a dict from (cell x, cell y) to the set of player ids in that cell. Players
+are moved between cells only when they cross a cell edge, so an update is O(1). A radius query
+visits the (2r / cell + 1)^2 cells around the point and filters by exact distance, which is
+proportional to the number of players nearby instead of the number on the server.
+
+There is no lock: PlayerHandler only changes the grid on the thread that updates players,
+expiry included. Empty cells are kept, since a player who just left a cell often walks back.
+"""
+import math
+
+TILE_SIZE = 64          # Must match GameSettings.TILE_SIZE on the client
+DEFAULT_CELL_TILES = 8  # Cell edge in tiles; queries are cheapest when this is close to the query radius
+
+
+class SpatialGrid:
+    cell_size: float
+    _maps: dict[int, dict[tuple[int, int], set[int]]]
+    _where: dict[int, tuple[int, int, int]]  # player id -> (map id, cell x, cell y)
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_TILES * TILE_SIZE):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = float(cell_size)
+        self._maps = {}
+        self._where = {}
+
+    def _key(self, map_id: int, x: float, y: float) -> tuple[int, int, int]:
+        return map_id, int(x // self.cell_size), int(y // self.cell_size)
+
+    def move(self, pid: int, map_id: int, x: float, y: float) -> None:
+        """Insert the player, or move it if it crossed into another cell"""
+        key = self._key(map_id, x, y)
+        old = self._where.get(pid)
+        if old == key:
+            return
+        if old is not None:
+            cell = self._maps.get(old[0], {}).get(old[1:])
+            if cell is not None:
+                cell.discard(pid)
+        self._maps.setdefault(map_id, {}).setdefault(key[1:], set()).add(pid)
+        self._where[pid] = key
+
+    def remove(self, pid: int) -> None:
+        old = self._where.pop(pid, None)
+        if old is not None:
+            cell = self._maps.get(old[0], {}).get(old[1:])
+            if cell is not None:
+                cell.discard(pid)
+
+    def query(self, map_id: int, x: float, y: float, radius: float, xs=None, ys=None) -> list[int]:
+        """
+        Player ids on `map_id` whose cell overlaps the circle.
+
+        If the position columns `xs` / `ys` are given, the result is filtered to players
+        within `radius` of (x, y); otherwise it is the cell-level candidate set.
+        """
+        cells = self._maps.get(map_id)
+        if not cells:
+            return []
+        size = self.cell_size
+        x0, x1 = int((x - radius) // size), int((x + radius) // size)
+        y0, y1 = int((y - radius) // size), int((y + radius) // size)
+        out: list[int] = []
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(cells):
+            # Radius larger than the populated part of the map: walk the occupied cells instead
+            candidates = [c for (cx, cy), c in list(cells.items()) if x0 <= cx <= x1 and y0 <= cy <= y1]
+        else:
+            candidates = [c for c in (cells.get((cx, cy)) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)) if c]
+        if xs is None or ys is None:
+            for cell in candidates:
+                out.extend(cell)
+            return out
+        r2 = radius * radius
+        for cell in candidates:
+            for pid in tuple(cell):
+                dx = xs[pid] - x
+                dy = ys[pid] - y
+                if dx * dx + dy * dy <= r2:
+                    out.append(pid)
+        return out
+
+    def map_count(self, map_id: int) -> int:
+        """Players currently on a map"""
+        return sum(len(c) for c in list(self._maps.get(map_id, {}).values()))
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+
+def cell_size_for(radius_tiles: float | None) -> float:
+    """Cell edge in pixels for a broadcast radius given in tiles"""
+    if not radius_tiles or not math.isfinite(radius_tiles):
+        return DEFAULT_CELL_TILES * TILE_SIZE
+    return max(1.0, radius_tiles) * TILE_SIZE
@@ -1,7 +1,7 @@
 import pygame as pg
 
 from src.utils import GameSettings, Logger
-from .services import scene_manager, input_manager
+from .services import scene_manager, input_manager, save_writer
 
 from src.scenes.menu_scene import MenuScene
 from src.scenes.game_scene import GameScene
@@ -34,7 +34,7 @@ class Engine:
         scene_manager.register_scene("setting", SettingScene())
         
         # Battle scenes (will be re-created dynamically)
-        game_manager = GameManager.load("saves/game0.json")
+        game_manager = GameManager.load(GameSettings.SAVE_PATH)
         scene_manager.register_scene("battle", BattleScene(game_manager))
         scene_manager.register_scene("catch_pokemon", CatchPokemonScene(game_manager))
         scene_manager.register_scene("battle_transition", BattleTransitionScene())
@@ -51,6 +51,9 @@ class Engine:
             self.update(dt)
             self.render()
 
+        # Make sure the last save reaches the disk before the game closes
+        save_writer.flush()
+
     def handle_events(self):
         input_manager.reset()
         for event in pg.event.get():
@@ -1,16 +1,23 @@
 from __future__ import annotations
 from src.utils import Logger, GameSettings, Position, Teleport
+from src.utils import save_file
 import json, os
 import pygame as pg
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
 
 if TYPE_CHECKING:
     from src.maps.map import Map
+    from src.utils.pathfinding import FlowField, NavGrid
     from src.scenes.player import Player
     from src.entities.enemy_trainer import EnemyTrainer
     from src.entities.merchant_npc import NPC
     from src.entities.chest import Chest
     from src.data.bag import Bag
+    from src.maps.entity_grid import EntityGrid
+
+# How far from the player an entity can notice or be reached: trainers see 3 tiles ahead,
+# NPCs and chests are reached from 1.5 tiles
+ENTITY_REACH = 4 * GameSettings.TILE_SIZE
 
 class GameManager:
     # Entities
@@ -19,6 +26,7 @@ class GameManager:
     npcs: dict[str, list["NPC"]]
     chests: dict[str, list["Chest"]]
     bag: "Bag"
+    entity_grids: dict[str, "EntityGrid"]  # Per map, for collision and proximity queries
     
     # Map properties
     current_map_key: str
@@ -46,6 +54,9 @@ class GameManager:
         self.chests = chests if chests is not None else {}
         self.bag = bag if bag is not None else Bag([], [])
         self.boss_defeated = boss_defeated
+        self.entity_grids = {}
+        self.index_entities()
+        self._save_cache = {}  # Section name -> (what was encoded, encoded bytes)
 
         # Track player spawn/last-position per map (in pixels)
         # Initialize from provided maps; if a player is present use its position for current map
@@ -119,50 +130,190 @@ class GameManager:
                 # set a short cooldown after teleport so player won't immediately retrigger teleport
                 self.teleport_cooldown = self.TELEPORT_WAIT
             
+    def index_entities(self) -> None:
+        """(Re)build the per-map entity grids from the trainer, NPC and chest lists"""
+        from src.maps.entity_grid import EntityGrid
+
+        self.entity_grids = {}
+        for key in self.maps:
+            grid = self.entity_grids[key] = EntityGrid()
+            for kind, entities in (
+                ("trainer", self.enemy_trainers.get(key, [])),
+                ("npc", self.npcs.get(key, [])),
+                ("chest", self.chests.get(key, [])),
+            ):
+                for entity in entities:
+                    grid.insert(entity, entity.hitbox, kind)
+
+    def entity_moved(self, entity) -> None:
+        """Called by entities after their hitbox moved"""
+        grid = self.entity_grids.get(self.current_map_key)
+        if grid is not None:
+            grid.move(entity)
+
+    def entities_near(self, rect: pg.Rect, kind: str | None = None) -> list:
+        """Entities on the current map (of `kind`: trainer, npc or chest) in the grid cells around `rect`"""
+        grid = self.entity_grids.get(self.current_map_key)
+        if grid is None:
+            return []
+        return grid.query(rect, kind)
+
+    def entities_near_player(self, kind: str | None = None) -> list:
+        """Entities close enough to the player to see it or be interacted with, plus a few more"""
+        if self.player is None:
+            return []
+        return self.entities_near(self.player.animation.rect.inflate(2 * ENTITY_REACH, 2 * ENTITY_REACH), kind)
+            
+    def nav_layout(self, map_key: str) -> tuple[tuple, Callable[[], NavGrid]]:
+        """
+        Key of a map's current obstacle layout for navigation, and a function building its grid.
+        Collision tiles, bushes, NPCs and enemy trainers are obstacles; the key changes only when
+        an NPC or trainer stands somewhere else, so cached flow fields stay valid until then.
+        """
+        game_map = self.maps[map_key]
+        blockers = [
+            pg.Rect(entity.position.x, entity.position.y, GameSettings.TILE_SIZE, GameSettings.TILE_SIZE)
+            for entity in self.npcs.get(map_key, []) + self.enemy_trainers.get(map_key, [])
+        ]
+        layout = (map_key, tuple(sorted(rect.topleft for rect in blockers)))
+
+        def build_grid() -> NavGrid:
+            grid = game_map.nav_grid()
+            for rect in blockers:
+                grid.block_rect(rect)
+            return grid
+
+        return layout, build_grid
+
+    def nav_field(self, map_key: str, goal_tile: tuple[int, int], base_layout: tuple | None = None) -> FlowField:
+        """
+        Distances to goal_tile from every tile of a map, computed once per goal and layout.
+        With base_layout (an earlier nav_layout key), a new layout's field is repaired from that
+        layout's field rather than searched again.
+        """
+        from src.utils.pathfinding import flow_fields
+        layout, build_grid = self.nav_layout(map_key)
+        return flow_fields.get(layout, goal_tile, build_grid, base_layout)
+
     def check_collision(self, rect: pg.Rect) -> bool:
         if self.maps[self.current_map_key].check_collision(rect):
             return True
-        for entity in self.enemy_trainers[self.current_map_key]:
-            if rect.colliderect(entity.animation.rect):
-                return True
-        for npc in self.npcs.get(self.current_map_key, []):
-            if rect.colliderect(npc.animation.rect):
-                return True
-        for chest in self.chests.get(self.current_map_key, []):
-            if rect.colliderect(chest.sprite.rect):
-                return True
-
-        return False
+        grid = self.entity_grids.get(self.current_map_key)
+        return grid is not None and grid.collides(rect)
         
     def save(self, path: str) -> None:
         try:
             # Update player_spawns with current position before saving
             if self.player is not None:
                 self.player_spawns[self.current_map_key] = self.player.position.copy()
-            
-            with open(path, "w") as f:
-                json.dump(self.to_dict(), f, indent=2)
-            Logger.info(f"Game saved to {path}")
+
+            # Encoded here, written and synced on the save writer's thread
+            from src.core.services import save_writer
+            save_writer.submit(path, self.save_sections())
         except Exception as e:
             Logger.warning(f"Failed to save game: {e}")
-             
+
+    def save_sections(self) -> dict[str, bytes]:
+        """
+        The save file's sections, encoded. Only sections that changed since the last call are
+        encoded again; the others reuse their bytes from then:
+            game      : current map, boss flag, player and the last position on every map (always)
+            bag       : when the bag is dirty (it tracks its own changes)
+            map:<key> : a map's trainers, NPCs and chests, when they differ from the last save
+        """
+        cache = self._save_cache
+        spawns = {
+            key: [spawn.x / GameSettings.TILE_SIZE, spawn.y / GameSettings.TILE_SIZE]
+            for key, spawn in self.player_spawns.items()
+        }
+        sections = {"game": save_file.encode({
+            "current_map": self.current_map_key,
+            "boss_defeated": self.boss_defeated,
+            "player": self.player.to_dict() if self.player is not None else None,
+            "spawns": spawns,
+        })}
+
+        cached = cache.get("bag")
+        if self.bag.dirty or cached is None or cached[0] is not self.bag:
+            cached = cache["bag"] = (self.bag, save_file.encode(self.bag.to_dict()))
+            self.bag.dirty = False
+        sections["bag"] = cached[1]
+
+        for key in self.maps:
+            block = self._map_block(key)
+            name = "map:" + key
+            cached = cache.get(name)
+            if cached is None or cached[0] != block:
+                cached = cache[name] = (block, save_file.encode(block))
+            sections[name] = cached[1]
+        return sections
+
     @classmethod
     def load(cls, path: str) -> "GameManager | None":
+        # A save still on its way to disk is newer than the file: load it from memory
+        from src.core.services import save_writer
+        pending = save_writer.pending(path)
+        if pending is not None:
+            return cls.from_sections(pending)
+
         if not os.path.exists(path):
-            Logger.error(f"No file found: {path}, ignoring load function")
+            # Saves from before the binary format: same name, .json
+            legacy = os.path.splitext(path)[0] + ".json"
+            if legacy == path or not os.path.exists(legacy):
+                Logger.error(f"No file found: {path}, ignoring load function")
+                return None
+            path = legacy
+
+        if not save_file.is_save_file(path):
+            with open(path, "r") as f:
+                data = json.load(f)
+            return cls.from_dict(data)
+
+        try:
+            sections = save_file.read_sections(path)
+        except ValueError as e:
+            Logger.warning(f"Failed to load game: {e}")
             return None
+        return cls.from_sections(sections)
+
+    @classmethod
+    def from_sections(cls, sections: dict[str, bytes]) -> "GameManager":
+        """Load from save_sections() output, by rebuilding the to_dict() layout from_dict reads"""
+        game = save_file.decode(sections["game"])
+        spawns = game.get("spawns", {})
+        map_blocks = []
+        for name, payload in sections.items():
+            if not name.startswith("map:"):
+                continue
+            block = save_file.decode(payload)
+            spawn = spawns.get(block["path"])
+            if spawn is not None:
+                block["player"] = {"x": spawn[0], "y": spawn[1]}
+            map_blocks.append(block)
+        gm = cls.from_dict({
+            "map": map_blocks,
+            "current_map": game["current_map"],
+            "player": game.get("player"),
+            "bag": save_file.decode(sections["bag"]) if "bag" in sections else None,
+            "boss_defeated": game.get("boss_defeated", False),
+        })
+        # The bag just read is the one on disk: the next save only encodes it if it changes
+        if "bag" in sections:
+            gm.bag.dirty = False
+            gm._save_cache["bag"] = (gm.bag, sections["bag"])
+        return gm
 
-        with open(path, "r") as f:
-            data = json.load(f)
-        return cls.from_dict(data)
+    def _map_block(self, key: str) -> dict[str, object]:
+        block = self.maps[key].to_dict()
+        block["enemy_trainers"] = [t.to_dict() for t in self.enemy_trainers.get(key, [])]
+        block["npcs"] = [n.to_dict() for n in self.npcs.get(key, [])]
+        block["chests"] = [c.to_dict() for c in self.chests.get(key, [])]
+        return block
 
     def to_dict(self) -> dict[str, object]:
         map_blocks: list[dict[str, object]] = []
         for key, m in self.maps.items():
-            block = m.to_dict()
-            block["enemy_trainers"] = [t.to_dict() for t in self.enemy_trainers.get(key, [])]
-            block["npcs"] = [n.to_dict() for n in self.npcs.get(key, [])]
-            block["chests"] = [c.to_dict() for c in self.chests.get(key, [])]
+            block = self._map_block(key)
             # Persist the last-known player position for this map (in tiles)
             spawn = self.player_spawns.get(key) or m.spawn
             block["player"] = {
@@ -233,6 +384,7 @@ class GameManager:
         for m in data["map"]:
             raw_data = m.get("chests", [])
             gm.chests[m["path"]] = [Chest.from_dict(c, gm) for c in raw_data]
+        gm.index_entities()
 
         Logger.info("Loading Player")
         if data.get("player"):
@@ -7,6 +7,12 @@ import json
 from collections import deque
 from typing import Optional
 from src.utils import Logger, GameSettings
+from src.utils.interpolation import NetworkClock, Snapshot, SnapshotBuffer
+from src.utils.remote_players import RemotePlayer, RemotePlayerTable
+from server.protocol import (
+    MapTable, ENCODING_JSON, ENCODING_BIN1, SUPPORTED_ENCODINGS,
+    encode_player_update, decode_players
+)
 
 try:
     import websockets
@@ -16,20 +22,46 @@ except ImportError:
 
 from typing import Any
 
+CHAT_HISTORY_PAGE = 50
+CHAT_HISTORY_LIMIT = 500  # Older messages kept on the client after paging back
+
+# Position sends
+SEND_RATE_MAX = 60.0      # Updates per second while walking, at most...
+SEND_RATE_MIN = 5.0       # ...and at least, however slow the link or busy the server
+POSITION_EPSILON = 0.5    # Pixels of movement worth telling the server about
+HEARTBEAT_INTERVAL = 2.0  # Seconds between heartbeats (keeps an idle player alive, measures RTT)
+RTT_BACKOFF = 0.2         # Every RTT_BACKOFF seconds of round trip adds one base interval between sends
+
 
 class OnlineManager:
-    list_players: list[dict]
     player_id: int
+    _players: RemotePlayerTable  # Latest server state of every remote player
+    _snapshots: dict[int, SnapshotBuffer]  # Per remote player, for interpolated rendering
+    _interpolated: dict[int, RemotePlayer]  # Render thread only: this frame's interpolated players
+    _interpolated_membership: int
+    _clock: NetworkClock
     # WebSocket state
     _ws: Optional[Any]
     _ws_loop: Optional[asyncio.AbstractEventLoop]
     _ws_thread: Optional[threading.Thread]
     _stop_event: threading.Event
+    _wakeup: Optional[asyncio.Event]  # Set from any thread when the sender has something to do
     _lock: threading.Lock
-    _update_queue: queue.Queue
+    _pending_update: dict | None  # Latest state from the game thread, not yet looked at by the sender
+    _last_queued: tuple | None
+    _rtt: float | None
+    _server_send_rate: float
+    _send_interval: float
     _chat_out_queue: queue.Queue
     _chat_messages: collections.deque
+    _chat_history: collections.deque
+    _history_pending: bool
+    _history_exhausted: bool
+    _chat_loaded: bool  # The recent messages the server sends after registering have arrived
+    _control_out_queue: queue.Queue
     _last_chat_id: int
+    _encoding: str
+    _maps: MapTable
 
     def __init__(self):
         if websockets is None:
@@ -46,16 +78,33 @@ class OnlineManager:
             self.ws_url = f"ws://{self.base}"
 
         self.player_id = -1
-        self.list_players = []
+        self._lock = threading.Lock()
+        self._players = RemotePlayerTable(self._lock)
+        self._snapshots = {}
+        self._interpolated = {}
+        self._interpolated_membership = -1
+        self._clock = NetworkClock()
         self._ws = None
         self._ws_loop = None
         self._ws_thread = None
         self._stop_event = threading.Event()
-        self._lock = threading.Lock()
-        self._update_queue = queue.Queue(maxsize=10)
+        self._wakeup = None
+        self._pending_update = None
+        self._last_queued = None
+        self._rtt = None
+        self._server_send_rate = SEND_RATE_MAX
+        self._send_interval = 1.0 / SEND_RATE_MAX
         self._chat_out_queue = queue.Queue(maxsize=50)
         self._chat_messages = deque(maxlen=200)
+        # Older messages paged in on request, oldest first
+        self._chat_history = deque(maxlen=CHAT_HISTORY_LIMIT)
+        self._history_pending = False
+        self._history_exhausted = False
+        self._chat_loaded = False
+        self._control_out_queue = queue.Queue(maxsize=10)
         self._last_chat_id = 0
+        self._encoding = ENCODING_JSON
+        self._maps = MapTable()
 
         Logger.info("OnlineManager initialized")
 
@@ -66,27 +115,73 @@ class OnlineManager:
         self.stop()
 
     def get_list_players(self) -> list[dict]:
-        """Get list of players"""
+        """Get list of players, as a copy. Per-frame readers should use `remote_players` instead."""
+        with self._lock:
+            return [
+                {"id": p.id, "x": p.x, "y": p.y, "map": p.map, "direction": p.direction, "is_moving": p.is_moving}
+                for p in self._players.values()
+            ]
+
+    @property
+    def players_version(self) -> int:
+        """Changes whenever a remote player joins, leaves or moves; compare to skip unchanged frames"""
+        return self._players.version
+
+    @property
+    def players_membership(self) -> int:
+        """Changes only when a remote player joins or leaves"""
+        return self._players.membership
+
+    def remote_players(self) -> dict[int, RemotePlayer]:
+        """
+        Latest server state of the remote players, by id. Render thread only: the table and its
+        records are reused and updated in place on the next call, so read them, do not keep them.
+        """
+        return self._players.read()
+
+    def interpolated_players(self) -> dict[int, RemotePlayer]:
+        """
+        Remote players as they should be drawn this frame: rendered slightly in the past and
+        interpolated between received snapshots, or dead-reckoned when updates are late.
+        Render thread only; like `remote_players`, the records are reused every frame.
+        """
+        out = self._interpolated
         with self._lock:
-            return list(self.list_players)
+            render_t = self._clock.render_time(time.monotonic())
+            if self._interpolated_membership != self._players.membership:
+                for pid in [pid for pid in out if pid not in self._snapshots]:
+                    del out[pid]
+                self._interpolated_membership = self._players.membership
+            for pid, buffer in self._snapshots.items():
+                player = out.get(pid)
+                if player is None:
+                    player = out[pid] = RemotePlayer(pid)
+                buffer.sample_into(render_t, player)
+        return out
 
     def update(self, x: float, y: float, map_name: str, direction: str = "DOWN", is_moving: bool = False) -> bool:
-        """Queue position update with direction and movement state."""
+        """
+        Hand the player's state to the sender. Called every frame; only the latest state is kept,
+        and the sender decides whether it differs enough from the last one sent to go out.
+        """
         if self.player_id == -1:
             return False
-        try:
-            # HINT: This part might be helpful for direction change
-            # Maybe you can add other parameters?
-            self._update_queue.put_nowait({
+        state = (x, y, map_name, direction, is_moving)
+        if state == self._last_queued:
+            return True
+        self._last_queued = state
+        # HINT: This part might be helpful for direction change
+        # Maybe you can add other parameters?
+        with self._lock:
+            self._pending_update = {
                 "x": x,
                 "y": y,
                 "map": map_name,
                 "direction": direction,
                 "is_moving": is_moving,
-            })
-            return True
-        except queue.Full:
-            return False
+            }
+        self._wake_sender()
+        return True
 
     def start(self) -> None:
         if self._ws_thread and self._ws_thread.is_alive():
@@ -103,6 +198,7 @@ class OnlineManager:
 
     def stop(self) -> None:
         self._stop_event.set()
+        self._wake_sender()
         if self._ws_loop and self._ws_loop.is_running():
             # Schedule stop in the event loop
             asyncio.run_coroutine_threadsafe(self._close_ws(), self._ws_loop)
@@ -113,14 +209,26 @@ class OnlineManager:
         """Run WebSocket event loop in a separate thread"""
         self._ws_loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self._ws_loop)
+        self._wakeup = asyncio.Event()
         try:
             self._ws_loop.run_until_complete(self._ws_main())
         except Exception as e:
             Logger.error(f"WebSocket thread error: {e}")
         finally:
+            self._wakeup = None
             self._ws_loop.close()
             self._ws_loop = None
 
+    def _wake_sender(self) -> None:
+        """Wake _ws_sender from the game thread; a no-op while the network thread is not running"""
+        loop, wakeup = self._ws_loop, self._wakeup
+        if loop is None or wakeup is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass  # Loop closed between the check and the call
+
     async def _close_ws(self) -> None:
         """Close WebSocket connection"""
         if self._ws:
@@ -144,9 +252,25 @@ class OnlineManager:
                     ping_timeout=10
                 ) as websocket:
                     self._ws = websocket
+                    self._encoding = ENCODING_JSON
+                    self._rtt = None
+                    self._last_queued = None  # A new connection needs the current position even if it has not changed
+                    self._server_send_rate = SEND_RATE_MAX
+                    self._update_send_interval()
+                    with self._lock:
+                        self._snapshots = {}
+                        self._players.clear()
+                        self._clock.reset()
                     Logger.info("WebSocket connected")
                     reconnect_delay = 1.0  # Reset delay on successful connection
 
+                    # Offer the binary position protocol; JSON is used until the server agrees
+                    if GameSettings.ONLINE_BINARY_PROTOCOL:
+                        await websocket.send(json.dumps({
+                            "type": "hello",
+                            "encodings": list(SUPPORTED_ENCODINGS)
+                        }))
+
                     # Start sender task
                     sender_task = asyncio.create_task(self._ws_sender(websocket))
 
@@ -174,45 +298,80 @@ class OnlineManager:
                 if not self._stop_event.is_set():
                     await asyncio.sleep(0.5)
 
-    async def _handle_message(self, message: str) -> None:
+    async def _handle_message(self, message: str | bytes) -> None:
         """Handle incoming WebSocket message"""
         try:
-            data = json.loads(message)
+            if isinstance(message, bytes):
+                data = decode_players(self._maps, message)
+            else:
+                data = json.loads(message)
             msg_type = data.get("type")
 
-            if msg_type == "registered":
+            if msg_type == "hello_ack":
+                self._maps = MapTable(data.get("maps", []))
+                self._encoding = str(data.get("encoding", ENCODING_JSON))
+                Logger.info(f"OnlineManager using {self._encoding} encoding")
+
+            elif msg_type == "heartbeat_ack":
+                sent_at = data.get("t")
+                if sent_at is not None:
+                    rtt = max(0.0, time.monotonic() - float(sent_at))
+                    self._rtt = rtt if self._rtt is None else self._rtt + (rtt - self._rtt) * 0.25
+                self._server_send_rate = float(data.get("send_rate", SEND_RATE_MAX))
+                self._update_send_interval()
+
+            elif msg_type == "map_ids":
+                self._maps = MapTable(data.get("maps", []))
+
+            elif msg_type == "registered":
                 self.player_id = int(data.get("id", -1))
                 Logger.info(f"OnlineManager registered with id={self.player_id}")
+                if self._wakeup is not None:
+                    self._wakeup.set()  # Start heartbeats right away
 
             elif msg_type == "players_update":
+                # Full snapshot: replaces everything we know about other players
                 players_data = data.get("players", {})
                 with self._lock:
-                    filtered = []
-                    for pid_str, player_data in players_data.items():
-                        pid = int(pid_str)
-                        if pid != self.player_id:
-
-                            # HINT: This part might be helpful for direction change
-                            # Maybe you can add other parameters?
-                            filtered.append({
-                                "id": pid,
-                                "x": float(player_data.get("x", 0)),
-                                "y": float(player_data.get("y", 0)),
-                                "map": str(player_data.get("map", "")),
-                                "direction": str(player_data.get("direction", "DOWN")),
-                                "is_moving": bool(player_data.get("is_moving", False)),
-                            })
-                    self.list_players = filtered
+                    self._apply_players(players_data, data.get("timestamp"))
+                    present = {int(pid) for pid in players_data}
+                    self._players.retain(present)
+                    for pid in [pid for pid in self._snapshots if pid not in present]:
+                        del self._snapshots[pid]
+
+            elif msg_type == "players_delta":
+                # Delta: only changed players, plus the ones that left our interest area
+                players_data = data.get("players", {})
+                with self._lock:
+                    for pid in data.get("removed", []):
+                        self._players.remove(int(pid))
+                        self._snapshots.pop(int(pid), None)
+                    self._apply_players(players_data, data.get("timestamp"))
 
             elif msg_type == "chat_update":
                 messages = data.get("messages", [])
                 with self._lock:
+                    self._chat_loaded = True
                     for m in messages:
+                        # Keep history contiguous once older pages have been loaded
+                        if self._chat_history and len(self._chat_messages) == self._chat_messages.maxlen:
+                            self._chat_history.append(self._chat_messages[0])
                         self._chat_messages.append(m)
                         mid = int(m.get("id", self._last_chat_id))
                         if mid > self._last_chat_id:
                             self._last_chat_id = mid
 
+            elif msg_type == "chat_history":
+                messages = data.get("messages", [])
+                with self._lock:
+                    oldest = self._oldest_chat_id()
+                    # Oldest first from the server; prepend newest-to-oldest
+                    for m in reversed(messages):
+                        if oldest is None or int(m.get("id", 0)) < oldest:
+                            self._chat_history.appendleft(m)
+                    self._history_pending = False
+                    self._history_exhausted = not data.get("has_more", False) or len(self._chat_history) >= CHAT_HISTORY_LIMIT
+
             elif msg_type == "error":
                 Logger.warning(f"Server error: {data.get('message', 'unknown')}")
 
@@ -221,51 +380,133 @@ class OnlineManager:
         except Exception as e:
             Logger.warning(f"Error handling WebSocket message: {e}")
 
+    def _apply_players(self, players_data: dict, timestamp: float | None = None) -> None:
+        """Merge server player entries into _players and their snapshot buffers. Caller must hold _lock."""
+        now = time.monotonic()
+        t = self._clock.observe(float(timestamp), now) if timestamp is not None else now
+        for pid_str, player_data in players_data.items():
+            pid = int(pid_str)
+            if pid == self.player_id:
+                continue
+            # HINT: This part might be helpful for direction change
+            # Maybe you can add other parameters?
+            x = float(player_data.get("x", 0))
+            y = float(player_data.get("y", 0))
+            map_name = str(player_data.get("map", ""))
+            direction = str(player_data.get("direction", "DOWN"))
+            is_moving = bool(player_data.get("is_moving", False))
+            self._players.put(pid, x, y, map_name, direction, is_moving)
+            buffer = self._snapshots.get(pid)
+            if buffer is None:
+                buffer = self._snapshots[pid] = SnapshotBuffer()
+            buffer.push(Snapshot(t, x, y, map_name, direction, is_moving))
+
+    def _update_send_interval(self) -> None:
+        """Seconds between position sends while walking, from the server's hint and the measured RTT"""
+        base = 1.0 / max(SEND_RATE_MIN, min(SEND_RATE_MAX, self._server_send_rate))
+        backoff = 1.0 + (self._rtt or 0.0) / RTT_BACKOFF
+        self._send_interval = min(1.0 / SEND_RATE_MIN, base * backoff)
+
+    async def _send_position(self, websocket: Any, state: dict) -> None:
+        frame = None
+        if self._encoding == ENCODING_BIN1:
+            frame = encode_player_update(
+                self._maps,
+                state.get("x"),
+                state.get("y"),
+                state.get("map"),
+                state.get("direction", "DOWN"),
+                state.get("is_moving", False),
+            )
+        # HINT: This part might be helpful for direction change
+        # Maybe you can add other parameters?
+        message = {
+            "type": "player_update",
+            "x": state.get("x"),
+            "y": state.get("y"),
+            "map": state.get("map"),
+            "direction": state.get("direction", "DOWN"),
+            "is_moving": state.get("is_moving", False),
+        }
+        # Maps the server has not interned yet still go out as JSON
+        await websocket.send(frame if frame is not None else json.dumps(message))
+
     async def _ws_sender(self, websocket: Any) -> None:
-        """Send updates to server via WebSocket"""
-        update_interval = 0.0167  # 60 updates per second
-        last_update = time.monotonic()
+        """
+        Send updates to server via WebSocket.
+
+        The task sleeps on _wakeup, which the game thread sets through _wake_sender whenever it
+        hands over a position, chat message or control request, so sends go out immediately and
+        an idle connection costs no CPU. The wait times out only for the next heartbeat or a
+        throttled position.
+
+        A position goes out only when it changed: map, direction and moving state changes are sent
+        at once, plain movement at most every _send_interval. A standing player sends nothing but
+        a heartbeat every HEARTBEAT_INTERVAL.
+        """
+        wakeup = self._wakeup
+        last_sent: dict | None = None
+        last_send = 0.0
+        last_heartbeat = 0.0
+        pending: dict | None = None
 
         while not self._stop_event.is_set():
             try:
-                # Send position updates
+                wakeup.clear()
                 now = time.monotonic()
-                if now - last_update >= update_interval:
-                    # Collapse queue to latest entry to avoid sending stale movement
-                    latest_update = None
+                with self._lock:
+                    if self._pending_update is not None:
+                        pending, self._pending_update = self._pending_update, None
+
+                if pending is not None and self.player_id >= 0:
+                    urgent = last_sent is None or any(
+                        pending[k] != last_sent[k] for k in ("map", "direction", "is_moving")
+                    )
+                    moved = not urgent and (
+                        abs(pending["x"] - last_sent["x"]) + abs(pending["y"] - last_sent["y"]) >= POSITION_EPSILON
+                    )
+                    if urgent or (moved and now - last_send >= self._send_interval):
+                        await self._send_position(websocket, pending)
+                        last_sent, pending, last_send = pending, None, now
+                    elif not moved:
+                        pending = None  # Nothing the server does not already know
+
+                if self.player_id >= 0 and now - last_heartbeat >= HEARTBEAT_INTERVAL:
+                    await websocket.send(json.dumps({"type": "heartbeat", "t": now}))
+                    last_heartbeat = now
+
+                # Send control requests (e.g. chat history pages)
+                while True:
                     try:
-                        while True:
-                            latest_update = self._update_queue.get_nowait()
+                        control = self._control_out_queue.get_nowait()
                     except queue.Empty:
-                        pass
-
-                    if latest_update and self.player_id >= 0:
-                        # HINT: This part might be helpful for direction change
-                        # Maybe you can add other parameters?
-                        message = {
-                            "type": "player_update",
-                            "x": latest_update.get("x"),
-                            "y": latest_update.get("y"),
-                            "map": latest_update.get("map"),
-                            "direction": latest_update.get("direction", "DOWN"),
-                            "is_moving": latest_update.get("is_moving", False),
-                        }
-                        await websocket.send(json.dumps(message))
-                        last_update = now
+                        break
+                    await websocket.send(json.dumps(control))
 
                 # Send chat messages
-                try:
-                    chat_text = self._chat_out_queue.get_nowait()
+                while True:
+                    try:
+                        chat_text = self._chat_out_queue.get_nowait()
+                    except queue.Empty:
+                        break
                     if self.player_id >= 0:
                         message = {
                             "type": "chat_send",
                             "text": chat_text
                         }
                         await websocket.send(json.dumps(message))
-                except queue.Empty:
-                    pass
 
-                await asyncio.sleep(0.01)  # Small sleep to prevent busy waiting
+                # Sleep until woken, the next heartbeat is due or a throttled position may go out
+                timeout = None
+                if self.player_id >= 0:
+                    timeout = last_heartbeat + HEARTBEAT_INTERVAL
+                    if pending is not None:
+                        timeout = min(timeout, last_send + self._send_interval)
+                    timeout = max(0.0, timeout - time.monotonic())
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
 
             except Exception as e:
                 Logger.warning(f"WebSocket send error: {e}")
@@ -282,10 +523,47 @@ class OnlineManager:
             return False
         try:
             self._chat_out_queue.put_nowait(t)
-            return True
         except queue.Full:
             return False
+        self._wake_sender()
+        return True
 
     def get_recent_chat(self, limit: int = 50) -> list[dict]:
         with self._lock:
-            return list(self._chat_messages)[-limit:]
+            if limit <= len(self._chat_messages):
+                return list(self._chat_messages)[-limit:]
+            return (list(self._chat_history) + list(self._chat_messages))[-limit:]
+
+    def request_chat_history(self) -> bool:
+        """Ask the server for the page of messages before the oldest one we have"""
+        with self._lock:
+            if self.player_id == -1 or not self._chat_loaded or self._history_pending or self._history_exhausted:
+                return False
+            oldest = self._oldest_chat_id()
+            if oldest is None:
+                # No messages to page back from; before_id 0 would fetch the latest page again
+                return False
+            if oldest <= 1:
+                self._history_exhausted = True
+                return False
+            self._history_pending = True
+        try:
+            self._control_out_queue.put_nowait({
+                "type": "chat_history",
+                "before_id": oldest,
+                "limit": CHAT_HISTORY_PAGE
+            })
+        except queue.Full:
+            with self._lock:
+                self._history_pending = False
+            return False
+        self._wake_sender()
+        return True
+
+    def _oldest_chat_id(self) -> int | None:
+        """Caller must hold _lock"""
+        if self._chat_history:
+            return int(self._chat_history[0].get("id", 0))
+        if self._chat_messages:
+            return int(self._chat_messages[0].get("id", 0))
+        return None
@@ -10,12 +10,39 @@ class ResourceManager:
         self._images: dict[str, pg.Surface] = {}
         self._sounds: dict[str, pg.mixer.Sound] = {}
         self._fonts: dict[tuple[str, int], pg.font.Font] = {}
+        # Sliced and scaled animation frames: (path, rows, n_keyframes, size) -> row -> frames
+        self._frames: dict[tuple, dict[str, list[pg.Surface]]] = {}
 
     def get_image(self, path: str) -> pg.Surface:
         if path not in self._images:
             self._images[path] = load_img(path)
         return self._images[path]
 
+    def get_frames(
+        self, path: str, rows: list[str], n_keyframes: int, size: tuple[int, int]
+    ) -> dict[str, list[pg.Surface]]:
+        """
+        Frames of a sprite sheet with one animation per row, scaled to `size`.
+        Shared by every caller asking for the same sheet, so treat the result as read-only.
+        """
+        key = (path, tuple(rows), n_keyframes, tuple(size))
+        frames = self._frames.get(key)
+        if frames is None:
+            sheet = self.get_image(path)
+            sheet_w, sheet_h = sheet.get_size()
+            frame_w = sheet_w // n_keyframes
+            frame_h = sheet_h // len(rows)
+            frames = {}
+            for r, name in enumerate(rows):
+                frames[name] = [
+                    pg.transform.smoothscale(
+                        sheet.subsurface(pg.Rect(c * frame_w, r * frame_h, frame_w, frame_h)), size
+                    )
+                    for c in range(n_keyframes)
+                ]
+            self._frames[key] = frames
+        return frames
+
     def get_sound(self, path: str) -> pg.mixer.Sound:
         if path not in self._sounds:
             self._sounds[path] = load_sound(path)
@@ -32,3 +59,4 @@ class ResourceManager:
         self._images.clear()
         self._sounds.clear()
         self._fonts.clear()
+        self._frames.clear()
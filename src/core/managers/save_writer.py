@@ -0,0 +1,86 @@
+import atexit
+import threading
+from typing import Optional
+
+from src.utils import Logger
+from src.utils import save_file
+
+
+class SaveWriter:
+    """
+    Writes save files on a background thread, so saving does not hold up the frame.
+
+    The game thread hands over a finished snapshot: GameManager.save encodes the sections that
+    changed (see GameManager.save_sections) and submits the bytes, which the game can no longer
+    change. The writer thread then writes, fsyncs and renames the file. A save submitted while
+    an earlier one for the same path is still waiting replaces it, so a burst of saves (battle
+    end, reward, scene switch) costs one write. Until a save is on disk, `pending` returns it,
+    so GameManager.load reads the latest save from memory instead of waiting for the write.
+    `flush` waits for pending writes; the writer flushes everything at interpreter exit.
+    """
+    _cond: threading.Condition
+    _pending: dict[str, dict[str, bytes]]
+    _writing: Optional[str]
+    _writing_sections: Optional[dict[str, bytes]]
+    _thread: Optional[threading.Thread]
+    writes: int      # Files written
+    collapsed: int   # Saves replaced by a newer one before they were written
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._writing = None
+        self._writing_sections = None
+        self._thread = None
+        self.writes = 0
+        self.collapsed = 0
+        atexit.register(self.flush)
+
+    def submit(self, path: str, sections: dict[str, bytes]) -> None:
+        with self._cond:
+            if path in self._pending:
+                self.collapsed += 1
+            self._pending[path] = sections
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def pending(self, path: str) -> Optional[dict[str, bytes]]:
+        """The latest sections submitted for `path` that are not on disk yet, or None"""
+        with self._cond:
+            sections = self._pending.get(path)
+            if sections is None and self._writing == path:
+                sections = self._writing_sections
+            return sections
+
+    def flush(self, path: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """Wait until the saves for `path` (or all paths) are on disk; False on timeout"""
+        def done() -> bool:
+            if path is None:
+                return not self._pending and self._writing is None
+            return path not in self._pending and self._writing != path
+
+        with self._cond:
+            return self._cond.wait_for(done, timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                path = next(iter(self._pending))
+                sections = self._pending.pop(path)
+                self._writing = path
+                self._writing_sections = sections
+            try:
+                save_file.write_sections(path, sections)
+                Logger.info(f"Game saved to {path}")
+            except Exception as e:
+                Logger.warning(f"Failed to save game: {e}")
+            finally:
+                with self._cond:
+                    self._writing = None
+                    self._writing_sections = None
+                    self.writes += 1
+                    self._cond.notify_all()
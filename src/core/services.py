@@ -1,6 +1,7 @@
-from .managers import InputManager, ResourceManager, SceneManager, SoundManager
+from .managers import InputManager, ResourceManager, SceneManager, SoundManager, SaveWriter
 
 input_manager = InputManager()
 resource_manager = ResourceManager()
 scene_manager = SceneManager()
 sound_manager = SoundManager()
+save_writer = SaveWriter()
@@ -4,15 +4,114 @@ from src.utils import GameSettings
 from src.utils.definition import Monster, Item
 
 
+def _mutator(base: type, name: str):
+    """`base`'s method `name`, marking the bag dirty first"""
+    method = getattr(base, name)
+
+    def mutate(self, *args, **kwargs):
+        self._bag.dirty = True
+        return method(self, *args, **kwargs)
+    mutate.__name__ = name
+    return mutate
+
+
+def _track(value, bag: "Bag"):
+    """`value` with its lists and dicts (at any depth) replaced by ones that flag `bag` as dirty"""
+    if isinstance(value, dict) and not isinstance(value, _TrackedDict):
+        return _TrackedDict(bag, value)
+    if isinstance(value, list) and not isinstance(value, _TrackedList):
+        return _TrackedList(bag, value)
+    return value
+
+
+class _TrackedList(list):
+    """
+    List that marks its bag dirty whenever it changes. Scenes change monsters and items in
+    place (monster["hp"] -= damage, bag.items.remove(item)), so the bag cannot otherwise tell.
+    """
+    __slots__ = ("_bag",)
+
+    def __init__(self, bag: "Bag", values=()):
+        self._bag = bag
+        super().__init__(_track(v, bag) for v in values)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = [_track(v, self._bag) for v in value]
+        else:
+            value = _track(value, self._bag)
+        super().__setitem__(index, value)
+        self._bag.dirty = True
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._bag.dirty = True
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def append(self, value):
+        super().append(_track(value, self._bag))
+        self._bag.dirty = True
+
+    def insert(self, index, value):
+        super().insert(index, _track(value, self._bag))
+        self._bag.dirty = True
+
+    def extend(self, values):
+        super().extend(_track(v, self._bag) for v in values)
+        self._bag.dirty = True
+
+    remove = _mutator(list, "remove")
+    pop = _mutator(list, "pop")
+    clear = _mutator(list, "clear")
+    sort = _mutator(list, "sort")
+    reverse = _mutator(list, "reverse")
+    __imul__ = _mutator(list, "__imul__")
+
+
+class _TrackedDict(dict):
+    """Dict that marks its bag dirty whenever it changes (see _TrackedList)"""
+    __slots__ = ("_bag",)
+
+    def __init__(self, bag: "Bag", values=()):
+        self._bag = bag
+        super().__init__((k, _track(v, bag)) for k, v in dict(values).items())
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, _track(value, self._bag))
+        self._bag.dirty = True
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._bag.dirty = True
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    pop = _mutator(dict, "pop")
+    popitem = _mutator(dict, "popitem")
+    clear = _mutator(dict, "clear")
+
+
 class Bag:
     _monsters_data: list[Monster]
     _items_data: list[Item]
     _money: int
+    dirty: bool  # Changed since GameManager last saved it
 
     def __init__(self, monsters_data: list[Monster] | None = None, items_data: list[Item] | None = None, money: int = 1000):
-        self._monsters_data = monsters_data if monsters_data else []
-        self._items_data = items_data if items_data else []
+        self._monsters_data = _TrackedList(self, monsters_data or [])
+        self._items_data = _TrackedList(self, items_data or [])
         self._money = money
+        self.dirty = True
 
     def update(self, dt: float):
         pass
@@ -34,10 +133,12 @@ class Bag:
 
     def add_money(self, amount: int) -> None:
         self._money += amount
+        self.dirty = True
 
     def remove_money(self, amount: int) -> bool:
         if self._money >= amount:
             self._money -= amount
+            self.dirty = True
             return True
         return False
 
@@ -58,6 +58,12 @@ class Chest(Entity):
         self.check_interaction_range()
         self.sprite.rect.x = int(self.position.x)
         self.sprite.rect.y = int(self.position.y)
+        self.game_manager.entity_moved(self)
+
+    @property
+    @override
+    def hitbox(self) -> pg.Rect:
+        return self.sprite.rect
 
     def check_interaction_range(self) -> bool:
         """Check if player is within interaction range."""
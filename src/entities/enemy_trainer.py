@@ -61,6 +61,7 @@ class EnemyTrainer(Entity):
         if self.detected and input_manager.key_pressed(pygame.K_SPACE):
             pass
         self.animation.update_pos(self.position)
+        self.game_manager.entity_moved(self)
 
     @override
     def draw(self, screen: pygame.Surface, camera: PositionCamera) -> None:
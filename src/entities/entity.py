@@ -29,7 +29,13 @@ class Entity:
 
     def update(self, dt: float) -> None:
         self.animation.update_pos(self.position)
+        self.game_manager.entity_moved(self)
         self.animation.update(dt)
+
+    @property
+    def hitbox(self) -> pg.Rect:
+        """The rect that blocks movement; the same object for the entity's lifetime"""
+        return self.animation.rect
         
     def draw(self, screen: pg.Surface, camera: PositionCamera) -> None:
         self.animation.draw(screen, camera)
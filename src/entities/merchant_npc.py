@@ -59,6 +59,7 @@ class NPC(Entity):
     def update(self, dt: float) -> None:
         self.check_interaction_range()
         self.animation.update_pos(self.position)
+        self.game_manager.entity_moved(self)
 
     def check_interaction_range(self) -> bool:
         player = self.game_manager.player
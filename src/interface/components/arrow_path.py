@@ -2,9 +2,13 @@
 from __future__ import annotations
 import pygame as pg
 import math
+from array import array
 from src.utils import Position, PositionCamera, GameSettings
 from src.sprites import Sprite
 
+CONSUME_LOOKAHEAD = 4  # Arrows past the next one the player can touch first (cutting a corner)
+
+
 class ArrowPath:
     """Renders an arrow path for navigation"""
 
@@ -21,7 +25,7 @@ class ArrowPath:
         self.simplified_path = simplified_path if simplified_path else full_path
         self.path = self.simplified_path  # For compatibility with existing code
         self.original_path = full_path.copy()  # Keep original for reference
-        self.consumed_up_to_index = 0  # Track how much of the path has been consumed
+        self.consumed_up_to_index = 0  # Arrows before this index have been consumed
         self.arrow_sprite = None
 
         # Try to load arrow sprite (300% bigger = 96x96 pixels)
@@ -35,8 +39,11 @@ class ArrowPath:
         self.pulse_speed = 2.0  # Speed of pulsing animation
         self.consumption_distance = GameSettings.TILE_SIZE * 0.7  # Distance to consume each arrow
 
-        # Create arrow positions at each tile in the path
-        self.arrows = []  # List of dict with 'pos', 'angle', 'visible'
+        # Arrows, one per tile of the path but the last: positions and angles in parallel arrays
+        self.arrow_x = array("d")
+        self.arrow_y = array("d")
+        self.arrow_angle = array("d")
+        self._sprites: dict[tuple[float, int], pg.Surface] = {}  # (angle, size) -> rotated, scaled arrow
         self._create_tile_arrows()
 
     def _create_tile_arrows(self) -> None:
@@ -44,19 +51,33 @@ class ArrowPath:
         if len(self.full_path) < 2:
             return
 
-        # For each position in the full path (except the last one which is the destination)
-        for i in range(len(self.full_path) - 1):
-            current = self.full_path[i]
-            
-            # Find which segment of simplified_path this tile belongs to
-            # This determines the direction the arrow should point
-            angle = self._get_angle_for_position(current)
-
-            self.arrows.append({
-                'pos': current,
-                'angle': angle,
-                'visible': True
-            })
+        tiles = self.full_path[:-1]  # The last one is the destination
+        self.arrow_x = array("d", (p.x for p in tiles))
+        self.arrow_y = array("d", (p.y for p in tiles))
+
+        # The simplified path is made of the full path's turning points, so each tile's segment
+        # is found by walking both together; a tile on a turn keeps the segment ending there.
+        simplified = self.simplified_path
+        angles = []
+        segment = 0
+        for pos in tiles:
+            if segment >= len(simplified) - 1:
+                angles = None
+                break
+            angles.append(self._segment_angle(segment))
+            if pos == simplified[segment + 1]:
+                segment += 1
+        if angles is None:
+            # Not a subsequence of the full path: fall back to the nearest segment
+            angles = [self._get_angle_for_position(pos) for pos in tiles]
+        self.arrow_angle = array("d", angles)
+
+    def _segment_angle(self, index: int) -> float:
+        seg_start = self.simplified_path[index]
+        seg_end = self.simplified_path[index + 1]
+        # atan2(dy, dx) gives angle where 0=right, 90=down
+        # Our arrow sprite points up, so we need to add 90 degrees
+        return math.degrees(math.atan2(seg_end.y - seg_start.y, seg_end.x - seg_start.x)) + 90
 
     def _get_angle_for_position(self, pos: Position) -> float:
         """
@@ -82,20 +103,8 @@ class ArrowPath:
             if dist < min_distance:
                 min_distance = dist
                 best_segment_idx = i
-        
-        # Calculate angle based on the direction of this segment
-        seg_start = self.simplified_path[best_segment_idx]
-        seg_end = self.simplified_path[best_segment_idx + 1]
-        
-        dx = seg_end.x - seg_start.x
-        dy = seg_end.y - seg_start.y
-        
-        # Calculate angle (in degrees)
-        # atan2(dy, dx) gives angle where 0=right, 90=down
-        # Our arrow sprite points up, so we need to add 90 degrees
-        angle = math.degrees(math.atan2(dy, dx)) + 90
-        
-        return angle
+
+        return self._segment_angle(best_segment_idx)
 
     def update(self, dt: float, player_pos: Position = None) -> None:
         """
@@ -115,23 +124,24 @@ class ArrowPath:
         """
         Hide arrows that the player has touched (like collecting coins).
 
+        Arrows are consumed in path order: only the next few arrows are checked, and touching
+        one consumes every arrow before it too. A player who leaves the path gets a new one
+        (GameScene._check_route) rather than consuming arrows elsewhere on this one.
+
         Args:
             player_pos: Current player position
         """
-        # Check each visible arrow
-        for arrow in self.arrows:
-            if not arrow['visible']:
-                continue
-
-            # Calculate distance from player to arrow
-            arrow_pos = arrow['pos']
-            dx = player_pos.x - arrow_pos.x
-            dy = player_pos.y - arrow_pos.y
-            distance = math.sqrt(dx * dx + dy * dy)
-
-            # If player is close enough to the arrow, consume it
-            if distance < self.consumption_distance:
-                arrow['visible'] = False
+        first = self.consumed_up_to_index
+        last = min(len(self.arrow_x), first + CONSUME_LOOKAHEAD + 1)
+        reach = self.consumption_distance * self.consumption_distance
+        px, py = player_pos.x, player_pos.y
+        xs, ys = self.arrow_x, self.arrow_y
+        for i in range(last - 1, first - 1, -1):
+            dx = px - xs[i]
+            dy = py - ys[i]
+            if dx * dx + dy * dy < reach:
+                self.consumed_up_to_index = i + 1
+                return
 
     def _point_to_segment_distance(self, point: Position, seg_start: Position, seg_end: Position) -> float:
         """Calculate distance from point to line segment"""
@@ -187,30 +197,34 @@ class ArrowPath:
             pg.draw.lines(screen, (150, 220, 255), False, screen_points, 2)
 
     def _draw_arrows(self, screen: pg.Surface, camera: PositionCamera) -> None:
-        """Draw arrows at each tile position"""
-        # Draw each visible arrow
-        for i, arrow in enumerate(self.arrows):
-            if not arrow['visible']:
-                continue
-
-            pos = arrow['pos']
-            angle = arrow['angle']
-
+        """Draw the arrows not yet consumed, at their tile positions"""
+        half = 48  # Half the largest arrow
+        width, height = screen.get_size()
+        xs, ys, angles = self.arrow_x, self.arrow_y, self.arrow_angle
+        for i in range(self.consumed_up_to_index, len(xs)):
             # Transform to screen coordinates
-            screen_pos = camera.transform_position(pos)  # Returns a tuple (x, y)
+            sx = int(xs[i]) - camera.x
+            sy = int(ys[i]) - camera.y
+            if sx < -half or sy < -half or sx > width + half or sy > height + half:
+                continue
 
             # Pulsing scale effect (base size is now 96 instead of 32)
             pulse = 0.85 + 0.15 * math.sin(self.animation_time + i * 0.5)
             arrow_size = int(96 * pulse)
 
-            # Rotate arrow to point in direction of movement
+            # Draw arrow centered at position
+            sprite = self._arrow_image(angles[i], arrow_size)
+            screen.blit(sprite, sprite.get_rect(center=(sx, sy)))
+
+    def _arrow_image(self, angle: float, size: int) -> pg.Surface:
+        """The arrow rotated to `angle` and scaled to `size`, made once per pair"""
+        key = (angle, size)
+        image = self._sprites.get(key)
+        if image is None:
             # Note: We need to rotate by -angle because pygame rotates counter-clockwise
             rotated_sprite = pg.transform.rotate(self.arrow_sprite.image, -angle)
-            scaled_sprite = pg.transform.scale(rotated_sprite, (arrow_size, arrow_size))
-
-            # Draw arrow centered at position
-            arrow_rect = scaled_sprite.get_rect(center=screen_pos)
-            screen.blit(scaled_sprite, arrow_rect)
+            image = self._sprites[key] = pg.transform.scale(rotated_sprite, (size, size))
+        return image
 
     def _calculate_path_length(self) -> float:
         """Calculate total length of the path"""
@@ -276,4 +290,4 @@ class ArrowPath:
 
     def is_complete(self) -> bool:
         """Check if all arrows have been consumed"""
-        return all(not arrow['visible'] for arrow in self.arrows)
+        return self.consumed_up_to_index >= len(self.arrow_x)
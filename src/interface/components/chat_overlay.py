@@ -16,6 +16,8 @@ class ChatOverlay(UIComponent):
     _just_opened: bool
     _send_callback: Callable[[str], bool] | None    #  NOTE: This is a callable function, you need to give it a function that sends the message
     _get_messages: Callable[[int], list[dict]] | None # NOTE: This is a callable function, you need to give it a function that gets the messages
+    _load_older: Callable[[], bool] | None            # Asks for an older page of history when scrolling past what is loaded
+    _scroll: int                                       # Messages scrolled up from the newest
     _font_msg: pg.font.Font
     _font_input: pg.font.Font
 
@@ -23,6 +25,7 @@ class ChatOverlay(UIComponent):
         self,
         send_callback: Callable[[str], bool] | None = None,
         get_messages: Callable[[int], list[dict]] | None = None,
+        load_older: Callable[[], bool] | None = None,
         *,
         font_path: str = "assets/fonts/Minecraft.ttf"
     ) -> None:
@@ -33,6 +36,8 @@ class ChatOverlay(UIComponent):
         self._just_opened = False
         self._send_callback = send_callback
         self._get_messages = get_messages
+        self._load_older = load_older
+        self._scroll = 0
 
         try:
             self._font_msg = pg.font.Font(font_path, 20)  # 14 * 1.2 ≈ 17
@@ -50,6 +55,7 @@ class ChatOverlay(UIComponent):
 
     def close(self) -> None:
         self.is_open = False
+        self._scroll = 0
 
     def _handle_typing(self) -> None:
         """Handle keyboard input for chat"""
@@ -126,6 +132,12 @@ class ChatOverlay(UIComponent):
             self.close()
             return
 
+        # Scroll through history with Page Up / Page Down
+        if input_manager.key_pressed(pg.K_PAGEUP):
+            self._scroll += 4
+        if input_manager.key_pressed(pg.K_PAGEDOWN):
+            self._scroll = max(0, self._scroll - 4)
+
         # Typing
         if self._just_opened:
             self._just_opened = False
@@ -140,12 +152,17 @@ class ChatOverlay(UIComponent):
     @override
     def draw(self, screen: pg.Surface) -> None:
         # Always draw recent messages faintly, even when closed
-        msgs = self._get_messages(50) if self._get_messages else []
+        # Calculate how many messages can fit
+        max_messages = 8
+
+        wanted = max(50, self._scroll + max_messages)
+        msgs = self._get_messages(wanted) if self._get_messages else []
+        if len(msgs) < wanted and self._scroll and self._load_older:
+            self._load_older()
+        self._scroll = min(self._scroll, max(0, len(msgs) - max_messages))
         sw, sh = screen.get_size()
         x = 10
 
-        # Calculate how many messages can fit
-        max_messages = 8
         container_h = 108  # 90 * 1.2 = 108
 
         # Draw background for messages
@@ -158,7 +175,8 @@ class ChatOverlay(UIComponent):
             _ = screen.blit(bg, (x, y))
 
             # Get only the last N messages that fit
-            lines = list(msgs)[-max_messages:]
+            end = len(msgs) - self._scroll
+            lines = list(msgs)[max(0, end - max_messages):end]
 
             # Calculate total height needed for all messages
             line_height = self._font_msg.get_height() + 4
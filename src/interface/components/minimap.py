@@ -1,7 +1,8 @@
 import pygame as pg
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable
 
 from src.utils.definition import PositionCamera
+from src.utils.remote_players import RemotePlayer
 
 if TYPE_CHECKING:
     from src.maps.map import Map
@@ -67,7 +68,7 @@ class Minimap:
         player: "Player",
         trainers: list["Trainer"] = None,
         npcs: list["NPC"] = None,
-        online_players: list[dict] = None,
+        online_players: Iterable[RemotePlayer] = None,
     ) -> None:
         """
         Draw the minimap to the screen.
@@ -78,7 +79,7 @@ class Minimap:
             player: The player entity
             trainers: List of trainer entities (optional)
             npcs: List of NPC entities (optional)
-            online_players: List of online player data dictionaries (optional)
+            online_players: Remote players, e.g. OnlineManager.remote_players().values() (optional)
         """
         # Check if we need to regenerate the cached map surface
         if (self._cached_map_surface is None or
@@ -124,17 +125,8 @@ class Minimap:
         Args:
             current_map: The map to render
         """
-        map_surface = current_map._surface
-
-        # Calculate scaled dimensions
-        scaled_width = int(map_surface.get_width() * self.scale_factor)
-        scaled_height = int(map_surface.get_height() * self.scale_factor)
-
         # Scale down the map surface
-        self._cached_map_surface = pg.transform.smoothscale(
-            map_surface,
-            (scaled_width, scaled_height)
-        )
+        self._cached_map_surface = current_map.render_scaled(self.scale_factor)
 
     def _draw_map_viewport(self, current_map: "Map", camera: PositionCamera) -> dict:
         """
@@ -310,7 +302,7 @@ class Minimap:
 
     def _draw_online_players(
         self,
-        online_players: list[dict],
+        online_players: Iterable[RemotePlayer],
         camera: PositionCamera,
         viewport_info: dict,
         current_map: "Map"
@@ -319,19 +311,19 @@ class Minimap:
         Draw online player markers on the minimap.
 
         Args:
-            online_players: List of online player data dictionaries
+            online_players: Remote players (read in place, not copied)
             camera: The camera transformation
             viewport_info: Viewport information from _draw_map_viewport
             current_map: The current map
         """
         for player_data in online_players:
             # Only draw players on the same map
-            if player_data.get("map") != current_map.path_name:
+            if player_data.map != current_map.path_name:
                 continue
 
             # Get player position from data
-            player_x = player_data.get("x", 0)
-            player_y = player_data.get("y", 0)
+            player_x = player_data.x
+            player_y = player_data.y
 
             # Convert player position to scaled map coordinates
             player_scaled_x = player_x * self.scale_factor
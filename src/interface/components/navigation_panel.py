@@ -63,7 +63,8 @@ class NavigationPanel(UIComponent):
             map_name: Name of the current map (e.g., "map.tmx", "new_map.tmx")
 
         Returns:
-            List of destination dictionaries with name and position
+            List of destination dictionaries with name and position, and the map of the
+            position when it is not the current one (GameScene routes through teleporters)
         """
         if map_name == "new_map.tmx":
             # Destinations for new_map
@@ -71,6 +72,7 @@ class NavigationPanel(UIComponent):
             return [
                 {"name": "Stone Gate (Exit)", "pos": Position(36 * GameSettings.TILE_SIZE, 18 * GameSettings.TILE_SIZE)},
                 {"name": "Boss House", "pos": Position(53 * GameSettings.TILE_SIZE, 14 * GameSettings.TILE_SIZE)},
+                {"name": "Shop", "pos": Position(48 * GameSettings.TILE_SIZE, 15 * GameSettings.TILE_SIZE), "map": "map.tmx"},
             ]
         elif map_name == "map.tmx":
             # Destinations for main map
@@ -79,17 +81,20 @@ class NavigationPanel(UIComponent):
             return [
                 {"name": "Stone Gate (North)", "pos": Position(35 * GameSettings.TILE_SIZE, 18 * GameSettings.TILE_SIZE)},
                 {"name": "Shop", "pos": Position(48 * GameSettings.TILE_SIZE, 15 * GameSettings.TILE_SIZE)},
+                # One tile below the chest, which stands in the gym
+                {"name": "Gym Chest", "pos": Position(12 * GameSettings.TILE_SIZE, 11 * GameSettings.TILE_SIZE), "map": "gym.tmx"},
             ]
         else:
             # Default destinations for other maps
             return [
                 {"name": "Map Center", "pos": Position(30 * GameSettings.TILE_SIZE, 20 * GameSettings.TILE_SIZE)},
+                {"name": "Shop", "pos": Position(48 * GameSettings.TILE_SIZE, 15 * GameSettings.TILE_SIZE), "map": "map.tmx"},
             ]
 
     def _on_destination_selected(self, destination: dict) -> None:
         """Called when a destination button is clicked"""
         if self.on_navigate:
-            self.on_navigate(destination["pos"])
+            self.on_navigate(destination["pos"], destination.get("map"))
 
     def update(self, dt: float) -> None:
         from src.core.services import input_manager
@@ -0,0 +1,117 @@
+from __future__ import annotations
+import pygame as pg
+
+from src.utils import GameSettings
+
+CELL_TILES = 4  # Cell edge in tiles; about the reach of the widest per-frame query (trainer line of sight)
+
+
+class EntityGrid:
+    """
+    Uniform grid over the hitboxes of one map's entities (trainers, NPCs, chests).
+
+    Every entity is stored in each cell its hitbox overlaps, so a rect query only looks at the
+    entities in the few cells around it instead of every entity on the map. The grid keeps a
+    reference to each entity's hitbox Rect; when the entity moves, `move` re-files it if it
+    crossed a cell edge. Results come back in insertion order, which is the order the entities
+    have in the GameManager lists, so nearby-entity loops behave like the full loops did.
+    """
+    cell_size: int
+    _cells: dict[tuple[int, int], list[object]]
+    _entries: dict[object, tuple[pg.Rect, str, int, tuple[int, int, int, int]]]  # entity -> (hitbox, kind, order, cell span)
+    _next_order: int
+
+    def __init__(self, cell_size: int = CELL_TILES * GameSettings.TILE_SIZE):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self._cells = {}
+        self._entries = {}
+        self._next_order = 0
+
+    def _span(self, rect: pg.Rect) -> tuple[int, int, int, int]:
+        size = self.cell_size
+        return (
+            rect.left // size, rect.top // size,
+            (rect.right - 1) // size, (rect.bottom - 1) // size,
+        )
+
+    def _file(self, entity: object, span: tuple[int, int, int, int]) -> None:
+        x0, y0, x1, y1 = span
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                self._cells.setdefault((cx, cy), []).append(entity)
+
+    def _unfile(self, entity: object, span: tuple[int, int, int, int]) -> None:
+        x0, y0, x1, y1 = span
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                cell = self._cells.get((cx, cy))
+                if cell is not None:
+                    cell.remove(entity)
+                    if not cell:
+                        del self._cells[(cx, cy)]
+
+    def insert(self, entity: object, hitbox: pg.Rect, kind: str) -> None:
+        if entity in self._entries:
+            self.remove(entity)
+        span = self._span(hitbox)
+        self._entries[entity] = (hitbox, kind, self._next_order, span)
+        self._next_order += 1
+        self._file(entity, span)
+
+    def move(self, entity: object) -> None:
+        """Re-file `entity` after its hitbox changed; a no-op unless it crossed a cell edge"""
+        entry = self._entries.get(entity)
+        if entry is None:
+            return
+        hitbox, kind, order, old = entry
+        span = self._span(hitbox)
+        if span != old:
+            self._unfile(entity, old)
+            self._file(entity, span)
+            self._entries[entity] = (hitbox, kind, order, span)
+
+    def remove(self, entity: object) -> None:
+        entry = self._entries.pop(entity, None)
+        if entry is not None:
+            self._unfile(entity, entry[3])
+
+    def query(self, rect: pg.Rect, kind: str | None = None) -> list:
+        """Entities (of `kind`, if given) in the cells `rect` overlaps, in insertion order"""
+        x0, y0, x1, y1 = self._span(rect)
+        found: dict[object, int] = {}
+        cells = self._cells
+        entries = self._entries
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                cell = cells.get((cx, cy))
+                if not cell:
+                    continue
+                for entity in cell:
+                    if entity not in found:
+                        entry = entries[entity]
+                        if kind is None or entry[1] == kind:
+                            found[entity] = entry[2]
+        if len(found) < 2:
+            return list(found)
+        return sorted(found, key=found.__getitem__)
+
+    def collides(self, rect: pg.Rect) -> bool:
+        """Whether `rect` overlaps any entity's hitbox"""
+        if rect.width <= 0 or rect.height <= 0:
+            return False
+        x0, y0, x1, y1 = self._span(rect)
+        cells = self._cells
+        entries = self._entries
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    for entity in cell:
+                        if rect.colliderect(entries[entity][0]):
+                            return True
+        return False
+
+    def __len__(self) -> int:
+        return len(self._entries)
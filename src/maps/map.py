@@ -1,7 +1,50 @@
 import pygame as pg
 import pytmx
+from collections import OrderedDict
 
 from src.utils import load_tmx, Position, GameSettings, PositionCamera, Teleport
+from src.utils.pathfinding import NavGrid
+
+
+class ChunkCache:
+    """
+    Baked map chunks of every map, least recently drawn first. Chunks are baked on first use;
+    once more than `budget` exist, the ones not drawn for longest (usually of maps the player
+    is not on) are dropped and baked again if they are needed later.
+    """
+    budget: int
+    _chunks: OrderedDict[tuple[str, int, int], pg.Surface]
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self._chunks = OrderedDict()
+
+    def get(self, game_map: "Map", cx: int, cy: int) -> pg.Surface:
+        key = (game_map.path_name, cx, cy)
+        chunk = self._chunks.get(key)
+        if chunk is not None:
+            self._chunks.move_to_end(key)
+            return chunk
+        chunk = self._chunks[key] = game_map._bake_chunk(cx, cy)
+        while len(self._chunks) > self.budget:
+            self._chunks.popitem(last=False)
+        return chunk
+
+    def discard(self, path_name: str) -> None:
+        for key in [key for key in self._chunks if key[0] == path_name]:
+            del self._chunks[key]
+
+    def clear(self) -> None:
+        self._chunks.clear()
+
+
+chunk_cache = ChunkCache(GameSettings.MAP_CHUNK_BUDGET)
+
+# Tile flags in Map._tile_flags
+TILE_COLLISION = 1
+TILE_BUSH = 2
+TILE_TELEPORT = 4
+
 
 class Map:
     # Map Properties
@@ -11,9 +54,13 @@ class Map:
     spawn: Position
     teleporters: list[Teleport]
     # Rendering Properties
-    _surface: pg.Surface
-    _collision_map: list[pg.Rect]
+    pixel_size: tuple[int, int]
+    _tile_images: dict[int, pg.Surface]  # Tile images by gid, already scaled to TILE_SIZE
+    _collision_map: list[pg.Rect]  # Kept for debug drawing and path planning; queries use _tile_flags
     _bush_map: list[pg.Rect]  # Bush collision rectangles
+    _tile_flags: bytearray  # TILE_* flags per tile, row-major, width * height
+    _teleport_tiles: dict[int, list[Teleport]]  # Tile index -> teleporters whose square overlaps it
+    _nav_grid: NavGrid | None  # Built on first navigation request
 
     def __init__(self, path: str, tp: list[Teleport], spawn: Position):
         self.path_name = path
@@ -23,20 +70,42 @@ class Map:
 
         pixel_w = self.tmxdata.width * GameSettings.TILE_SIZE
         pixel_h = self.tmxdata.height * GameSettings.TILE_SIZE
+        self.pixel_size = (pixel_w, pixel_h)
 
-        # Prebake the map
-        self._surface = pg.Surface((pixel_w, pixel_h), pg.SRCALPHA)
-        self._render_all_layers(self._surface)
+        # The map is baked lazily, chunk by chunk, into chunk_cache
+        self._tile_images = {}
+        chunk_cache.discard(path)
         # Prebake the collision map
         self._collision_map = self._create_collision_map()
         # Prebake the bush map
         self._bush_map = self._create_bush_map()
+        # Index all of it by tile
+        self._tile_flags = bytearray(self.tmxdata.width * self.tmxdata.height)
+        self._flag_rects(self._collision_map, TILE_COLLISION)
+        self._flag_rects(self._bush_map, TILE_BUSH)
+        self._teleport_tiles = {}
+        self._nav_grid = None
+        for teleporter in self.teleporters:
+            tele_rect = pg.Rect(teleporter.pos.x, teleporter.pos.y, GameSettings.TILE_SIZE, GameSettings.TILE_SIZE)
+            for index in self._tiles_under(tele_rect):
+                self._tile_flags[index] |= TILE_TELEPORT
+                self._teleport_tiles.setdefault(index, []).append(teleporter)
 
     def update(self, dt: float):
         return
 
     def draw(self, screen: pg.Surface, camera: PositionCamera):
-        screen.blit(self._surface, camera.transform_position(Position(0, 0)))
+        # Only the chunks the camera can see
+        size = GameSettings.MAP_CHUNK_SIZE
+        screen_w, screen_h = screen.get_size()
+        pixel_w, pixel_h = self.pixel_size
+        cx0 = max(0, camera.x // size)
+        cy0 = max(0, camera.y // size)
+        cx1 = min((pixel_w - 1) // size, (camera.x + screen_w - 1) // size)
+        cy1 = min((pixel_h - 1) // size, (camera.y + screen_h - 1) // size)
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                screen.blit(chunk_cache.get(self, cx, cy), (cx * size - camera.x, cy * size - camera.y))
         
         # Draw the hitboxes collision map
         if GameSettings.DRAW_HITBOXES:
@@ -49,15 +118,19 @@ class Map:
         Return True if collide if rect param collide with self._collision_map
         Hint: use API colliderect and iterate each rectangle to check
         '''
-        return any(rect.colliderect(r) for r in self._collision_map)
+        return self._any_flag(rect, TILE_COLLISION)
         
     def check_teleport(self, pos: Position) -> Teleport | None:
         '''
         [TODO HACKATHON 6]
         Return the Teleport object if the player is on a teleporter
         '''
-        for teleporter in self.teleporters:
-            tele_rect = pg.Rect(teleporter.pos.x, teleporter.pos.y, GameSettings.TILE_SIZE, GameSettings.TILE_SIZE)
+        tile = GameSettings.TILE_SIZE
+        tx, ty = int(pos.x // tile), int(pos.y // tile)
+        if not (0 <= tx < self.tmxdata.width and 0 <= ty < self.tmxdata.height):
+            return None
+        for teleporter in self._teleport_tiles.get(ty * self.tmxdata.width + tx, ()):
+            tele_rect = pg.Rect(teleporter.pos.x, teleporter.pos.y, tile, tile)
             if tele_rect.collidepoint(pos.x, pos.y):
                 return teleporter
 
@@ -68,36 +141,104 @@ class Map:
         Check if the player is on a bush tile.
         Returns True if player collides with bush
         '''
-        return any(rect.colliderect(b) for b in self._bush_map)
-        
+        return self._any_flag(rect, TILE_BUSH)
+
+    def nav_grid(self) -> NavGrid:
+        """A fresh walkability grid for navigation (free to modify): collision and bush tiles are blocked"""
+        if self._nav_grid is None:
+            mask = TILE_COLLISION | TILE_BUSH
+            table = bytes(1 if flags & mask else 0 for flags in range(256))
+            self._nav_grid = NavGrid(self.tmxdata.width, self.tmxdata.height, bytearray(self._tile_flags.translate(table)))
+        return self._nav_grid.copy()
+
+    def _tiles_under(self, rect: pg.Rect) -> list[int]:
+        """Indices into _tile_flags of the in-map tiles `rect` overlaps (same rule as colliderect)"""
+        if rect.width <= 0 or rect.height <= 0:
+            return []
+        tile = GameSettings.TILE_SIZE
+        width = self.tmxdata.width
+        x0 = max(0, rect.left // tile)
+        y0 = max(0, rect.top // tile)
+        x1 = min(width - 1, (rect.right - 1) // tile)
+        y1 = min(self.tmxdata.height - 1, (rect.bottom - 1) // tile)
+        return [y * width + x for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+
+    def _flag_rects(self, rects: list[pg.Rect], flag: int) -> None:
+        for r in rects:
+            for index in self._tiles_under(r):
+                self._tile_flags[index] |= flag
 
-    def _render_all_layers(self, target: pg.Surface) -> None:
+    def _any_flag(self, rect: pg.Rect, flag: int) -> bool:
+        """Whether any tile `rect` overlaps carries `flag`: a few byte lookups instead of a scan"""
+        flags = self._tile_flags
+        return any(flags[index] & flag for index in self._tiles_under(rect))
+
+
+    def render_scaled(self, scale: float) -> pg.Surface:
+        """The whole map scaled down by `scale` (for the minimap). The full-size bake is temporary."""
+        pixel_w, pixel_h = self.pixel_size
+        full = pg.Surface(self.pixel_size, pg.SRCALPHA)
+        self._render_all_layers(full, full.get_rect())
+        return pg.transform.smoothscale(full, (int(pixel_w * scale), int(pixel_h * scale)))
+
+    def _bake_chunk(self, cx: int, cy: int) -> pg.Surface:
+        """Render chunk (cx, cy) of the map and convert it to the display format"""
+        size = GameSettings.MAP_CHUNK_SIZE
+        area = pg.Rect(cx * size, cy * size, size, size).clip(pg.Rect((0, 0), self.pixel_size))
+        chunk = pg.Surface(area.size, pg.SRCALPHA)
+        self._render_all_layers(chunk, area)
+        if pg.display.get_surface() is not None:
+            chunk = chunk.convert_alpha()
+        return chunk
+
+    def _render_all_layers(self, target: pg.Surface, area: pg.Rect) -> None:
+        """Render the part of the map inside `area` (map pixels) onto `target`, whose origin is area.topleft"""
         for layer in self.tmxdata.visible_layers:
             if isinstance(layer, pytmx.TiledTileLayer):
-                self._render_tile_layer(target, layer)
+                self._render_tile_layer(target, layer, area)
             elif isinstance(layer, pytmx.TiledObjectGroup):
-                self._render_object_layer(target, layer)
+                self._render_object_layer(target, layer, area)
             # elif isinstance(layer, pytmx.TiledImageLayer) and layer.image:
             #     target.blit(layer.image, (layer.x or 0, layer.y or 0))
- 
-    def _render_tile_layer(self, target: pg.Surface, layer: pytmx.TiledTileLayer) -> None:
-        for x, y, gid in layer:
-            if gid == 0:
-                continue
+
+    def _render_tile_layer(self, target: pg.Surface, layer: pytmx.TiledTileLayer, area: pg.Rect) -> None:
+        tile = GameSettings.TILE_SIZE
+        x0, y0 = area.left // tile, area.top // tile
+        x1 = min(layer.width, (area.right + tile - 1) // tile)
+        y1 = min(layer.height, (area.bottom + tile - 1) // tile)
+        for y in range(y0, y1):
+            row = layer.data[y]
+            for x in range(x0, x1):
+                gid = row[x]
+                if gid == 0:
+                    continue
+                image = self._tile_image(gid)
+                if image is None:
+                    continue
+                target.blit(image, (x * tile - area.left, y * tile - area.top))
+
+    def _tile_image(self, gid: int) -> pg.Surface | None:
+        image = self._tile_images.get(gid)
+        if image is None:
             image = self.tmxdata.get_tile_image_by_gid(gid)
             if image is None:
-                continue
-
-            image = pg.transform.scale(image, (GameSettings.TILE_SIZE, GameSettings.TILE_SIZE))
-            target.blit(image, (x * GameSettings.TILE_SIZE, y * GameSettings.TILE_SIZE))
+                return None
+            image = self._tile_images[gid] = pg.transform.scale(image, (GameSettings.TILE_SIZE, GameSettings.TILE_SIZE))
+        return image
 
-    def _render_object_layer(self, target: pg.Surface, layer: pytmx.TiledObjectGroup) -> None:
+    def _render_object_layer(self, target: pg.Surface, layer: pytmx.TiledObjectGroup, area: pg.Rect) -> None:
         """Render objects from an object layer (houses, trees, decorations, etc.)"""
         for obj in layer:
             # Only render objects that have a gid (tile-based objects)
             if not hasattr(obj, 'gid') or obj.gid is None:
                 continue
 
+            # Tiled uses bottom-left corner for object position, so adjust y coordinate
+            pos_x = obj.x
+            pos_y = obj.y - obj.height
+            if not area.colliderect(pg.Rect(int(pos_x), int(pos_y), int(obj.width) + 1, int(obj.height) + 1)):
+                continue
+
             image = self.tmxdata.get_tile_image_by_gid(obj.gid)
             if image is None:
                 continue
@@ -105,11 +246,7 @@ class Map:
             # Scale the image to match the object's width and height
             scaled_image = pg.transform.scale(image, (int(obj.width), int(obj.height)))
 
-            # Tiled uses bottom-left corner for object position, so adjust y coordinate
-            pos_x = obj.x
-            pos_y = obj.y - obj.height
-
-            target.blit(scaled_image, (pos_x, pos_y))
+            target.blit(scaled_image, (pos_x - area.left, pos_y - area.top))
 
     def _create_collision_map(self) -> list[pg.Rect]:
         rects = []
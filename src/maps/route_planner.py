@@ -0,0 +1,159 @@
+from __future__ import annotations
+import heapq
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from src.utils import GameSettings, Position
+from src.utils.pathfinding import Pathfinder, UNREACHED, DIRECTIONS
+
+if TYPE_CHECKING:
+    from array import array
+    from src.core import GameManager
+
+TELEPORT_COST = 1  # Steps a teleport is worth, so routes do not hop maps for nothing
+
+
+@dataclass(frozen=True, slots=True)
+class RouteLeg:
+    """One map's part of a route: walk to `goal`, then (unless this is the last leg) teleport to `next_map`"""
+    map: str
+    goal: tuple[int, int]
+    next_map: str | None
+
+
+class RoutePlanner:
+    """
+    Routes to any tile of any map, planned in two levels.
+
+    The abstract level is a graph whose nodes are the teleporter tiles of every map plus the
+    point the player arrives at on each map (GameManager.player_spawns: teleporting to a map
+    puts the player back where they last left it). Walking edges join nodes in the same
+    walkable region of a map and cost the flow-field distance between them; a usable
+    teleporter has an edge to the arrival point of its destination. A Dijkstra search over
+    this graph picks the legs.
+
+    Only the first leg is refined into a tile path (GameManager.nav_field). After each map
+    switch the caller plans again from where the player actually is, which also covers the
+    one thing the graph cannot know in advance: where the player will arrive on the map they
+    are leaving now.
+    """
+    game_manager: GameManager
+    _regions: dict[tuple, array]  # Obstacle layout -> region labels
+    _teleporters: dict[str, list[tuple[tuple[int, int], str, bool]]]  # Map -> (tile, destination, needs boss), one per tile
+
+    def __init__(self, game_manager: GameManager):
+        self.game_manager = game_manager
+        self._regions = {}
+        self._teleporters = {}
+        size = GameSettings.TILE_SIZE
+        for key, game_map in game_manager.maps.items():
+            seen = set()
+            nodes = []
+            for teleporter in game_map.teleporters:
+                tile = Pathfinder.to_tile(teleporter.pos)
+                if tile in seen:
+                    continue
+                seen.add(tile)
+                # Where several teleporters share a tile, stepping on it always takes the one
+                # check_teleport finds, so that is the only edge the tile has
+                tp = game_map.check_teleport(Position(tile[0] * size, tile[1] * size))
+                if tp is None or tp.destination not in game_manager.maps:
+                    continue
+                nodes.append((tile, tp.destination, tp.requires_boss_defeated))
+            self._teleporters[key] = nodes
+
+    def plan(self, start_map: str, start: Position, goal_map: str, goal: Position) -> list[RouteLeg] | None:
+        """Legs from `start` on start_map to `goal` on goal_map, or None if it cannot be reached"""
+        gm = self.game_manager
+        if start_map not in gm.maps or goal_map not in gm.maps:
+            return None
+        start_tile = Pathfinder.to_tile(start)
+        goal_tile = Pathfinder.to_tile(goal)
+        if self._region(goal_map, goal_tile) == UNREACHED:
+            return None
+
+        # Dijkstra over (map, tile) locations; a location is left by walking to a teleporter on
+        # its map (then arriving at the destination map's arrival point) or to the goal.
+        start_node = (start_map, start_tile)
+        best = {start_node: 0}
+        came_from: dict[tuple, tuple[tuple, RouteLeg]] = {}
+        heap = [(0, start_node)]
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if cost != best.get(node):
+                continue
+            if node == ("", goal_tile):
+                break
+            map_key, tile = node
+            regions = self._regions_of(map_key, tile)
+            if not regions:
+                continue
+
+            if map_key == goal_map and self._region(goal_map, goal_tile) in regions:
+                steps = gm.nav_field(goal_map, goal_tile).steps_from(tile)
+                if steps != UNREACHED:
+                    self._relax(best, came_from, heap, node, ("", goal_tile), cost + steps,
+                                RouteLeg(map_key, goal_tile, None))
+
+            for tp_tile, destination, needs_boss in self._teleporters.get(map_key, []):
+                if needs_boss and not gm.boss_defeated:
+                    continue
+                if destination == start_map:
+                    continue  # Arrival on the map being left is unknown until the player leaves it
+                if self._region(map_key, tp_tile) not in regions:
+                    continue
+                steps = gm.nav_field(map_key, tp_tile).steps_from(tile)
+                if steps == UNREACHED:
+                    continue
+                arrival = self._arrival(destination)
+                self._relax(best, came_from, heap, node, (destination, arrival), cost + steps + TELEPORT_COST,
+                            RouteLeg(map_key, tp_tile, destination))
+
+        end = ("", goal_tile)
+        if end not in came_from:
+            return None
+        legs = []
+        node = end
+        while node != start_node:
+            node, leg = came_from[node]
+            legs.append(leg)
+        legs.reverse()
+        return legs
+
+    @staticmethod
+    def _relax(best: dict, came_from: dict, heap: list, node: tuple, target: tuple, cost: int, leg: RouteLeg) -> None:
+        if cost < best.get(target, cost + 1):
+            best[target] = cost
+            came_from[target] = (node, leg)
+            heapq.heappush(heap, (cost, target))
+
+    def _arrival(self, map_key: str) -> tuple[int, int]:
+        gm = self.game_manager
+        return Pathfinder.to_tile(gm.player_spawns.get(map_key, gm.maps[map_key].spawn))
+
+    def _labels(self, map_key: str) -> tuple[array, int]:
+        layout, build_grid = self.game_manager.nav_layout(map_key)
+        labels = self._regions.get(layout)
+        if labels is None:
+            # Layouts of the same map that are no longer current will not be asked for again
+            for old in [k for k in self._regions if k[0] == map_key]:
+                del self._regions[old]
+            labels = self._regions[layout] = build_grid().regions()
+        return labels, self.game_manager.maps[map_key].tmxdata.width
+
+    def _region(self, map_key: str, tile: tuple[int, int]) -> int:
+        labels, width = self._labels(map_key)
+        x, y = tile
+        height = len(labels) // width
+        if not (0 <= x < width and 0 <= y < height):
+            return UNREACHED
+        return labels[y * width + x]
+
+    def _regions_of(self, map_key: str, tile: tuple[int, int]) -> set[int]:
+        """Regions a location can walk into: its own, or its neighbors' when it stands on an obstacle"""
+        own = self._region(map_key, tile)
+        if own != UNREACHED:
+            return {own}
+        out = {self._region(map_key, (tile[0] + dx, tile[1] + dy)) for dx, dy in DIRECTIONS}
+        out.discard(UNREACHED)
+        return out
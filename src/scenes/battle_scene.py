@@ -1127,12 +1127,12 @@ class BattleScene(Scene):
                 pass
             elif self.state == BattleState.BATTLE_END:
                 # Document 2: 加入自動儲存功能
-                self.game_manager.save("saves/game0.json")
+                self.game_manager.save(GameSettings.SAVE_PATH)
                 scene_manager.change_scene("game")
         
         # Handle Run Away action - Document 2: 加入自動儲存
         if self.state == BattleState.PLAYER_TURN and self._state_timer > 2.0 and self.message == "Escaped from battle!":
-            self.game_manager.save("saves/game0.json")
+            self.game_manager.save(GameSettings.SAVE_PATH)
             scene_manager.change_scene("game")
         
         if self._pokemon_scale < 1.0:
@@ -1317,8 +1317,8 @@ class BattleScene(Scene):
                 
         if self.state == BattleState.CATCH_SUCCESS:
             if self._state_timer > 1.0: # Wait 1 second after catch
-                self.game_manager.save("saves/game0.json")
-                self.game_manager.load("saves/game0.json")
+                self.game_manager.save(GameSettings.SAVE_PATH)
+                self.game_manager.load(GameSettings.SAVE_PATH)
                 self.state = BattleState.BATTLE_END
                 self.message = f"Successfully caught {self.opponent_pokemon['name']}, Added to bag!"
                 
@@ -1421,12 +1421,12 @@ class BattleScene(Scene):
                 pass
             elif self.state == BattleState.BATTLE_END:
                 # Document 2: 加入自動儲存功能
-                self.game_manager.save("saves/game0.json")
+                self.game_manager.save(GameSettings.SAVE_PATH)
                 scene_manager.change_scene("game")
         
         # Handle Run Away action - Document 2: 加入自動儲存
         if self.state == BattleState.PLAYER_TURN and self._state_timer > 2.0 and self.message == "Escaped from battle!":
-            self.game_manager.save("saves/game0.json")
+            self.game_manager.save(GameSettings.SAVE_PATH)
             scene_manager.change_scene("game")
         
         if self._pokemon_scale < 1.0:
@@ -1611,8 +1611,8 @@ class BattleScene(Scene):
                 
         if self.state == BattleState.CATCH_SUCCESS:
             if self._state_timer > 1.0: # Wait 1 second after catch
-                self.game_manager.save("saves/game0.json")
-                self.game_manager.load("saves/game0.json")
+                self.game_manager.save(GameSettings.SAVE_PATH)
+                self.game_manager.load(GameSettings.SAVE_PATH)
                 self.state = BattleState.BATTLE_END
                 self.message = f"Successfully caught {self.opponent_pokemon['name']}!"
                 
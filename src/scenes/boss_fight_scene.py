@@ -141,7 +141,7 @@ class BossFightScene(Scene):
         Logger.info("Boss Fight started against Mewtwo!")
 
         # Reload game manager
-        loaded = GameManager.load("saves/game0.json")
+        loaded = GameManager.load(GameSettings.SAVE_PATH)
         if loaded:
             self.game_manager = loaded
             Logger.info("BossFightScene: Game data reloaded from save file")
@@ -669,7 +669,7 @@ class BossFightScene(Scene):
                         self.message = "What will " + self.player_pokemon['name'] + " do?"
                         self.turn_message = ""
             elif self.state == BossFightState.BATTLE_END:
-                self.game_manager.save("saves/game0.json")
+                self.game_manager.save(GameSettings.SAVE_PATH)
                 scene_manager.change_scene("game")
 
         if self._pokemon_scale < 1.0:
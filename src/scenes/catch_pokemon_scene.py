@@ -206,7 +206,7 @@ class CatchPokemonScene(Scene):
         Logger.info("Wild Pokemon Battle started")
 
         # Reload game manager to get latest position and state
-        loaded = GameManager.load("saves/game0.json")
+        loaded = GameManager.load(GameSettings.SAVE_PATH)
         if loaded:
             self.game_manager = loaded
             Logger.info("CatchPokemonScene: Game data reloaded from save file")
@@ -1124,12 +1124,12 @@ class CatchPokemonScene(Scene):
                 # Player can press SPACE to skip or will select item
                 pass
             elif self.state == WildBattleState.BATTLE_END:
-                self.game_manager.save("saves/game0.json")
+                self.game_manager.save(GameSettings.SAVE_PATH)
                 scene_manager.change_scene("game")
         
         # Handle Run Away action
         if self.state == WildBattleState.PLAYER_TURN and self._state_timer > 2.0 and self.message == "Escaped from battle!":
-            self.game_manager.save("saves/game0.json")
+            self.game_manager.save(GameSettings.SAVE_PATH)
             scene_manager.change_scene("game")
         
         if self._pokemon_scale < 1.0:
@@ -1321,8 +1321,8 @@ class CatchPokemonScene(Scene):
                 
         if self.state == WildBattleState.CATCH_SUCCESS:
             if self._state_timer > 1.0: # Wait 1 second after catch
-                self.game_manager.save("saves/game0.json")
-                self.game_manager.load("saves/game0.json")
+                self.game_manager.save(GameSettings.SAVE_PATH)
+                self.game_manager.load(GameSettings.SAVE_PATH)
                 
                 # Check if there are more enemy pokemon to catch
                 if self._get_next_enemy_pokemon():
@@ -4,6 +4,7 @@ import time
 
 from src.scenes.scene import Scene
 from src.core import GameManager, OnlineManager
+from src.core.managers.game_manager import ENTITY_REACH
 from src.utils import Logger, PositionCamera, GameSettings, Position
 from src.interface.components import Button, SettingsPanelGame, BagPanel
 from src.interface.components.shop_panel import ShopPanel
@@ -13,12 +14,16 @@ from src.interface.components.navigation_panel import NavigationPanel
 from src.interface.components.arrow_path import ArrowPath
 from src.interface.components.reward_notification import RewardNotification
 from src.utils.pathfinding import Pathfinder
+from src.maps.route_planner import RoutePlanner
 from src.core.services import scene_manager, sound_manager, input_manager
 from src.core.services import sound_manager
-from src.sprites import Sprite, Animation
+from src.sprites import Sprite, AnimationState, AnimationPool
 from src.sprites.portal_sprite import PortalSprite
 from typing import override, Dict
 
+NAV_CHECK_INTERVAL = 0.25  # Seconds between checks of the route against obstacles and the player
+NAV_STRAY_TILES = 3        # The route is repaired once the player is farther than this from it
+
 
 class GameScene(Scene):
     game_manager: GameManager
@@ -31,6 +36,9 @@ class GameScene(Scene):
     shop_panel: ShopPanel | None
     navigation_panel: NavigationPanel | None
     arrow_path: ArrowPath | None
+    route_target: tuple[str, Position] | None
+    route_planner: RoutePlanner | None
+    route_leg: tuple[tuple, tuple[int, int], list[tuple[int, int]]] | None
     show_settings: bool
     show_bag: bool
     show_shop: bool
@@ -50,7 +58,7 @@ class GameScene(Scene):
     def __init__(self):
         super().__init__()
         # Game Manager
-        manager = GameManager.load("saves/game0.json")
+        manager = GameManager.load(GameSettings.SAVE_PATH)
         if manager is None:
             Logger.error("Failed to load game manager")
             exit(1)
@@ -96,6 +104,10 @@ class GameScene(Scene):
         self.shop_panel = None
         self.navigation_panel = None
         self.arrow_path = None
+        self.route_target = None  # (map, position) the arrow path leads to, across teleports
+        self.route_planner = None
+        self.route_leg = None  # (layout, goal tile, tiles) of the leg the arrows show on this map
+        self._route_check_timer = 0.0
         self.current_map_name = None  # Track current map to detect changes
 
         # Teleport prompt state
@@ -115,13 +127,24 @@ class GameScene(Scene):
         self.reward_notification = None
 
         # Online player animations storage
-        self.online_player_animations: Dict[int, Animation] = {}
+        # Online player animations: one shared set of frames, pooled per-player state
+        self.online_animation_pool = AnimationPool(
+            "character/ow1.png",  # Use same sprite as local player
+            ["down", "left", "right", "up"], 4,
+            (GameSettings.TILE_SIZE, GameSettings.TILE_SIZE)
+        )
+        self.online_player_animations: Dict[int, AnimationState] = {}
+        self._online_membership = -1  # OnlineManager.players_membership the animations were pruned at
+        self._near_entities: set = set()  # Trainers, NPCs and chests updated last frame
+        self.frame_dt = 0.0  # Last update's dt, used to advance online player animations in draw
+        self._last_player_position: tuple[float, float] | None = None
 
         # Chat overlay (only if online)
         if self.online_manager:
             self.chat_overlay = ChatOverlay(
                 send_callback=self.online_manager.send_chat,
-                get_messages=self.online_manager.get_recent_chat
+                get_messages=self.online_manager.get_recent_chat,
+                load_older=self.online_manager.request_chat_history
             )
         else:
             self.chat_overlay = None
@@ -199,54 +222,80 @@ class GameScene(Scene):
         else:
             self.navigation_panel = None
 
-    def _start_navigation(self, destination: Position) -> None:
-        """Start navigation to a destination"""
+    def _start_navigation(self, destination: Position, map_name: str | None = None) -> None:
+        """Start navigation to a destination, on the current map unless map_name says otherwise"""
+        self.route_target = (map_name or self.game_manager.current_map_key, destination)
+        self._follow_route()
+
+        # Close navigation panel after selecting destination
+        self.show_navigation = False
+        self.navigation_panel = None
+
+    def _follow_route(self) -> None:
+        """(Re)plan the route to route_target from where the player is and show its leg on this map"""
+        self.arrow_path = None
+        self.route_leg = None
+        if self.route_target is None or not self.game_manager.player:
+            return
+        goal_map, destination = self.route_target
         player_pos = self.game_manager.player.position
-        current_map = self.game_manager.current_map
-
-        # Find path using BFS (include collision map, bush map, NPCs, and enemy trainers)
-        all_obstacles = current_map._collision_map + current_map._bush_map
-
-        # Add NPCs as obstacles
-        for npc in self.game_manager.current_npcs:
-            npc_rect = pg.Rect(
-                npc.position.x,
-                npc.position.y,
-                GameSettings.TILE_SIZE,
-                GameSettings.TILE_SIZE
-            )
-            all_obstacles.append(npc_rect)
-
-        # Add enemy trainers as obstacles
-        for enemy in self.game_manager.current_enemy_trainers:
-            enemy_rect = pg.Rect(
-                enemy.position.x,
-                enemy.position.y,
-                GameSettings.TILE_SIZE,
-                GameSettings.TILE_SIZE
-            )
-            all_obstacles.append(enemy_rect)
-
-        path = Pathfinder.find_path(
-            player_pos,
-            destination,
-            all_obstacles,
-            current_map.tmxdata.width,
-            current_map.tmxdata.height
-        )
+        current_map_key = self.game_manager.current_map_key
+
+        if self.route_planner is None or self.route_planner.game_manager is not self.game_manager:
+            self.route_planner = RoutePlanner(self.game_manager)
+        legs = self.route_planner.plan(current_map_key, player_pos, goal_map, destination)
+        if not legs:
+            Logger.warning("No path found to destination")
+            self.route_target = None
+            return
 
-        if path:
-            # Simplify path for direction calculation, but use full path for arrow placement
-            simplified_path = Pathfinder.simplify_path(path)
-            self.arrow_path = ArrowPath(path, simplified_path)
-            Logger.info(f"Navigation started: {len(path)} points (all tiles), simplified to {len(simplified_path)} waypoints")
+        # Walk this map's leg along the flow field to its goal (the destination or a teleporter).
+        # Collision tiles, bushes, NPCs and enemy trainers are avoided.
+        leg = legs[0]
+        layout = self.game_manager.nav_layout(current_map_key)[0]
+        tiles = self.game_manager.nav_field(current_map_key, leg.goal).path_from(Pathfinder.to_tile(player_pos))
+
+        if tiles:
+            self._show_leg(layout, leg.goal, tiles)
+            Logger.info(f"Navigation started: {len(tiles)} points (all tiles), {len(legs)} map(s) to cross")
         else:
             Logger.warning("No path found to destination")
-            self.arrow_path = None
+            self.route_target = None
+
+    def _show_leg(self, layout: tuple, goal: tuple[int, int], tiles: list[tuple[int, int]]) -> None:
+        path = Pathfinder.to_pixels(tiles)
+        # Simplify path for direction calculation, but use full path for arrow placement
+        simplified_path = Pathfinder.simplify_path(path)
+        self.arrow_path = ArrowPath(path, simplified_path)
+        self.route_leg = (layout, goal, tiles)
+        self._route_check_timer = NAV_CHECK_INTERVAL
+
+    def _check_route(self, dt: float) -> None:
+        """
+        Repair the arrows of this map's leg when an NPC or trainer now stands somewhere else, or
+        the player has strayed more than NAV_STRAY_TILES from them. Checked a few times a second;
+        the new path is read from the leg's flow field, which is repaired from the previous
+        layout's field (only the tiles whose distance changed are visited) rather than rebuilt.
+        """
+        self._route_check_timer -= dt
+        if self._route_check_timer > 0 or self.route_leg is None or not self.game_manager.player:
+            return
+        self._route_check_timer = NAV_CHECK_INTERVAL
+
+        old_layout, goal, tiles = self.route_leg
+        map_key = self.game_manager.current_map_key
+        layout = self.game_manager.nav_layout(map_key)[0]
+        px, py = Pathfinder.to_tile(self.game_manager.player.position)
+        strayed = min(abs(px - x) + abs(py - y) for x, y in tiles) > NAV_STRAY_TILES
+        if layout == old_layout and not strayed:
+            return
 
-        # Close navigation panel after selecting destination
-        self.show_navigation = False
-        self.navigation_panel = None
+        new_tiles = self.game_manager.nav_field(map_key, goal, old_layout).path_from((px, py))
+        if new_tiles:
+            self._show_leg(layout, goal, new_tiles)
+        else:
+            # This map's leg is cut off; another teleporter may still lead there
+            self._follow_route()
 
     def _handle_mute(self, is_muted: bool) -> None:
         if is_muted:
@@ -255,11 +304,11 @@ class GameScene(Scene):
             sound_manager.resume_all()
 
     def _save_game(self) -> None:
-        self.game_manager.save("saves/game0.json")
+        self.game_manager.save(GameSettings.SAVE_PATH)
         Logger.info("Game saved!")
 
     def _load_game(self) -> None:
-        loaded = GameManager.load("saves/game0.json")
+        loaded = GameManager.load(GameSettings.SAVE_PATH)
         if loaded:
             self.game_manager = loaded
             Logger.info("Game loaded!")
@@ -267,7 +316,7 @@ class GameScene(Scene):
     @override
     def enter(self) -> None:
         # Reload game data to sync with latest save (e.g., after battle)
-        loaded = GameManager.load("saves/game0.json")
+        loaded = GameManager.load(GameSettings.SAVE_PATH)
         if loaded:
             self.game_manager = loaded
             Logger.info("Game data reloaded from save file")
@@ -303,6 +352,7 @@ class GameScene(Scene):
 
     @override
     def update(self, dt: float):
+        self.frame_dt = dt
         self.setting_button.update(dt)
         self.backpack_button.update(dt)
         self.navigation_button.update(dt)
@@ -311,10 +361,15 @@ class GameScene(Scene):
         # Update arrow path animation and consumption
         if self.arrow_path and self.game_manager.player:
             self.arrow_path.update(dt, self.game_manager.player.position)
+            self._check_route(dt)
 
-            # Clear arrow path if it's been completely consumed
+            # Clear arrow path if it's been completely consumed; the route continues on the
+            # next map, if any, once the teleport there has happened
             if self.arrow_path.is_complete():
                 self.arrow_path = None
+                self.route_leg = None
+                if self.route_target and self.route_target[0] == self.game_manager.current_map_key:
+                    self.route_target = None
 
         # Reward notification handling (highest priority)
         if self.reward_notification:
@@ -392,9 +447,8 @@ class GameScene(Scene):
         # Check if map has changed and clear navigation if so
         if self.game_manager.current_map and self.game_manager.current_map.path_name != self.current_map_name:
             self.current_map_name = self.game_manager.current_map.path_name
-            # Clear navigation arrow path when map changes
-            if self.arrow_path:
-                self.arrow_path = None
+            # Continue the route from where the player arrived, or clear the arrows
+            self._follow_route()
             # Re-initialize boss portal when map changes
             self._init_boss_portal()
 
@@ -407,11 +461,23 @@ class GameScene(Scene):
 
         if self.game_manager.player:
             self.game_manager.player.update(dt)
-        for enemy in self.game_manager.current_enemy_trainers:
+
+        # Only entities near the player can see it or be interacted with, so only they are updated.
+        # The ones the player just walked away from get a last update to clear detected/near.
+        near_trainers = self.game_manager.entities_near_player("trainer")
+        near_npcs = self.game_manager.entities_near_player("npc")
+        near_chests = self.game_manager.entities_near_player("chest")
+        near_entities = set(near_trainers)
+        near_entities.update(near_npcs, near_chests)
+        for entity in self._near_entities - near_entities:
+            entity.update(dt)
+        self._near_entities = near_entities
+
+        for enemy in near_trainers:
             enemy.update(dt)
             # Battle trigger
             if enemy.detected and input_manager.key_pressed(pg.K_SPACE):
-                self.game_manager.save("saves/game0.json")
+                self.game_manager.save(GameSettings.SAVE_PATH)
                 # Update battle scene's game_manager to use the latest state
                 from src.scenes.battle_scene import BattleScene
                 battle_scene = scene_manager._scenes.get("battle")
@@ -422,7 +488,7 @@ class GameScene(Scene):
 
         # NPC interaction
         npc_near = False
-        for npc in self.game_manager.current_npcs:
+        for npc in near_npcs:
             npc.update(dt)
             # Show dialogue bubble when near NPC
             if npc.is_near_player:
@@ -433,7 +499,7 @@ class GameScene(Scene):
                 if npc.name == "Mewtwo Guardian":
                     # Boss fight trigger - press E to start boss battle
                     if input_manager.key_pressed(pg.K_e):
-                        self.game_manager.save("saves/game0.json")
+                        self.game_manager.save(GameSettings.SAVE_PATH)
                         # Update boss fight scene's game_manager to use the latest state
                         from src.scenes.boss_fight_scene import BossFightScene
                         boss_scene = scene_manager._scenes.get("boss_fight")
@@ -471,7 +537,7 @@ class GameScene(Scene):
 
         # Chest interaction
         chest_near = False
-        for chest in self.game_manager.current_chests:
+        for chest in near_chests:
             chest.update(dt)
             # Show dialogue when near chest
             if chest.is_near_player:
@@ -490,7 +556,7 @@ class GameScene(Scene):
                             self.reward_notification = RewardNotification(chest.rewards)
                             self.show_chest_prompt = False
                             self.current_chest_dialogue = None
-                            self.game_manager.save("saves/game0.json")
+                            self.game_manager.save(GameSettings.SAVE_PATH)
                         return
 
         # Hide chest dialogue if not near any chest
@@ -508,7 +574,7 @@ class GameScene(Scene):
                 # Check if player presses E to trigger encounter
                 if input_manager.key_pressed(pg.K_e):
                     Logger.info("Wild pokemon encountered in bush!")
-                    self.game_manager.save("saves/game0.json")
+                    self.game_manager.save(GameSettings.SAVE_PATH)
                     # Update catch pokemon scene's game_manager to use the latest state
                     from src.scenes.catch_pokemon_scene import CatchPokemonScene
                     catch_scene = scene_manager._scenes.get("catch_pokemon")
@@ -528,9 +594,11 @@ class GameScene(Scene):
             player = self.game_manager.player
             # Convert Direction enum to string for network transmission
             direction_str = player.direction.name  # e.g., Direction.UP -> "UP"
-            # Determine if player is moving based on animation state
-            # Check if the animation is actively playing (accumulator > 0 means it's been updated)
-            is_moving = player.animation.accumulator > 0
+            # Moving means the position changed this frame (the walk animation's clock never stops,
+            # so it cannot tell a standing player apart)
+            position = (player.position.x, player.position.y)
+            is_moving = self._last_player_position is not None and position != self._last_player_position
+            self._last_player_position = position
 
             _ = self.online_manager.update(
                 player.position.x,
@@ -548,42 +616,34 @@ class GameScene(Scene):
 
             # Draw online players first (behind local player)
             if self.online_manager:
-                list_online = self.online_manager.get_list_players()
-
-                # Clean up animations for disconnected players
-                current_pids = set(p["id"] for p in list_online)
-                for pid in list(self.online_player_animations.keys()):
-                    if pid not in current_pids:
-                        del self.online_player_animations[pid]
-
-                for player_data in list_online:
-                    if player_data["map"] == self.game_manager.current_map.path_name:
-                        player_id = player_data["id"]
-
+                # Interpolated between server snapshots, so movement stays smooth at low tick rates.
+                # The records are reused every frame; nothing here allocates per player.
+                online_players = self.online_manager.interpolated_players()
+
+                # Clean up animations for disconnected players, only when someone joined or left
+                membership = self.online_manager.players_membership
+                if membership != self._online_membership:
+                    for pid in [pid for pid in self.online_player_animations if pid not in online_players]:
+                        self.online_animation_pool.release(self.online_player_animations.pop(pid))
+                    self._online_membership = membership
+
+                current_map = self.game_manager.current_map.path_name
+                for player_id, player_data in online_players.items():
+                    if player_data.map == current_map:
                         # Create or get animation for this online player
-                        if player_id not in self.online_player_animations:
-                            self.online_player_animations[player_id] = Animation(
-                                "character/ow1.png",  # Use same sprite as local player
-                                ["down", "left", "right", "up"], 4,
-                                (GameSettings.TILE_SIZE, GameSettings.TILE_SIZE)
-                            )
-
-                        anim = self.online_player_animations[player_id]
+                        anim = self.online_player_animations.get(player_id)
+                        if anim is None:
+                            anim = self.online_player_animations[player_id] = self.online_animation_pool.acquire()
 
                         # Update position
-                        pos = Position(player_data["x"], player_data["y"])
-                        anim.update_pos(pos)
-
-                        # Update animation based on direction and movement
-                        direction = player_data.get("direction", "DOWN").lower()
-                        is_moving = player_data.get("is_moving", False)
+                        anim.rect.topleft = (round(player_data.x), round(player_data.y))
 
-                        # Switch to appropriate animation state
-                        anim.switch(direction)
+                        # Switch to appropriate animation state based on direction
+                        anim.switch(player_data.direction.lower())
 
                         # Update animation (this advances frames if moving)
-                        if is_moving:
-                            anim.update(0.016)  # Approximate frame time
+                        if player_data.is_moving:
+                            anim.update(self.frame_dt)
 
                         # Draw the animated sprite
                         anim.draw(screen, camera)
@@ -593,11 +653,14 @@ class GameScene(Scene):
         else:
             camera = PositionCamera(0, 0)
             self.game_manager.current_map.draw(screen, camera)
-        for enemy in self.game_manager.current_enemy_trainers:
+        # Entities on screen, with a margin for trainers' line-of-sight hitboxes and warning signs
+        view = pg.Rect(camera.x, camera.y, screen.get_width(), screen.get_height())
+        view.inflate_ip(2 * ENTITY_REACH, 2 * ENTITY_REACH)
+        for enemy in self.game_manager.entities_near(view, "trainer"):
             enemy.draw(screen, camera)
-        for npc in self.game_manager.current_npcs:
+        for npc in self.game_manager.entities_near(view, "npc"):
             npc.draw(screen, camera)
-        for chest in self.game_manager.current_chests:
+        for chest in self.game_manager.entities_near(view, "chest"):
             chest.draw(screen, camera)
 
         # Draw boss portal with animation
@@ -615,7 +678,7 @@ class GameScene(Scene):
             # Get online players list if available
             online_players_list = None
             if self.online_manager:
-                online_players_list = self.online_manager.get_list_players()
+                online_players_list = self.online_manager.remote_players().values()
 
             self.minimap.draw(
                 screen,
@@ -1,3 +1,3 @@
 from .sprite import Sprite
 from .background import BackgroundSprite
-from .animation import Animation
\ No newline at end of file
+from .animation import Animation, AnimationState, AnimationPool
\ No newline at end of file
@@ -1,6 +1,7 @@
 import pygame as pg
 
 from .sprite import Sprite
+from src.core.services import resource_manager
 from src.utils import GameSettings, Logger, PositionCamera
 from typing import Optional
 
@@ -10,9 +11,9 @@ class Animation(Sprite):
     cur_row: str
     # Time information for selections
     accumulator: float  # time elapsed
-    loop: float         # maximum time 
+    loop: float         # maximum time
     n_keyframes: int    # number of keyframes
-    
+
     def __init__(
         self, image_path: str,
         rows: list[str], n_keyframes: int,  # Row x Column for grids
@@ -20,38 +21,27 @@ class Animation(Sprite):
         loop: float = 1                     # loop in second
     ):
         super().__init__(image_path)
-        sheet_w, sheet_h = self.image.get_size()
-        frame_w = sheet_w // n_keyframes
-        frame_h = sheet_h // len(rows)
-        
+
         if (len(rows) <= 0 or n_keyframes <= 0):
             Logger.error("Invalid number of rows")
-        
-        self.animations = {}
-        for r, name in enumerate(rows):
-            anim : list[pg.Surface] = []
-            for c in range(n_keyframes):
-                frame = self.image.subsurface(pg.Rect(
-                    c * frame_w, r * frame_h,
-                    frame_w, frame_h
-                ))
-                anim.append(pg.transform.smoothscale(frame, size))
-            self.animations[name] = anim
-            
+
+        # Sliced and scaled once per sheet, shared with every other animation of it
+        self.animations = resource_manager.get_frames(image_path, rows, n_keyframes, size)
+
         self.accumulator = 0
         self.cur_row = rows[0]
         self.loop = loop
         self.n_keyframes = n_keyframes
         self.rect = pg.Rect(0, 0, GameSettings.TILE_SIZE, GameSettings.TILE_SIZE)
-            
+
     def switch(self, name: str):
         if name not in self.animations:
             Logger.error(f"name {name} not in animations list!")
         self.cur_row = name
-        
+
     def update(self, dt: float):
          self.accumulator = (self.accumulator + dt) % self.loop
-        
+
     def draw(self, screen: pg.Surface, camera: Optional[PositionCamera] = None):
         frames = self.animations[self.cur_row]
         idx = int((self.accumulator / self.loop) * self.n_keyframes)
@@ -59,4 +49,60 @@ class Animation(Sprite):
             screen.blit(frames[idx], camera.transform_rect(self.rect))
         else:
             screen.blit(frames[idx], self.rect)
-    
\ No newline at end of file
+
+
+class AnimationState:
+    """
+    Per-instance state of an animation whose frames are shared: the row, the clock and where to
+    draw. Same switch/update/draw interface as Animation, without a Sprite or frames of its own.
+    """
+    __slots__ = ("animations", "cur_row", "accumulator", "loop", "n_keyframes", "rect")
+
+    def __init__(self, animations: dict[str, list[pg.Surface]], row: str, n_keyframes: int, loop: float):
+        self.animations = animations
+        self.n_keyframes = n_keyframes
+        self.loop = loop
+        self.rect = pg.Rect(0, 0, GameSettings.TILE_SIZE, GameSettings.TILE_SIZE)
+        self.reset(row)
+
+    def reset(self, row: str) -> None:
+        self.cur_row = row
+        self.accumulator = 0
+
+    switch = Animation.switch
+    update = Animation.update
+    draw = Animation.draw
+
+
+class AnimationPool:
+    """
+    Hands out AnimationStates for one sprite sheet. The frames are loaded once through the
+    resource manager; released states are kept and reused by the next `acquire`.
+    """
+    animations: dict[str, list[pg.Surface]]
+    _rows: list[str]
+    _n_keyframes: int
+    _loop: float
+    _free: list[AnimationState]
+
+    def __init__(
+        self, image_path: str,
+        rows: list[str], n_keyframes: int,
+        size: tuple[int, int],
+        loop: float = 1
+    ):
+        self.animations = resource_manager.get_frames(image_path, rows, n_keyframes, size)
+        self._rows = list(rows)
+        self._n_keyframes = n_keyframes
+        self._loop = loop
+        self._free = []
+
+    def acquire(self) -> AnimationState:
+        if self._free:
+            state = self._free.pop()
+            state.reset(self._rows[0])
+            return state
+        return AnimationState(self.animations, self._rows[0], self._n_keyframes, self._loop)
+
+    def release(self, state: AnimationState) -> None:
+        self._free.append(state)
@@ -0,0 +1,154 @@
+"""Snapshot interpolation for remote players"""
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from .settings import GameSettings
+
+BUFFER_SIZE = 32              # Snapshots kept per player
+MIN_DELAY = 0.05              # Seconds remote players are rendered in the past, at least...
+MAX_DELAY = 0.35              # ...and at most
+DELAY_FRAMES = 2.0            # Render this many server frame gaps behind the newest snapshot
+MAX_EXTRAPOLATION = 0.25      # Seconds of dead reckoning before a late player is held in place
+SNAP_TILES = 3                # Jumps longer than this are teleports and are not interpolated
+DELAY_SLEW = 0.05             # Render delay changes by at most this many seconds per second
+
+
+@dataclass(slots=True)
+class Snapshot:
+    t: float          # Local monotonic time the server state belongs to
+    x: float
+    y: float
+    map: str
+    direction: str
+    is_moving: bool
+
+
+class NetworkClock:
+    """
+    Maps server timestamps onto the local monotonic clock.
+
+    The offset is the smallest (local arrival - server timestamp) seen so far, i.e. the fastest
+    packet, so a snapshot's local time does not depend on how late that particular packet was.
+    It also tracks the gap between server frames and the arrival jitter to size the render delay.
+    """
+    offset: float | None
+    frame_gap: float
+    jitter: float
+    _last_server_ts: float | None
+    _render_delay: float
+    _last_render: float | None
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.offset = None
+        self.frame_gap = 1.0 / 60
+        self.jitter = 0.0
+        self._last_server_ts = None
+        self._render_delay = MIN_DELAY
+        self._last_render = None
+
+    def observe(self, server_ts: float, local_now: float) -> float:
+        """Record a frame's arrival and return the local time its state belongs to"""
+        sample = local_now - server_ts
+        if self.offset is None or sample < self.offset or sample - self.offset > 1.0:
+            # Faster packet than any before, or the server clock jumped
+            self.offset = sample
+        else:
+            self.jitter += ((sample - self.offset) - self.jitter) * 0.1
+            self.offset += 0.00005  # Let the minimum drift up slowly with clock skew
+        if self._last_server_ts is not None and server_ts > self._last_server_ts:
+            gap = min(server_ts - self._last_server_ts, 1.0)
+            self.frame_gap += (gap - self.frame_gap) * 0.1
+        self._last_server_ts = server_ts
+        return server_ts + self.offset
+
+    @property
+    def delay(self) -> float:
+        """How far in the past remote players are rendered"""
+        return min(MAX_DELAY, max(MIN_DELAY, DELAY_FRAMES * self.frame_gap + 2 * self.jitter))
+
+    def render_time(self, local_now: float) -> float:
+        """
+        Time to sample snapshots at for a frame drawn at `local_now`. The delay follows `delay`
+        gradually, so jitter estimates changing between packets do not make players jump.
+        """
+        if self._last_render is not None:
+            step = max(0.0, local_now - self._last_render) * DELAY_SLEW
+            target = self.delay
+            self._render_delay += max(-step, min(step, target - self._render_delay))
+        else:
+            self._render_delay = self.delay
+        self._last_render = local_now
+        return local_now - self._render_delay
+
+
+class SnapshotBuffer:
+    """Timestamped states of one remote player, oldest first"""
+    snapshots: deque[Snapshot]
+
+    def __init__(self):
+        self.snapshots = deque(maxlen=BUFFER_SIZE)
+
+    def push(self, snap: Snapshot) -> None:
+        if self.snapshots:
+            last = self.snapshots[-1]
+            if snap.t <= last.t:
+                # Duplicate or reordered frame: keep the newer state, never go back in time
+                if snap.t == last.t:
+                    self.snapshots[-1] = snap
+                return
+            if snap.map != last.map or \
+                    abs(snap.x - last.x) + abs(snap.y - last.y) > SNAP_TILES * GameSettings.TILE_SIZE:
+                self.snapshots.clear()
+        self.snapshots.append(snap)
+
+    def sample(self, render_t: float) -> Snapshot | None:
+        """State at `render_t`: interpolated between snapshots, or dead-reckoned past the newest one"""
+        out = Snapshot(render_t, 0.0, 0.0, "", "DOWN", False)
+        return out if self.sample_into(render_t, out) else None
+
+    def sample_into(self, render_t: float, out) -> bool:
+        """
+        Like `sample`, but writes x, y, map, direction and is_moving into `out` (a Snapshot or
+        RemotePlayer) instead of allocating. Returns False when there is nothing to sample.
+        """
+        snaps = self.snapshots
+        if not snaps:
+            return False
+        newest = snaps[-1]
+        if render_t >= newest.t:
+            if not newest.is_moving or len(snaps) < 2 or newest.t <= snaps[-2].t:
+                _assign(out, newest.x, newest.y, newest.map, newest.direction, newest.is_moving)
+                return True
+            prev = snaps[-2]
+            k = min(render_t - newest.t, MAX_EXTRAPOLATION) / (newest.t - prev.t)
+            _assign(
+                out, newest.x + (newest.x - prev.x) * k, newest.y + (newest.y - prev.y) * k,
+                newest.map, newest.direction, True
+            )
+            return True
+        first = snaps[0]
+        if render_t > first.t:
+            # Newest pairs are the likely match; walk back from the end
+            for i in range(len(snaps) - 1, 0, -1):
+                a = snaps[i - 1]
+                if a.t <= render_t:
+                    b = snaps[i]
+                    k = (render_t - a.t) / (b.t - a.t)
+                    _assign(
+                        out, a.x + (b.x - a.x) * k, a.y + (b.y - a.y) * k,
+                        b.map, b.direction if k >= 0.5 else a.direction, a.is_moving or b.is_moving
+                    )
+                    return True
+        _assign(out, first.x, first.y, first.map, first.direction, first.is_moving)
+        return True
+
+
+def _assign(out, x: float, y: float, map_name: str, direction: str, is_moving: bool) -> None:
+    out.x = x
+    out.y = y
+    out.map = map_name
+    out.direction = direction
+    out.is_moving = is_moving
@@ -1,12 +1,300 @@
-"""Pathfinding utilities using BFS algorithm"""
+"""Pathfinding utilities: A* over a tile walkability grid"""
 from __future__ import annotations
+import heapq
 import pygame as pg
-from collections import deque
-from typing import Optional
+from array import array
+from collections import OrderedDict, deque
+from typing import Callable, Hashable, Optional
 from src.utils import Position, GameSettings
 
+# Directions: up, down, left, right (4-directional for smoother paths)
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+UNREACHED = -1
+FLOW_FIELD_BUDGET = 32  # Flow fields kept in flow_fields, least recently used dropped first
+
+
+class NavGrid:
+    """
+    Walkability of every tile of a map: one byte per tile, row-major, non-zero = blocked.
+    Built once from the obstacle rects (or the map's tile flags), then shared by searches.
+    """
+    width: int
+    height: int
+    blocked: bytearray
+
+    def __init__(self, width: int, height: int, blocked: bytearray | None = None):
+        self.width = width
+        self.height = height
+        self.blocked = blocked if blocked is not None else bytearray(width * height)
+
+    @classmethod
+    def from_rects(cls, rects: list[pg.Rect], width: int, height: int) -> "NavGrid":
+        grid = cls(width, height)
+        for rect in rects:
+            grid.block_rect(rect)
+        return grid
+
+    def copy(self) -> "NavGrid":
+        return NavGrid(self.width, self.height, bytearray(self.blocked))
+
+    def block_rect(self, rect: pg.Rect) -> None:
+        """Block every tile `rect` overlaps (the tiles a colliderect test against it would reject)"""
+        if rect.width <= 0 or rect.height <= 0:
+            return
+        tile = GameSettings.TILE_SIZE
+        x0, y0 = max(0, rect.left // tile), max(0, rect.top // tile)
+        x1 = min(self.width - 1, (rect.right - 1) // tile)
+        y1 = min(self.height - 1, (rect.bottom - 1) // tile)
+        for y in range(y0, y1 + 1):
+            row = y * self.width
+            self.blocked[row + x0:row + x1 + 1] = b"\x01" * max(0, x1 - x0 + 1)
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def walkable(self, x: int, y: int) -> bool:
+        return self.in_bounds(x, y) and not self.blocked[y * self.width + x]
+
+    def changed_tiles(self, other: NavGrid) -> list[int]:
+        """Indices of the tiles that are blocked in one grid and walkable in the other (same size)"""
+        a, b = self.blocked, other.blocked
+        # XOR both grids as one big integer each, then look only at the bytes that differ
+        diff = int.from_bytes(a, "little") ^ int.from_bytes(b, "little")
+        changed = []
+        while diff:
+            i = ((diff & -diff).bit_length() - 1) >> 3
+            if bool(a[i]) != bool(b[i]):
+                changed.append(i)
+            diff &= ~(0xFF << (i << 3))
+        return changed
+
+    def regions(self) -> array:
+        """
+        Connected walkable areas: per tile, row-major, a region number shared by every tile
+        reachable from it, or UNREACHED for blocked tiles
+        """
+        width, height = self.width, self.height
+        blocked = self.blocked
+        labels = array("i", [UNREACHED]) * (width * height)
+        region = 0
+        for seed in range(width * height):
+            if blocked[seed] or labels[seed] != UNREACHED:
+                continue
+            labels[seed] = region
+            stack = [seed]
+            while stack:
+                current = stack.pop()
+                cy, cx = divmod(current, width)
+                for dx, dy in DIRECTIONS:
+                    nx, ny = cx + dx, cy + dy
+                    if 0 <= nx < width and 0 <= ny < height:
+                        n = ny * width + nx
+                        if labels[n] == UNREACHED and not blocked[n]:
+                            labels[n] = region
+                            stack.append(n)
+            region += 1
+        return labels
+
+
+class FlowField:
+    """
+    Steps from every tile to one goal tile, i.e. a breadth-first search run backwards from the
+    goal over a NavGrid. Any start tile's path is then read off by walking downhill, in
+    O(path length), without searching.
+    """
+    goal: tuple[int, int]
+    width: int
+    height: int
+    distance: array  # Per tile, row-major: steps to the goal, or UNREACHED
+
+    def __init__(self, grid: NavGrid, goal: tuple[int, int]):
+        self.goal = goal
+        self.width = grid.width
+        self.height = grid.height
+        width, height = grid.width, grid.height
+        distance = self.distance = array("i", [UNREACHED]) * (width * height)
+        if not grid.walkable(*goal):
+            return
+        blocked = grid.blocked
+        start = goal[1] * width + goal[0]
+        distance[start] = 0
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            cy, cx = divmod(current, width)
+            nd = distance[current] + 1
+            for dx, dy in DIRECTIONS:
+                nx, ny = cx + dx, cy + dy
+                if 0 <= nx < width and 0 <= ny < height:
+                    n = ny * width + nx
+                    if distance[n] == UNREACHED and not blocked[n]:
+                        distance[n] = nd
+                        queue.append(n)
+
+    def repaired(self, grid: NavGrid, changed: list[int]) -> FlowField:
+        """
+        The field for `grid`, which differs from the grid this field was built on only in the
+        `changed` tiles (NavGrid.changed_tiles). Only the tiles whose distance actually changes
+        are visited, in the manner of LPA*: tiles cut off by new obstacles are found by
+        walking away from the goal through the tiles that depended on them, then every tile
+        left without a distance, and every tile that became walkable, is settled again
+        from its neighbors.
+        """
+        width, height = self.width, self.height
+        gx, gy = self.goal
+        if grid.blocked[gy * width + gx] or self.distance[gy * width + gx] == UNREACHED:
+            return FlowField(grid, self.goal)
+
+        field = FlowField.__new__(FlowField)
+        field.goal, field.width, field.height = self.goal, width, height
+        distance = field.distance = array("i", self.distance)
+        blocked = grid.blocked
+        push, pop = heapq.heappush, heapq.heappop
+
+        def neighbors(i: int):
+            cy, cx = divmod(i, width)
+            for dx, dy in DIRECTIONS:
+                nx, ny = cx + dx, cy + dy
+                if 0 <= nx < width and 0 <= ny < height:
+                    yield ny * width + nx
+
+        # 1. A tile keeps its distance d while some neighbor still has d - 1. Checked nearest the
+        #    goal first, so each neighbor it relies on has already been checked.
+        heap = []
+        for i in changed:
+            if blocked[i] and distance[i] != UNREACHED:
+                d = distance[i]
+                distance[i] = UNREACHED
+                for n in neighbors(i):
+                    if distance[n] == d + 1:
+                        push(heap, (d + 1, n))
+        orphans = []
+        while heap:
+            d, i = pop(heap)
+            if distance[i] != d:
+                continue  # Already orphaned
+            if any(distance[n] == d - 1 for n in neighbors(i)):
+                continue
+            distance[i] = UNREACHED
+            orphans.append(i)
+            for n in neighbors(i):
+                if distance[n] == d + 1:
+                    push(heap, (d + 1, n))
+
+        # 2. Settle orphans and newly walkable tiles from their neighbors, then let any shorter
+        #    distances spread (a removed obstacle can open a shortcut for tiles far away)
+        for i in orphans + [i for i in changed if not blocked[i]]:
+            best = min((distance[n] for n in neighbors(i) if distance[n] != UNREACHED), default=UNREACHED)
+            if best != UNREACHED and (distance[i] == UNREACHED or best + 1 < distance[i]):
+                distance[i] = best + 1
+                push(heap, (best + 1, i))
+        while heap:
+            d, i = pop(heap)
+            if distance[i] != d:
+                continue
+            for n in neighbors(i):
+                if not blocked[n] and (distance[n] == UNREACHED or distance[n] > d + 1):
+                    distance[n] = d + 1
+                    push(heap, (d + 1, n))
+        return field
+
+    def steps_from(self, tile: tuple[int, int]) -> int:
+        x, y = tile
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return UNREACHED
+        return self.distance[y * self.width + x]
+
+    def path_from(self, start_tile: tuple[int, int]) -> Optional[list[tuple[int, int]]]:
+        """
+        Shortest tile path from start_tile to the goal, or None if the goal cannot be reached.
+        Like find_tile_path, the start tile itself may be blocked: the path then leaves it
+        through its best walkable neighbor.
+        """
+        sx, sy = start_tile
+        if not (0 <= sx < self.width and 0 <= sy < self.height):
+            return None
+        path = [start_tile]
+        x, y = sx, sy
+        d = self.distance[y * self.width + x]
+        if d == UNREACHED:
+            best = None
+            for dx, dy in DIRECTIONS:
+                nd = self.steps_from((x + dx, y + dy))
+                if nd != UNREACHED and (best is None or nd < best[0]):
+                    best = (nd, x + dx, y + dy)
+            if best is None:
+                return None
+            d, x, y = best
+            path.append((x, y))
+        distance, width = self.distance, self.width
+        while d > 0:
+            for dx, dy in DIRECTIONS:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < width and 0 <= ny < self.height and distance[ny * width + nx] == d - 1:
+                    x, y, d = nx, ny, d - 1
+                    path.append((x, y))
+                    break
+        return path
+
+
+class FlowFieldCache:
+    """
+    Flow fields by (grid key, goal tile), built on first use and dropped least recently used
+    first. The grid key must change whenever the obstacles do (see GameManager.nav_layout,
+    which keys on the map and the tiles its NPCs and trainers stand on), so stale fields are
+    simply never looked up again.
+    """
+    budget: int
+    _fields: OrderedDict[tuple, FlowField]
+    _grids: dict[Hashable, NavGrid]
+
+    def __init__(self, budget: int = FLOW_FIELD_BUDGET):
+        self.budget = budget
+        self._fields = OrderedDict()
+        self._grids = {}
+
+    def get(
+        self, grid_key: Hashable, goal: tuple[int, int], make_grid: Callable[[], NavGrid],
+        base_key: Hashable | None = None
+    ) -> FlowField:
+        """
+        The field for `goal` on the grid `grid_key` names. If it is not cached but the field for
+        the same goal on the `base_key` grid is (the layout before some obstacles moved), it is
+        repaired from that one instead of being searched from scratch.
+        """
+        key = (grid_key, goal)
+        field = self._fields.get(key)
+        if field is not None:
+            self._fields.move_to_end(key)
+            return field
+        grid = self._grids.get(grid_key)
+        if grid is None:
+            grid = self._grids[grid_key] = make_grid()
+        base = self._fields.get((base_key, goal)) if base_key is not None else None
+        base_grid = self._grids.get(base_key) if base is not None else None
+        if base_grid is not None and base_grid.width == grid.width and base_grid.height == grid.height:
+            field = base.repaired(grid, base_grid.changed_tiles(grid))
+        else:
+            field = FlowField(grid, goal)
+        self._fields[key] = field
+        while len(self._fields) > self.budget:
+            self._fields.popitem(last=False)
+        # Grids no field refers to any more are obsolete obstacle layouts
+        live = {k[0] for k in self._fields}
+        for old in [k for k in self._grids if k not in live]:
+            del self._grids[old]
+        return field
+
+    def clear(self) -> None:
+        self._fields.clear()
+        self._grids.clear()
+
+
+flow_fields = FlowFieldCache()
+
+
 class Pathfinder:
-    """BFS-based pathfinding for navigation"""
+    """A*-based pathfinding for navigation"""
 
     @staticmethod
     def find_path(
@@ -17,7 +305,7 @@ class Pathfinder:
         map_height: int
     ) -> Optional[list[Position]]:
         """
-        Find a path from start to goal using BFS algorithm.
+        Find a shortest path from start to goal.
 
         Args:
             start: Starting position in pixels
@@ -27,71 +315,99 @@ class Pathfinder:
             map_height: Map height in tiles
 
         Returns:
-            List of positions forming the path, or None if no path found
+            List of positions (tile centers) forming the path, or None if no path found
         """
-        # Convert pixel positions to tile coordinates
-        start_tile = (
-            int(start.x // GameSettings.TILE_SIZE),
-            int(start.y // GameSettings.TILE_SIZE)
-        )
-        goal_tile = (
-            int(goal.x // GameSettings.TILE_SIZE),
-            int(goal.y // GameSettings.TILE_SIZE)
-        )
+        grid = NavGrid.from_rects(collision_map, map_width, map_height)
+        return Pathfinder.find_path_on_grid(start, goal, grid)
 
-        # BFS setup
-        queue = deque([(start_tile, [start_tile])])
-        visited = {start_tile}
+    @staticmethod
+    def find_path_on_grid(start: Position, goal: Position, grid: NavGrid) -> Optional[list[Position]]:
+        """Same as find_path, on a prebuilt NavGrid"""
+        tiles = Pathfinder.find_tile_path(Pathfinder.to_tile(start), Pathfinder.to_tile(goal), grid)
+        if tiles is None:
+            return None
+        return Pathfinder.to_pixels(tiles)
 
-        # Directions: up, down, left, right (4-directional for smoother paths)
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    @staticmethod
+    def find_tile_path(
+        start_tile: tuple[int, int],
+        goal_tile: tuple[int, int],
+        grid: NavGrid
+    ) -> Optional[list[tuple[int, int]]]:
+        """
+        A* from start_tile to goal_tile over `grid`, Manhattan heuristic, 4 directions.
 
-        while queue:
-            current, path = queue.popleft()
-
-            # Check if we reached the goal
-            if current == goal_tile:
-                # Convert tile path back to pixel positions
-                pixel_path = []
-                for tile_x, tile_y in path:
-                    # Center of tile
-                    px = tile_x * GameSettings.TILE_SIZE + GameSettings.TILE_SIZE // 2
-                    py = tile_y * GameSettings.TILE_SIZE + GameSettings.TILE_SIZE // 2
-                    pixel_path.append(Position(px, py))
-                return pixel_path
-
-            # Explore neighbors
-            for dx, dy in directions:
-                nx, ny = current[0] + dx, current[1] + dy
-
-                # Check bounds
-                if not (0 <= nx < map_width and 0 <= ny < map_height):
+        Each tile remembers only its parent, and the path is walked back from the goal once
+        at the end. The start tile itself may be blocked (the player can stand next to a wall).
+        Ties on f go to the tile closer to the goal, so straight corridors are not flood-filled.
+        """
+        width, height = grid.width, grid.height
+        sx, sy = start_tile
+        gx, gy = goal_tile
+        if not grid.in_bounds(sx, sy) or not grid.walkable(gx, gy):
+            return None
+        start = sy * width + sx
+        goal = gy * width + gx
+        if start == goal:
+            return [start_tile]
+
+        blocked = grid.blocked
+        parent = {start: start}
+        g_cost = {start: 0}
+        open_heap = [(abs(sx - gx) + abs(sy - gy), 0, start)]
+        push, pop = heapq.heappush, heapq.heappop
+
+        while open_heap:
+            _, neg_g, current = pop(open_heap)
+            g = -neg_g
+            if g != g_cost[current]:
+                continue  # Stale entry: reached again more cheaply since it was pushed
+            if current == goal:
+                break
+            cy, cx = divmod(current, width)
+            ng = g + 1
+            for dx, dy in DIRECTIONS:
+                nx, ny = cx + dx, cy + dy
+                if not (0 <= nx < width and 0 <= ny < height):
                     continue
-
-                # Check if already visited
-                if (nx, ny) in visited:
+                n = ny * width + nx
+                if blocked[n]:
                     continue
-
-                # Check collision
-                tile_rect = pg.Rect(
-                    nx * GameSettings.TILE_SIZE,
-                    ny * GameSettings.TILE_SIZE,
-                    GameSettings.TILE_SIZE,
-                    GameSettings.TILE_SIZE
-                )
-
-                # Skip if tile collides with any obstacle
-                has_collision = any(tile_rect.colliderect(r) for r in collision_map)
-                if has_collision:
+                old = g_cost.get(n)
+                if old is not None and old <= ng:
                     continue
+                g_cost[n] = ng
+                parent[n] = current
+                # Larger g first among equal f: deeper tiles are closer to the goal
+                push(open_heap, (ng + abs(nx - gx) + abs(ny - gy), -ng, n))
+        else:
+            return None
+
+        path = []
+        node = goal
+        while node != start:
+            path.append(divmod(node, width)[::-1])
+            node = parent[node]
+        path.append(start_tile)
+        path.reverse()
+        return path
 
-                # Add to queue
-                visited.add((nx, ny))
-                new_path = path + [(nx, ny)]
-                queue.append(((nx, ny), new_path))
+    @staticmethod
+    def to_tile(position: Position) -> tuple[int, int]:
+        """Tile containing a pixel position"""
+        return (
+            int(position.x // GameSettings.TILE_SIZE),
+            int(position.y // GameSettings.TILE_SIZE)
+        )
 
-        # No path found
-        return None
+    @staticmethod
+    def to_pixels(tiles: list[tuple[int, int]]) -> list[Position]:
+        """Tile path to the pixel centers ArrowPath expects"""
+        half = GameSettings.TILE_SIZE // 2
+        return [
+            Position(tile_x * GameSettings.TILE_SIZE + half, tile_y * GameSettings.TILE_SIZE + half)
+            for tile_x, tile_y in tiles
+        ]
 
     @staticmethod
     def simplify_path(path: list[Position], threshold: float = 2.0) -> list[Position]:
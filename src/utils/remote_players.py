@@ -0,0 +1,116 @@
+"""Remote player records shared between the network thread and the render thread"""
+from __future__ import annotations
+import threading
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class RemotePlayer:
+    """One remote player. Records are updated in place, never rebuilt."""
+    id: int
+    x: float = 0.0
+    y: float = 0.0
+    map: str = ""
+    direction: str = "DOWN"
+    is_moving: bool = False
+
+    def set(self, x: float, y: float, map_name: str, direction: str, is_moving: bool) -> None:
+        self.x = x
+        self.y = y
+        self.map = map_name
+        self.direction = direction
+        self.is_moving = is_moving
+
+    def copy_from(self, other: RemotePlayer) -> None:
+        self.set(other.x, other.y, other.map, other.direction, other.is_moving)
+
+
+class RemotePlayerTable:
+    """
+    Double-buffered table of remote players.
+
+    The network thread writes the back table (`put`, `remove`, `retain`) under the lock and
+    remembers which ids changed. The render thread calls `read`, which copies only those changed
+    records into the front table and returns it. Between `read` calls the front table belongs to
+    the render thread alone, so it can be iterated without locking or copying, and a frame in
+    which nothing arrived costs nothing.
+
+    `version` counts published changes; consumers compare it to the last value they saw to skip
+    work. `membership` counts only players joining or leaving.
+    """
+    version: int
+    membership: int
+    _lock: threading.Lock
+    _back: dict[int, RemotePlayer]
+    _front: dict[int, RemotePlayer]
+    _dirty: set[int]
+    _front_version: int
+
+    def __init__(self, lock: threading.Lock | None = None):
+        self._lock = lock or threading.Lock()
+        self._back = {}
+        self._front = {}
+        self._dirty = set()
+        self.version = 0
+        self.membership = 0
+        self._front_version = 0
+
+    # Writer side. Callers must hold the lock.
+
+    def put(self, pid: int, x: float, y: float, map_name: str, direction: str, is_moving: bool) -> None:
+        player = self._back.get(pid)
+        if player is None:
+            player = self._back[pid] = RemotePlayer(pid)
+            self.membership += 1
+        player.set(x, y, map_name, direction, is_moving)
+        self._dirty.add(pid)
+        self.version += 1
+
+    def remove(self, pid: int) -> None:
+        if self._back.pop(pid, None) is not None:
+            self._dirty.add(pid)
+            self.membership += 1
+            self.version += 1
+
+    def retain(self, pids) -> None:
+        """Drop every player not in `pids` (after a full snapshot)"""
+        for pid in [pid for pid in self._back if pid not in pids]:
+            self.remove(pid)
+
+    def clear(self) -> None:
+        for pid in list(self._back):
+            self.remove(pid)
+
+    def get(self, pid: int) -> RemotePlayer | None:
+        return self._back.get(pid)
+
+    def __contains__(self, pid: int) -> bool:
+        return pid in self._back
+
+    def __len__(self) -> int:
+        return len(self._back)
+
+    def values(self):
+        return self._back.values()
+
+    # Reader side. Only ever called from one thread.
+
+    def read(self) -> dict[int, RemotePlayer]:
+        """Front table, brought up to date. Do not keep it across frames or mutate it."""
+        if self._front_version == self.version:
+            return self._front
+        with self._lock:
+            front, back = self._front, self._back
+            for pid in self._dirty:
+                src = back.get(pid)
+                if src is None:
+                    front.pop(pid, None)
+                    continue
+                dst = front.get(pid)
+                if dst is None:
+                    front[pid] = RemotePlayer(pid, src.x, src.y, src.map, src.direction, src.is_moving)
+                else:
+                    dst.copy_from(src)
+            self._dirty.clear()
+            self._front_version = self.version
+        return front
@@ -0,0 +1,86 @@
+"""
+Binary save container: a header, then named sections, each a length-prefixed compact JSON
+payload with a CRC32. Files are written to a temporary file and renamed over the old one, so a
+save is either fully there or not at all.
+
+    header  : magic b"PKSV", version (u16), section count (u16)
+    section : name length (u16), payload length (u32), crc32 (u32), name (utf-8), payload
+"""
+from __future__ import annotations
+import json
+import os
+import struct
+import zlib
+
+MAGIC = b"PKSV"
+VERSION = 1
+_HEADER = struct.Struct("<4sHH")
+_SECTION = struct.Struct("<HII")
+
+
+def encode(value: object) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def decode(payload: bytes) -> object:
+    return json.loads(payload)
+
+
+def is_save_file(path: str) -> bool:
+    """Whether `path` holds a binary save (rather than a legacy JSON one)"""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_sections(path: str, sections: dict[str, bytes], sync: bool = True) -> int:
+    """Atomically replace `path` with `sections` (encoded payloads by name); returns the size"""
+    parts = [_HEADER.pack(MAGIC, VERSION, len(sections))]
+    for name, payload in sections.items():
+        raw_name = name.encode("utf-8")
+        parts.append(_SECTION.pack(len(raw_name), len(payload), zlib.crc32(payload)))
+        parts.append(raw_name)
+        parts.append(payload)
+    data = b"".join(parts)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def read_sections(path: str) -> dict[str, bytes]:
+    """Payloads by section name; raises ValueError if the file is not a valid save"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"{path}: truncated save header")
+    magic, version, count = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a save file")
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported save version {version}")
+
+    sections: dict[str, bytes] = {}
+    offset = _HEADER.size
+    for _ in range(count):
+        if offset + _SECTION.size > len(data):
+            raise ValueError(f"{path}: truncated section header")
+        name_len, payload_len, crc = _SECTION.unpack_from(data, offset)
+        offset += _SECTION.size
+        end = offset + name_len + payload_len
+        if end > len(data):
+            raise ValueError(f"{path}: truncated section")
+        name = data[offset:offset + name_len].decode("utf-8")
+        payload = data[offset + name_len:end]
+        if zlib.crc32(payload) != crc:
+            raise ValueError(f"{path}: section {name!r} is corrupt")
+        sections[name] = payload
+        offset = end
+    return sections
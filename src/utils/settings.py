@@ -10,11 +10,16 @@ class Settings:
     DEBUG: bool = True          # Debug mode
     TILE_SIZE: int = 64         # Size of each tile in pixels
     DRAW_HITBOXES: bool = True  # Draw hitboxes for debugging
+    MAP_CHUNK_SIZE: int = 512   # Maps are baked in square chunks of this many pixels...
+    MAP_CHUNK_BUDGET: int = 24  # ...and at most this many chunks (all maps together) are kept baked
     # Audio
     MAX_CHANNELS: int = 16
     AUDIO_VOLUME: float = 0.5   # Volume of audio
     # Online
     IS_ONLINE: bool = False
     ONLINE_SERVER_URL: str = "http://localhost:8989"
+    ONLINE_BINARY_PROTOCOL: bool = True  # Negotiate compact binary position updates (falls back to JSON)
+    # Saves
+    SAVE_PATH: str = "saves/game0.sav"  # Binary save; saves/game0.json is loaded while it does not exist
     
 GameSettings = Settings()
\ No newline at end of file
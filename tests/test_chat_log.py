@@ -0,0 +1,19 @@
+import server.chatLog as chat_log
+from server.chatLog import ChatLog
+
+
+def test_failed_write_stops_persistence(tmp_path, monkeypatch):
+    log = ChatLog(str(tmp_path))
+    log._write_batch([{"id": 1, "text": "kept"}])
+
+    def full_disk(path, mode="r", *args, **kwargs):
+        raise OSError(28, "No space left on device")
+    monkeypatch.setattr(chat_log, "open", full_disk, raising=False)
+    log._write_batch([{"id": 2, "text": "lost"}])
+    monkeypatch.undo()
+
+    assert log.failed
+    assert log.last_id == 1
+    log.append({"id": 3, "text": "not queued"})
+    assert not log._take_pending()
+    assert log.read_range(1, 4) == [{"id": 1, "text": "kept"}]
@@ -0,0 +1,21 @@
+import server.playerHandler as player_handler
+from server.playerHandler import PlayerHandler
+
+
+def test_expired_id_is_not_reused_while_connected(monkeypatch):
+    monkeypatch.setattr(player_handler, "TIMEOUT_TIME", 0.0)
+    handler = PlayerHandler()
+    stale = handler.register()
+    handler.expire_due()
+    assert handler.get(stale) is None
+
+    fresh = handler.register()
+    assert fresh != stale
+
+    # The stale client's updates and disconnect must not touch the new player
+    assert not handler.update(stale, 10.0, 10.0, "map.tmx")
+    assert handler.unregister(stale)
+    assert handler.get(fresh) is not None
+
+    # Once disconnected, the expired id is free again
+    assert handler.register() == stale